@@ -0,0 +1,641 @@
+"""
+🐾 Morphire.ai — Headless JSON API for agent bots.
+
+The data layer of the Streamlit pages (load_data/save_data, the job
+actions, board, chat store, IPFS and Discord helpers in app.py) served
+as a plain ASGI app: no reruns, CSS or HTML per request.
+
+    python morphire/api.py [PORT]                      # default 8502
+    uvicorn api:app --app-dir morphire --port 8502     # same app
+
+Without uvicorn, `python morphire/api.py` serves it with the small
+asyncio HTTP/1.1 server at the end of this file (keep-alive,
+Content-Length bodies). Either way an open bot connection costs one
+coroutine; pod I/O runs on a pool of API_THREADS threads.
+
+Bots sign in like the UI (auth.py): they sign the message from
+/v1/auth/challenge with their wallet key, trade the signature for a
+session token at /v1/auth/login and send `Authorization: Bearer <token>`
+from then on. Logins arriving together are verified as one batch.
+Nonces live in the process that issued them, so run one worker.
+
+    POST /v1/auth/challenge                {"wallet"} → {"nonce", "message"}
+    POST /v1/auth/login                    {"wallet", "nonce", "signature"} → {"token"}
+    GET  /v1/jobs?q=&tag=&min_reward=&max_reward=&limit=   open jobs on the board
+    POST /v1/jobs                          {"title", "description", "requirements", "reward_skr", "tags"}
+    POST /v1/jobs/{owner}/{job_id}/join    take on someone's open job
+    GET  /v1/me                            profile + stats
+    PUT  /v1/me/profile                    {"name", "bio", "skills"}
+    GET  /v1/me/jobs?status=&role=&tag=&sort=&limit=&cursor=
+    GET  /v1/me/history?q=&status=&role=&since=&until=&limit=&cursor=   archived jobs
+    GET  /v1/me/recommended?limit=         board jobs matching my skills
+    GET  /v1/me/jobs/{job_id}/chat?limit=&before=
+    POST /v1/me/jobs/{job_id}/chat         {"text"}
+    POST /v1/me/jobs/{job_id}/deliveries?filename=     raw file body → IPFS
+    POST /v1/me/jobs/{job_id}/rating       {"stars": 1-5} rate the agent of a paid/completed job
+    GET  /v1/profiles/{wallet}             public profile (agent directory)
+    GET  /healthz
+
+Errors come back as {"error": "..."} with a 4xx/5xx status.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, quote, unquote
+
+import app as ui
+import metrics
+from auth import AuthError
+from dashboard import SORT_FIELDS, filter_jobs, page_jobs
+from ids import find_job
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+API_HOST = os.environ.get("MORPHIRE_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("MORPHIRE_API_PORT", "8502"))
+API_THREADS = int(os.environ.get("MORPHIRE_API_THREADS", "16"))
+MAX_JSON_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get("MORPHIRE_API_MAX_UPLOAD_MB", "512")) * 1024 * 1024
+# Deliveries up to this size stay in memory, larger ones spill to a temp file
+SPOOL_BYTES = 8 * 1024 * 1024
+MAX_LIMIT = 100
+READ_CHUNK = 64 * 1024
+# Logins are verified together once this many wait, or after LOGIN_BATCH_WAIT_S
+LOGIN_BATCH_MAX = 64
+LOGIN_BATCH_WAIT_S = 0.005
+
+_executor = ThreadPoolExecutor(API_THREADS, thread_name_prefix="morphire-api")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ─── Requests ───
+class Request:
+    def __init__(self, scope, params):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.params = params
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        self.query = {name: values[-1] for name, values in query.items()}
+        self.headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+        self.body = b""
+        self.upload = None  # raw-body routes: the spooled request body
+
+    @functools.cached_property
+    def wallet(self):
+        """The signed-in wallet, from the bearer session token."""
+        scheme, _, token = self.headers.get("authorization", "").partition(" ")
+        wallet = ui.AUTH.session(token.strip()) if scheme.lower() == "bearer" else None
+        if wallet is None:
+            raise HTTPError(401, "sign in first: Authorization: Bearer <token from /v1/auth/login>")
+        return wallet
+
+    def json(self):
+        try:
+            body = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body is not valid JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        return body
+
+    def int_arg(self, name, default=None, low=0, high=None):
+        raw = self.query.get(name, "")
+        if not raw:
+            return default
+        try:
+            value = int(raw)
+        except ValueError:
+            raise HTTPError(400, f"{name} must be an integer")
+        if value < low or (high is not None and value > high):
+            raise HTTPError(400, f"{name} must be between {low} and {high if high is not None else '∞'}")
+        return value
+
+
+def _string(body, name, default=""):
+    value = body.get(name, default)
+    if not isinstance(value, str):
+        raise HTTPError(400, f"{name} must be a string")
+    return value
+
+
+def _string_list(body, name, default=()):
+    """A list of strings, also accepted as one comma-separated string."""
+    value = body.get(name, list(default))
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise HTTPError(400, f"{name} must be a list of strings")
+    return value
+
+
+def _my_job(data, job_id):
+    job = find_job(data, job_id)
+    if job is None:
+        raise HTTPError(404, f"no job {job_id} in this wallet's pod")
+    return job
+
+
+# ─── Login Bursts ───
+class LoginBatcher:
+    """Gathers concurrent logins and checks them with one login_batch call."""
+
+    def __init__(self, max_batch=LOGIN_BATCH_MAX, wait_s=LOGIN_BATCH_WAIT_S):
+        self.max_batch = max_batch
+        self.wait_s = wait_s
+        self._pending = []  # ((wallet, nonce, signature), future)
+        self._timer = None
+
+    async def login(self, wallet, nonce, signature):
+        """A session token, or None."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((wallet, nonce, signature), future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.wait_s, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._verify(batch))
+
+    async def _verify(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            tokens = await loop.run_in_executor(_executor, ui.AUTH.login_batch, [attempt for attempt, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        if metrics.ENABLED:
+            metrics.inc("api_login_batches")
+            metrics.inc("api_logins", len(batch))
+        for (_, future), token in zip(batch, tokens):
+            if not future.done():
+                future.set_result(token)
+
+
+LOGINS = LoginBatcher()
+
+
+# ─── Handlers (on the thread pool unless async) ───
+def health(req):
+    return 200, {"ok": True, "storage": ui.STORE.name, "open_jobs": len(ui.BOARD)}
+
+
+def challenge(req):
+    try:
+        nonce, message = ui.AUTH.challenge(_string(req.json(), "wallet"))
+    except AuthError as e:
+        raise HTTPError(400, str(e))
+    return 200, {"nonce": nonce, "message": message, "expires_in": ui.AUTH.nonces.ttl}
+
+
+async def login(req):
+    body = req.json()
+    token = await LOGINS.login(_string(body, "wallet").strip(), _string(body, "nonce"), _string(body, "signature"))
+    if token is None:
+        raise HTTPError(401, "the signature does not match this wallet and an outstanding nonce")
+    return 200, {"token": token, "expires_in": ui.AUTH.tokens.ttl}
+
+
+def list_jobs(req):
+    tag = req.query.get("tag", "").strip()
+    jobs = ui.BOARD.search(
+        req.query.get("q", ""),
+        tags=[tag] if tag else (),
+        min_reward=req.int_arg("min_reward"),
+        max_reward=req.int_arg("max_reward"),
+        exclude_wallet=req.wallet,
+        limit=req.int_arg("limit", 20, 1, MAX_LIMIT),
+    )
+    return 200, {"jobs": jobs}
+
+
+def create_job(req):
+    body = req.json()
+    title = _string(body, "title").strip()
+    if not title:
+        raise HTTPError(400, "title is required")
+    reward = body.get("reward_skr", 100)
+    if not isinstance(reward, int) or isinstance(reward, bool) or reward < 1:
+        raise HTTPError(400, "reward_skr must be a positive integer")
+    data = ui.load_data(req.wallet)
+    job = ui.post_job(
+        data, req.wallet, title, _string(body, "description"), _string(body, "requirements"),
+        reward, _string_list(body, "tags"),
+    )
+    return 201, {"job": job}
+
+
+def join(req):
+    wallet = req.wallet
+    owner, job_id = req.params["owner"], req.params["job_id"]
+    if owner == wallet:
+        raise HTTPError(400, "you cannot join your own job")
+    job = ui.BOARD.job(owner, job_id)
+    if job is None:
+        raise HTTPError(404, f"{job_id} is not an open job on the board")
+    data = ui.load_data(wallet)
+    if find_job(data, job_id) is not None:
+        raise HTTPError(409, f"already joined {job_id}")
+    return 201, {"job": ui.join_job(data, wallet, job)}
+
+
+def me(req):
+    data = ui.load_sections(req.wallet, "meta", "profile", "stats")
+    return 200, {"wallet": req.wallet, "rev": data["meta"].get("rev", 0), "profile": data["profile"], "stats": data["stats"]}
+
+
+def edit_profile(req):
+    body = req.json()
+    data = ui.load_data(req.wallet)
+    profile = data["profile"]
+    profile = ui.update_profile(
+        data, req.wallet,
+        _string(body, "name", profile.get("name", "")),
+        _string(body, "bio", profile.get("bio", "")),
+        _string_list(body, "skills", profile.get("skills", [])),
+    )
+    return 200, {"profile": profile}
+
+
+def my_jobs(req):
+    sort = req.query.get("sort", "posted_at")
+    if sort not in SORT_FIELDS:
+        raise HTTPError(400, f"sort must be one of {', '.join(SORT_FIELDS)}")
+    cursor = req.query.get("cursor")
+    if cursor:
+        try:
+            cursor = json.loads(cursor)
+        except ValueError:
+            raise HTTPError(400, "cursor must be a next_cursor from an earlier page")
+    data = ui.load_data(req.wallet)
+    matching = filter_jobs(
+        data["jobs"],
+        status=req.query.get("status") or None,
+        role=req.query.get("role") or None,
+        tag=req.query.get("tag") or None,
+    )
+    page, next_cursor = page_jobs(matching, sort=sort, page_size=req.int_arg("limit", 20, 1, MAX_LIMIT), cursor=cursor or None)
+    return 200, {"jobs": page, "next_cursor": None if next_cursor is None else json.dumps(next_cursor)}
+
+
+def history(req):
+    """Archived (settled) jobs, newest first; since/until are YYYY-MM."""
+    cursor = req.query.get("cursor")
+    if cursor:
+        try:
+            month, no, line = cursor = tuple(json.loads(cursor))
+            if not (isinstance(month, str) and isinstance(no, int) and isinstance(line, int)):
+                raise ValueError(cursor)
+        except (TypeError, ValueError):
+            raise HTTPError(400, "cursor must be a next_cursor from an earlier page")
+    jobs, next_cursor = ui.ARCHIVE.search(
+        ui.wallet_pod_key(req.wallet),
+        req.query.get("q", ""),
+        status=req.query.get("status") or None,
+        role=req.query.get("role") or None,
+        since=req.query.get("since") or None,
+        until=req.query.get("until") or None,
+        limit=req.int_arg("limit", 20, 1, MAX_LIMIT),
+        cursor=cursor or None,
+    )
+    return 200, {"jobs": jobs, "next_cursor": None if next_cursor is None else json.dumps(next_cursor)}
+
+
+def recommended(req):
+    return 200, {"jobs": ui.MATCHER.jobs_for(req.wallet, req.int_arg("limit", 5, 1, MAX_LIMIT))}
+
+
+def read_chat(req):
+    data = ui.load_data(req.wallet)
+    job = _my_job(data, req.params["job_id"])
+    chat, chat_key = ui.job_chat(data, req.wallet)
+    messages, older = chat.page(
+        chat_key, job["id"],
+        limit=req.int_arg("limit", ui.CHAT_PAGE_SIZE, 1, MAX_LIMIT),
+        before=req.int_arg("before"),
+    )
+    return 200, {"messages": messages, "before": older}
+
+
+def send_chat(req):
+    text = _string(req.json(), "text").strip()
+    if not text:
+        raise HTTPError(400, "text is required")
+    data = ui.load_data(req.wallet)
+    job = _my_job(data, req.params["job_id"])
+    if job.get("status") == "cancelled":
+        raise HTTPError(409, f"{job['id']} is cancelled")
+    return 201, {"message": ui.send_chat_message(data, req.wallet, job, text)}
+
+
+def upload_delivery(req):
+    filename = os.path.basename(req.query.get("filename", "")) or "delivery.bin"
+    data = ui.load_data(req.wallet)
+    job = _my_job(data, req.params["job_id"])
+    if job.get("role") != "agent":
+        raise HTTPError(403, "deliveries are uploaded by the job's agent")
+    req.upload.seek(0)
+    return 201, {"delivery": ui.add_delivery(data, req.wallet, job, req.upload, filename)}
+
+
+def rate(req):
+    stars = req.json().get("stars")
+    if not isinstance(stars, int) or isinstance(stars, bool) or not 1 <= stars <= 5:
+        raise HTTPError(400, "stars must be an integer from 1 to 5")
+    data = ui.load_data(req.wallet)
+    job = _my_job(data, req.params["job_id"])
+    if not ui.rateable(job):
+        raise HTTPError(409, f"{job['id']} is not a paid or completed job of yours with an unrated agent")
+    return 201, {"rating": ui.rate_agent(data, req.wallet, job, stars)}
+
+
+def public_profile(req):
+    agent = ui.AGENTS.agent(req.params["wallet"])
+    if agent is None:
+        raise HTTPError(404, "no public profile for this wallet")
+    return 200, {"profile": agent}
+
+
+# ─── Routing ───
+# (method, path, handler, body): body is "json", "raw" (streamed to a
+# spooled temp file) or None
+ROUTES = [
+    ("GET", "/healthz", health, None),
+    ("POST", "/v1/auth/challenge", challenge, "json"),
+    ("POST", "/v1/auth/login", login, "json"),
+    ("GET", "/v1/jobs", list_jobs, None),
+    ("POST", "/v1/jobs", create_job, "json"),
+    ("POST", "/v1/jobs/{owner}/{job_id}/join", join, None),
+    ("GET", "/v1/me", me, None),
+    ("PUT", "/v1/me/profile", edit_profile, "json"),
+    ("GET", "/v1/me/jobs", my_jobs, None),
+    ("GET", "/v1/me/history", history, None),
+    ("GET", "/v1/me/recommended", recommended, None),
+    ("GET", "/v1/me/jobs/{job_id}/chat", read_chat, None),
+    ("POST", "/v1/me/jobs/{job_id}/chat", send_chat, "json"),
+    ("POST", "/v1/me/jobs/{job_id}/deliveries", upload_delivery, "raw"),
+    ("POST", "/v1/me/jobs/{job_id}/rating", rate, "json"),
+    ("GET", "/v1/profiles/{wallet}", public_profile, None),
+]
+PUBLIC = {health, challenge, login}
+_ROUTES = [
+    (method, re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", path) + "$"), handler, body, path)
+    for method, path, handler, body in ROUTES
+]
+
+
+def match(method, path):
+    """(handler, body kind, path params, route) for a request.
+
+    `path` is still percent-encoded (the ASGI `raw_path`): params are
+    decoded once here, and an encoded "/" stays inside its param.
+    """
+    allowed = False
+    for route_method, pattern, handler, body, route in _ROUTES:
+        m = pattern.match(path)
+        if m is None:
+            continue
+        if route_method == method:
+            return handler, body, {name: unquote(value) for name, value in m.groupdict().items()}, route
+        allowed = True
+    if allowed:
+        raise HTTPError(405, f"{method} is not allowed on {path}")
+    raise HTTPError(404, f"no route for {path}")
+
+
+async def _read_body(receive, limit):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise HTTPError(400, "client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            raise HTTPError(413, f"body larger than {limit:,} bytes")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _spool_body(receive, limit):
+    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    size = 0
+    try:
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "client disconnected")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                raise HTTPError(413, f"upload larger than {limit:,} bytes")
+            upload.write(chunk)
+            if not message.get("more_body"):
+                return upload
+    except BaseException:
+        upload.close()
+        raise
+
+
+async def app(scope, receive, send):
+    """The ASGI application."""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+    t0 = time.perf_counter()
+    route = "unmatched"
+    req = None
+    try:
+        raw_path = scope.get("raw_path")
+        # ASGI's "path" is decoded already; without raw_path, encode it back
+        path = raw_path.decode("latin-1") if raw_path else quote(scope["path"])
+        handler, body, params, route = match(scope["method"], path)
+        req = Request(scope, params)
+        if handler not in PUBLIC:
+            req.wallet  # before reading any body
+        if body == "json":
+            req.body = await _read_body(receive, MAX_JSON_BYTES)
+        elif body == "raw":
+            req.upload = await _spool_body(receive, MAX_UPLOAD_BYTES)
+        if asyncio.iscoroutinefunction(handler):
+            status, payload = await handler(req)
+        else:
+            status, payload = await asyncio.get_running_loop().run_in_executor(_executor, handler, req)
+    except HTTPError as e:
+        status, payload = e.status, {"error": str(e)}
+    except Exception:
+        traceback.print_exc()
+        status, payload = 500, {"error": "internal error"}
+    finally:
+        if req is not None and req.upload is not None:
+            req.upload.close()
+    reply = json.dumps(payload, ensure_ascii=False).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json; charset=utf-8"), (b"content-length", str(len(reply)).encode())],
+    })
+    await send({"type": "http.response.body", "body": reply})
+    if metrics.ENABLED:
+        metrics.observe("api_request", time.perf_counter() - t0, route=f"{scope['method']} {route}", status=str(status))
+
+
+# ─── Built-in Server ───
+def _simple_response(status):
+    return f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode()
+
+
+async def _serve_connection(reader, writer, asgi):
+    """HTTP/1.1 keep-alive loop for one client connection."""
+    client = writer.get_extra_info("peername")
+    server = writer.get_extra_info("sockname")
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            except asyncio.LimitOverrunError:
+                writer.write(_simple_response(431))
+                return
+            lines = head[:-4].decode("latin-1").split("\r\n")
+            request_line = lines[0].split(" ")
+            headers = []
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+            fields = dict(headers)
+            if len(request_line) != 3 or not request_line[2].startswith("HTTP/1."):
+                writer.write(_simple_response(400))
+                return
+            if b"transfer-encoding" in fields:
+                writer.write(_simple_response(411))  # bots send Content-Length
+                return
+            try:
+                left = int(fields.get(b"content-length", b"0"))
+            except ValueError:
+                writer.write(_simple_response(400))
+                return
+            method, target, version = request_line
+            keep_alive = version == "HTTP/1.1" and fields.get(b"connection", b"").lower() != b"close"
+            expect_continue = fields.get(b"expect", b"").lower() == b"100-continue"
+            path, _, query = target.partition("?")
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": version[5:],
+                "method": method,
+                "scheme": "http",
+                "path": unquote(path),
+                "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"),
+                "root_path": "",
+                "headers": headers,
+                "client": client[:2] if client else None,
+                "server": server[:2] if server else None,
+            }
+
+            async def receive():
+                nonlocal left, expect_continue
+                if expect_continue:
+                    expect_continue = False
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                if left <= 0:
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                try:
+                    chunk = await reader.read(min(left, READ_CHUNK))
+                except ConnectionError:
+                    chunk = b""
+                if not chunk:
+                    return {"type": "http.disconnect"}
+                left -= len(chunk)
+                return {"type": "http.request", "body": chunk, "more_body": left > 0}
+
+            async def send(message):
+                nonlocal keep_alive
+                if message["type"] == "http.response.start":
+                    keep_alive = keep_alive and left <= 0  # an unread body ends the connection
+                    status = message["status"]
+                    out = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}".encode()]
+                    out += [name + b": " + value for name, value in message.get("headers", [])]
+                    if not keep_alive:
+                        out.append(b"connection: close")
+                    writer.write(b"\r\n".join(out) + b"\r\n\r\n")
+                elif message["type"] == "http.response.body":
+                    writer.write(message.get("body", b""))
+                    if not message.get("more_body"):
+                        await writer.drain()
+
+            await asgi(scope, receive, send)
+            if not keep_alive:
+                return
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(host=API_HOST, port=API_PORT, asgi=app):
+    """An asyncio server for `asgi`; port 0 picks a free one."""
+    return await asyncio.start_server(
+        lambda reader, writer: _serve_connection(reader, writer, asgi), host, port, backlog=4096,
+    )
+
+
+async def _serve_forever(host, port):
+    server = await start_server(host, port)
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"🐾 Morphire API on http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv):
+    port = int(argv[0]) if argv else API_PORT
+    if uvicorn is not None:
+        uvicorn.run(app, host=API_HOST, port=port, log_level="warning")
+    else:
+        try:
+            asyncio.run(_serve_forever(API_HOST, port))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -7,53 +7,97 @@ v2.0 — Privacy First, Wallet Auth, & Multi-tenant Architecture 🚀
 """
 
 import streamlit as st
-import json
+import functools
+import html
 import os
-import hashlib
-import random
-import string
+import re
 import base64
-import time
-import requests
 from datetime import datetime, timezone, timedelta
 
+from archive import get_archive
+from archive import settled_at as archive_settled_at
+from archive import start_background as start_archiver
+from auth import AuthError, b58encode, generate_keypair, get_auth, sign
+from board import get_board, is_open
+from chatstore import get_chat_store, migrate_pod
+from dashboard import PAGE_SIZES, SORT_FIELDS, STATUS_EMOJI, filter_jobs, page_jobs, render_cards
+from export import AVAILABLE_FORMATS, MIME_TYPES, TABLES as EXPORT_TABLES, Exporter, export_file
+from ids import find_job, new_job_id, new_ulid, replace_job
+from ipfs import get_cid_index, upload_stream
+from lifecycle import ACCEPT_WINDOW_H, get_queue, start_background
+from ledger import InsufficientFunds, get_ledger, get_settlement_client, pod_transaction
+from matching import get_directory, get_matcher
+from metrics import instrumented
+from metrics import start as start_metrics
+from notify import get_dispatcher
+from placement import get_placement, wallet_pod_key
+from reruns import RERUN_STATS, describe, rerun
+from reputation import NEWCOMER_SCORE, empty_reputation, record_rating, score_from_average
+from stats import (
+    STATS_VERSION, empty_stats, ensure_stats, rebuild_stats, track_job_added, track_job_changed,
+)
+from storage import (
+    POD_CACHE, PodMovedError, commit, get_store, job_added, job_updated, pod_lock, profile_changed, section_set,
+)
+
 # ─── Constants ───
 JST = timezone(timedelta(hours=9))
-BASE_DATA_DIR = os.path.join(os.path.dirname(__file__), "data_store")
+# Pods and shared indexes; MORPHIRE_DATA_DIR points a run elsewhere (benchmarks)
+BASE_DATA_DIR = os.environ.get("MORPHIRE_DATA_DIR") or os.path.join(os.path.dirname(__file__), "data_store")
 if not os.path.exists(BASE_DATA_DIR):
     os.makedirs(BASE_DATA_DIR)
 
 # Discord Webhook URL (set via env or paste here)
 DISCORD_WEBHOOK_URL = os.environ.get("MORPHIRE_DISCORD_WEBHOOK", "")
+# Webhook posts that overflow the dispatcher queue wait here
+WEBHOOK_SPILL_PATH = os.path.join(BASE_DATA_DIR, "discord-spill.jsonl")
+
+# Pod storage backend ("journal" by default, "json" for full rewrites)
+STORE = get_store()
+# Shard directories on a consistent-hash ring of storage roots (placement.py)
+PLACEMENT = get_placement(BASE_DATA_DIR, STORE)
 
 # IPFS API config (Pinata-compatible simulation)
 PINATA_API_KEY = os.environ.get("PINATA_API_KEY", "")
 PINATA_SECRET = os.environ.get("PINATA_SECRET", "")
 # If no real API keys, we simulate IPFS hashes
 IPFS_SIMULATION = not (PINATA_API_KEY and PINATA_SECRET)
-
-STATUS_EMOJI = {
-    "pending": "⏳",
-    "in_progress": "🔨",
-    "completed": "✅",
-    "paid": "💰",
-    "hired": "🤝",
-    "cancelled": "❌",
-}
-
-STATUS_COLORS = {
-    "pending": "#FFA726",
-    "in_progress": "#42A5F5",
-    "completed": "#66BB6A",
-    "paid": "#AB47BC",
-    "hired": "#26C6DA",
-    "cancelled": "#EF5350",
-}
+# Content SHA-256 → CID of everything already pinned
+IPFS_INDEX_PATH = os.path.join(BASE_DATA_DIR, "ipfs-index.jsonl")
+# Block layouts of locally computed CIDs, reusable by a later real pin
+IPFS_BLOCKS_DIR = os.path.join(BASE_DATA_DIR, "ipfs-blocks")
+
+# Task Chat messages live outside the pods (see chatstore.py)
+CHAT_DIR = os.path.join(BASE_DATA_DIR, "chat")
+CHAT_PAGE_SIZE = 30
+
+# Shared index of every wallet's open jobs (see board.py)
+BOARD = get_board(os.path.join(BASE_DATA_DIR, "board", "board.jsonl"))
+# Public skills + credit score per wallet, for job/agent recommendations
+AGENTS = get_directory(os.path.join(BASE_DATA_DIR, "board", "agents.jsonl"))
+MATCHER = get_matcher(BOARD, AGENTS)
+# Double-entry SKR ledger; payouts settle in batched rounds (ledger.py)
+LEDGER = get_ledger(os.path.join(BASE_DATA_DIR, "ledger", "ledger.jsonl"))
+SETTLEMENT = get_settlement_client()
+FAUCET_SKR = 1_000
+# Expirations, auto-payments and reminders for every wallet's jobs (lifecycle.py)
+LIFECYCLE = get_queue(os.path.join(BASE_DATA_DIR, "lifecycle", "queue.jsonl"))
+# Settled jobs older than ARCHIVE_AFTER_DAYS, in compressed segments per wallet (archive.py)
+ARCHIVE = get_archive(os.path.join(BASE_DATA_DIR, "archive"))
+HISTORY_PAGE_SIZE = 20
+# CSV/Parquet downloads of a wallet's tables, written a batch at a time (export.py)
+EXPORTER = Exporter(BASE_DATA_DIR, STORE)
+EXPORT_DIR = os.path.join(BASE_DATA_DIR, "exports")
+if os.environ.get("MORPHIRE_SCHEDULER"):
+    start_background(BASE_DATA_DIR)  # otherwise: python morphire/lifecycle.py run
+    start_archiver(BASE_DATA_DIR)  # and: python morphire/archive.py run
+# Ed25519 wallet sign-in: nonces, session tokens (auth.py)
+AUTH = get_auth(BASE_DATA_DIR)
+# Latency/byte/error metrics, off unless MORPHIRE_METRICS is set (metrics.py)
+start_metrics()
 
 # ─── Custom CSS (けんたろー & Sスケゾー調 🐾ピンク) ───
-def inject_custom_css():
-    st.markdown(
-        """
+_CUSTOM_CSS = """
     <style>
         /* Global vibe — deep purple/pink morphire gradient */
         .stApp {
@@ -206,9 +250,42 @@ def inject_custom_css():
             margin: 50px auto;
         }
     </style>
-    """,
-        unsafe_allow_html=True,
-    )
+    """
+
+
+@functools.lru_cache(maxsize=None)
+def custom_css():
+    """The <style> block, minified once per process (it is sent on every full rerun)."""
+    css = re.sub(r"/\*.*?\*/", "", _CUSTOM_CSS, flags=re.S)
+    return re.sub(r"\s*([{};,>])\s*", r"\1", re.sub(r"\s+", " ", css)).strip()
+
+
+def inject_custom_css():
+    st.markdown(custom_css(), unsafe_allow_html=True)
+
+
+# ─── Rerun Helpers ───
+# Fragments (Streamlit >= 1.37) rerun on their own; older versions run them inline
+fragment = getattr(st, "fragment", None) or (lambda func=None, **kwargs: func or (lambda f: f))
+SIDEBAR_REFRESH_S = int(os.environ.get("MORPHIRE_SIDEBAR_REFRESH_S", "30"))
+
+
+def rerun_fragment():
+    """Rerun only the fragment this is called from (view-only changes)."""
+    if hasattr(st, "fragment"):
+        st.rerun(scope="fragment")
+    else:
+        st.rerun()
+
+
+def flash(message):
+    """Show `message` as a toast on the next run, instead of sleeping on this one."""
+    st.session_state.setdefault("flash", []).append(message)
+
+
+def show_flash():
+    for message in st.session_state.pop("flash", []):
+        st.toast(message)
 
 # ─── Auth & Data Helpers ───
 def check_password():
@@ -232,8 +309,7 @@ def check_password():
             if st.button("Unlock 🐾"):
                 if password == "morphire123":
                     st.session_state.authenticated = True
-                    st.success("Access Granted! Loading Wallet Interface...")
-                    time.sleep(1)
+                    flash("Access Granted! Loading Wallet Interface...")
                     st.rerun()
                 else:
                     st.error("Invalid passcode. Try 'morphire123'")
@@ -241,65 +317,91 @@ def check_password():
     return True
 
 def wallet_auth():
-    """Step 2: Wallet Simulation & Signature Check."""
-    if "wallet_address" not in st.session_state:
+    """Step 2: Wallet sign-in with an Ed25519 signature (auth.py).
+
+    A verified wallet gets a session token; later reruns only check it.
+    """
+    token = st.session_state.get("auth_token")
+    if token:
+        token = AUTH.refresh(token)
+        if token is not None and AUTH.session(token) == st.session_state.get("wallet_address"):
+            st.session_state.auth_token = token
+            return True
+        st.session_state.auth_token = None
         st.session_state.wallet_address = None
 
-    if not st.session_state.wallet_address:
-        st.markdown("<br>", unsafe_allow_html=True)
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2:
-            st.markdown(
-                """
-                <div class="login-container">
-                    <h2>🦄 Connect Wallet</h2>
-                    <p>Morphire requires a Solana wallet to manage jobs, payments, and reputation.</p>
-                </div>
-                """, unsafe_allow_html=True
-            )
-            
-            # Simulated Wallet Connection
-            wallet_input = st.text_input("Solana Wallet Address (Simulated)", placeholder="Enter or Generate...")
-            col_a, col_b = st.columns(2)
-            with col_a:
-                if st.button("🎲 Generate Random Wallet"):
-                    fake_wallet = "SoL" + "".join(random.choices(string.ascii_letters + string.digits, k=40))
-                    st.session_state.temp_wallet_input = fake_wallet
-                    st.rerun()
-                    
-            if "temp_wallet_input" in st.session_state:
-                st.code(st.session_state.temp_wallet_input)
-                wallet_input = st.session_state.temp_wallet_input
-
-            if st.button("🔌 Connect & Sign Message"):
-                if len(wallet_input) < 10:
-                    st.error("Invalid wallet address.")
-                else:
-                    # Simulate signature verification
-                    with st.spinner("Requesting signature for 'Login to Morphire' request..."):
-                        time.sleep(1.5)
-                        st.success("Signature Verified! ✅")
-                        st.session_state.wallet_address = wallet_input
-                        time.sleep(0.5)
-                        st.rerun()
-        return False
-    return True
+    st.markdown("<br>", unsafe_allow_html=True)
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        st.markdown(
+            """
+            <div class="login-container">
+                <h2>🦄 Connect Wallet</h2>
+                <p>Morphire requires a Solana wallet to manage jobs, payments, and reputation.</p>
+            </div>
+            """, unsafe_allow_html=True
+        )
+
+        wallet_input = st.text_input("Solana Wallet Address", placeholder="Enter or Generate...")
+        if st.button("🎲 Generate Random Wallet"):
+            # Demo wallet: its key stays in this session and signs for the user
+            seed, public_key = generate_keypair()
+            st.session_state.demo_wallet = (b58encode(public_key), seed)
+            st.rerun()
+        demo = st.session_state.get("demo_wallet")
+        if demo is not None:
+            st.code(demo[0])
+            wallet_input = wallet_input or demo[0]
+        wallet_input = wallet_input.strip()
+        if not wallet_input:
+            return False
+
+        # One nonce per address per session, until it is used (or expires
+        # or is evicted from the nonce cache: then a fresh one is issued)
+        challenge = st.session_state.get("login_challenge")
+        if (challenge is None or challenge[0] != wallet_input
+                or AUTH.nonces.message(challenge[1], wallet_input) is None):
+            try:
+                challenge = (wallet_input, *AUTH.challenge(wallet_input))
+            except AuthError as e:
+                st.error(f"Invalid wallet address: {e}")
+                return False
+            st.session_state.login_challenge = challenge
+        _, nonce, message = challenge
+        st.caption("✍️ Sign this message with your wallet:")
+        st.code(message)
+        signature = st.text_input("Signature (base58)")
+        if demo is not None and demo[0] == wallet_input:
+            signature = signature or b58encode(sign(demo[1], message.encode()))
+
+        if st.button("🔌 Connect & Sign Message"):
+            token = AUTH.login(wallet_input, nonce, signature)
+            if token is None:
+                st.error("Signature did not verify for this address and message.")
+            else:
+                st.session_state.wallet_address = wallet_input
+                st.session_state.auth_token = token
+                st.session_state.login_challenge = None
+                flash("Signature Verified! ✅")
+                st.rerun()
+    return False
 
 def get_data_file_path(wallet_address):
-    """Step 3: Data Separation by Wallet Hash."""
+    """Step 3: Data Separation by Wallet Hash; placement.py picks the
+    storage root and shard directory."""
     if not wallet_address:
         return None
-    # Use a hash of the wallet address to filename to avoid filesystem issues
-    wallet_hash = hashlib.sha256(wallet_address.encode()).hexdigest()[:16]
-    return os.path.join(BASE_DATA_DIR, f"morphire-{wallet_hash}.json")
+    return PLACEMENT.locate(wallet_pod_key(wallet_address))
 
+@instrumented("load_data")
 def load_data(wallet_address):
     """Load JSON data specific to the wallet."""
     file_path = get_data_file_path(wallet_address)
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-            
+    data = POD_CACHE.load(file_path, STORE)
+    if data is not None:
+        ensure_stats(data)  # pods from older versions have no stats block
+        return data
+
     # Default template for new user
     return {
         "meta": {
@@ -308,6 +410,7 @@ def load_data(wallet_address):
             "created_at": datetime.now(JST).isoformat(),
             "lastUpdated": datetime.now(JST).isoformat(),
             "totalPayouts": 0,
+            "rev": 0,  # bumped by every save (compare-and-swap)
         },
         "jobs": [], # My jobs (either posted or applied)
         "profile": {
@@ -317,46 +420,81 @@ def load_data(wallet_address):
             "credit_score": 50
         },
         "transactions": [],
+        "stats": empty_stats(),
+        "ratings": [],  # received ratings, newest last
+        "reputation": empty_reputation(),
     }
 
-def save_data(data, wallet_address):
-    """Save data to wallet-specific JSON."""
+def load_sections(wallet_address, *keys):
+    """Only some sections of the wallet's pod, e.g. ("meta", "stats").
+
+    Served from POD_CACHE when fresh; the packed store decodes just
+    these sections from disk. Falls back to load_data for new wallets
+    and pods whose stats block needs rebuilding.
+    """
+    data = POD_CACHE.load_sections(get_data_file_path(wallet_address), STORE, keys)
+    if (
+        data is None
+        or any(key not in data for key in keys)
+        or ("stats" in data and data["stats"].get("version") != STATS_VERSION)
+    ):
+        full = load_data(wallet_address)
+        return {key: full[key] for key in keys}
+    return data
+
+@instrumented("save_data")
+def save_data(data, wallet_address, changes=None):
+    """Save data to the wallet-specific pod.
+
+    Pass `changes` (records from storage.py) when the caller knows what
+    changed; otherwise the store works it out by diffing.
+    """
     file_path = get_data_file_path(wallet_address)
     data["meta"]["lastUpdated"] = datetime.now(JST).isoformat()
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if changes is not None:
+        # Callers keep data["stats"] current via the stats.track_* helpers
+        changes = list(changes) + [section_set("stats", data["stats"])]
+    # Compare-and-swap on meta.rev; concurrent edits from other sessions
+    # are merged (stats are recomputed for the merged pod)
+    try:
+        commit(STORE, file_path, data, changes, on_merge=rebuild_stats)
+    except PodMovedError as moved:
+        # Rebalanced to another root since it was looked up: save it there
+        file_path = moved.path
+        commit(STORE, file_path, data, changes, on_merge=rebuild_stats)
+    POD_CACHE.invalidate(file_path)
+    BOARD.sync_pod(data, changes)
+    AGENTS.sync_pod(data, changes)
+    LIFECYCLE.sync_pod(data, changes, file_path)
 
 def gen_id(prefix="MF"):
-    """Generate a short unique ID."""
-    chars = string.ascii_uppercase + string.digits
-    return f"{prefix}-{''.join(random.choices(chars, k=5))}"
-
-def gen_tx_hash():
-    """Simulate a Solana tx hash."""
-    seed = f"{datetime.now().isoformat()}{random.random()}"
-    h = hashlib.sha256(seed.encode()).hexdigest()
-    return f"5x{h[:40]}...MorphireSim"
+    """Generate a unique, time-sortable ID (ULID body, see ids.py)."""
+    return f"{prefix}-{new_ulid()}"
 
 def calc_credit_score(ratings):
-    """Credit score from ratings (0-100 scale)."""
+    """Credit score from ratings (0-100 scale), without time decay.
+
+    Pods keep a decayed, incrementally updated score instead; see
+    reputation.record_rating.
+    """
     if not ratings:
-        return 50  # default newcomer score
-    avg = sum(ratings) / len(ratings)
-    return round(20 + (avg - 1) * 20)
+        return NEWCOMER_SCORE
+    return score_from_average(sum(ratings) / len(ratings))
 
 # ─── Discord Webhook Helper ───
-def send_discord_webhook(content, username="🐾 Morphire.ai", embed=None):
-    """Send a message via Discord webhook."""
+def send_discord_webhook(content, username="🐾 Morphire.ai", embed=None, coalesce=False):
+    """Queue a message for the background Discord webhook dispatcher.
+
+    Returns immediately; `coalesce=True` lets bursts be merged into one
+    multi-embed post.
+    """
     if not DISCORD_WEBHOOK_URL:
         return False
     payload = {"content": content, "username": username}
     if embed:
         payload["embeds"] = [embed]
-    try:
-        r = requests.post(DISCORD_WEBHOOK_URL, json=payload, timeout=10)
-        return r.status_code in (200, 204)
-    except Exception:
-        return False
+    dispatcher = get_dispatcher(DISCORD_WEBHOOK_URL, spill_path=WEBHOOK_SPILL_PATH)
+    return dispatcher.submit(payload, coalesce=coalesce)
 
 def notify_match(job, agent_name, discord_handle=None):
     """Notify about a job match via Discord webhook."""
@@ -387,7 +525,7 @@ def notify_chat_message(job_id, job_title, sender, message_text):
         "footer": {"text": f"Job: {job_id} | Morphire.ai 🐾"},
         "timestamp": datetime.now(JST).isoformat(),
     }
-    send_discord_webhook(f"💬 [{job_id}] {sender}: {message_text}", embed=embed)
+    send_discord_webhook(f"💬 [{job_id}] {sender}: {message_text}", embed=embed, coalesce=True)
 
 def notify_delivery(job_id, job_title, agent_name, ipfs_hash):
     embed = {
@@ -404,109 +542,271 @@ def notify_delivery(job_id, job_title, agent_name, ipfs_hash):
     send_discord_webhook(f"📦 [{job_id}] {agent_name} が納品しました！", embed=embed)
 
 # ─── IPFS Helper ───
+def upload_file_to_ipfs(source, filename):
+    """Stream a path or file-like object to IPFS (Pinata) or simulate.
+
+    Repeat uploads of identical bytes are answered from the local
+    content-hash → CID index without touching the network.
+    """
+    return upload_stream(
+        source,
+        filename,
+        api_key=PINATA_API_KEY,
+        secret=PINATA_SECRET,
+        index=get_cid_index(IPFS_INDEX_PATH),
+        simulation=IPFS_SIMULATION,
+        block_index_dir=IPFS_BLOCKS_DIR,
+    )
+
 def upload_to_ipfs(file_bytes, filename):
     """Upload file to IPFS (Pinata) or simulate."""
-    if IPFS_SIMULATION:
-        # Simulate: generate a CIDv1-like hash from file content
-        h = hashlib.sha256(file_bytes).hexdigest()
-        cid = f"Qm{h[:44]}"
-        return cid
-
-    # Real Pinata upload
-    try:
-        url = "https://api.pinata.cloud/pinning/pinFileToIPFS"
-        headers = {
-            "pinata_api_key": PINATA_API_KEY,
-            "pinata_secret_api_key": PINATA_SECRET,
-        }
-        files = {"file": (filename, file_bytes)}
-        r = requests.post(url, files=files, headers=headers, timeout=60)
-        if r.status_code == 200:
-            return r.json().get("IpfsHash", "")
-    except Exception:
-        pass
+    return upload_file_to_ipfs(file_bytes, filename)
+
+
+# ─── Job Actions (shared by the pages and api.py) ───
+def post_job(data, wallet_address, title, description="", requirements="", reward_skr=100, tags=()):
+    """Add a recruiter job to the pod and save it; returns the job."""
+    new_job = {
+        "id": new_job_id(data, "MF"),
+        "title": title,
+        "description": description,
+        "requirements": requirements,
+        "reward_skr": reward_skr,
+        "role": "recruiter", # I am the recruiter
+        "posted_by": data["profile"]["name"],
+        "posted_at": datetime.now(JST).isoformat(),
+        "status": "pending",
+        "tags": [t.strip() for t in tags if t.strip()],
+        "delivery_ipfs": [],
+    }
+    data["jobs"].append(new_job)
+    track_job_added(data, new_job)
+    save_data(data, wallet_address, [job_added(new_job)])
+    return new_job
+
+def join_job(data, wallet_address, job):
+    """Take on an open board job as its agent; returns the pod's copy."""
+    joined = {
+        "id": job["id"],
+        "title": job["title"],
+        "description": job.get("description") or "",
+        "requirements": job.get("requirements") or "",
+        "reward_skr": job.get("reward_skr", 0),
+        "role": "agent",  # I am the agent
+        "status": "in_progress",
+        "posted_by": job.get("posted_by", "Unknown"),
+        "posted_at": job.get("posted_at"),
+        "tags": job.get("tags", []),
+        "delivery_ipfs": [],
+    }
+    data["jobs"].append(joined)
+    track_job_added(data, joined)
+    save_data(data, wallet_address, [job_added(joined)])
+    notify_match(job, data["profile"]["name"])
+    return joined
+
+def job_chat(data, wallet_address):
+    """(chat store, chat key) of the pod, moving embedded chats out first."""
+    chat = get_chat_store(CHAT_DIR)
+    chat_key = wallet_pod_key(wallet_address)
+    if any("chat_history" in job for job in data["jobs"]):
+        # Pod predates the chat store: move its embedded chats out once
+        save_data(data, wallet_address, migrate_pod(data, chat_key, chat))
+    return chat, chat_key
+
+def send_chat_message(data, wallet_address, job, text):
+    """Append a message from the pod's owner to the job's chat."""
+    chat, chat_key = job_chat(data, wallet_address)
+    message = {"sender": data["profile"]["name"], "text": text, "sent_at": datetime.now(JST).isoformat()}
+    chat.append(chat_key, job["id"], message)
+    notify_chat_message(job["id"], job["title"], message["sender"], text)
+    return message
+
+def add_delivery(data, wallet_address, job, source, filename):
+    """Pin a delivery (path, bytes or file object) and attach it to the job."""
+    delivery = {
+        "ipfs_hash": upload_file_to_ipfs(source, filename),
+        "filename": filename,
+        "uploaded_at": datetime.now(JST).isoformat(),
+    }
+    delivered = dict(job, delivery_ipfs=list(job.get("delivery_ipfs", [])) + [delivery])
+    replace_job(data, job["id"], delivered)
+    track_job_changed(data, job, delivered)
+    save_data(data, wallet_address, [job_updated(delivered)])
+    notify_delivery(job["id"], job["title"], data["profile"]["name"], delivery["ipfs_hash"])
+    return delivery
+
+def rateable(job):
+    """A paid/completed job of mine whose agent I have not rated yet."""
+    return (
+        job.get("role") == "recruiter" and job.get("status") in ("paid", "completed")
+        and "rating" not in job and bool(job.get("paid_to") or job.get("agent_wallet"))
+    )
 
-    # Fallback to simulation
-    h = hashlib.sha256(file_bytes).hexdigest()
-    return f"Qm{h[:44]}"
+def rate_agent(data, wallet_address, job, stars):
+    """Rate the agent of a rateable job; the rating lands in the agent's
+    pod and moves their credit score (reputation.py). Returns the rating."""
+    agent_wallet = job.get("paid_to") or job.get("agent_wallet")
+    rated_at = datetime.now(JST)
+    # Mark the job first, so a job is never rated twice
+    rated = dict(job, rating=stars, rated_at=rated_at.isoformat())
+    replace_job(data, job["id"], rated)
+    track_job_changed(data, job, rated)
+    save_data(data, wallet_address, [job_updated(rated)])
+    # The agent's reputation is derived from all of their ratings: update
+    # it under their pod lock so a concurrent rating can't be overwritten
+    with pod_lock(get_data_file_path(agent_wallet)):
+        agent_data = load_data(agent_wallet)
+        changes = record_rating(agent_data, stars, rated_at, job["id"], wallet_address)
+        save_data(agent_data, agent_wallet, changes)
+    return agent_data["ratings"][-1]
+
+def update_profile(data, wallet_address, name, bio, skills):
+    """Replace the pod's display name, bio and skills."""
+    data["profile"]["name"] = name
+    data["profile"]["bio"] = bio
+    data["profile"]["skills"] = [s.strip() for s in skills if s.strip()]
+    save_data(data, wallet_address, [profile_changed(data["profile"])])
+    return data["profile"]
 
 
 # ─── Main App Logic ───
-def main():
-    st.set_page_config(
-        page_title="🐾 Morphire.ai",
-        page_icon="🐾",
-        layout="wide",
-        initial_sidebar_state="expanded",
-    )
-    inject_custom_css()
-
-    # 1. Password Protection
-    if not check_password():
-        return
-
-    # 2. Wallet Authentication
-    if not wallet_auth():
-        return
-
-    # 3. Load Wallet-Specific Data
-    current_wallet = st.session_state.wallet_address
-    data = load_data(current_wallet)
-
-    # ─── Sidebar ───
-    with st.sidebar:
-        st.markdown("# 🐾 Morphire.ai")
-        st.markdown("**Privacy-First Work Platform**")
-        st.markdown(f"🔑 `{current_wallet[:6]}...{current_wallet[-4:]}`")
-        if st.button("🔌 Disconnect"):
-            st.session_state.wallet_address = None
-            st.rerun()
+PAGES = [
+    "🏠 Dashboard",
+    "📋 Post a Job",
+    "🤝 My Jobs (As Agent)",
+    "⚡ Task Manager",
+    "💬 Task Chat",
+    "📦 Delivery Box",
+    "💰 Wallet & Payments",
+    "⚙️ Profile Settings",
+]
+
+# Pages that only read a few sections of the pod (the rest load it whole)
+PAGE_SECTIONS = {
+    "⚙️ Profile Settings": ("profile",),
+}
 
-        st.divider()
 
-        page = st.radio(
-            "🧭 Navigation",
-            [
-                "🏠 Dashboard",
-                "📋 Post a Job",
-                "🤝 My Jobs (As Agent)",
-                "⚡ Task Manager",
-                "💬 Task Chat",
-                "📦 Delivery Box",
-                "💰 Wallet & Payments",
-                "⚙️ Profile Settings",
-            ],
-            label_visibility="collapsed",
-        )
+def render_export(wallet_address, table="jobs"):
+    """Export form + download button for one of the wallet's tables."""
+    st.markdown("### 📤 Export")
+    with st.form("export_form"):
+        col_e1, col_e2, col_e3, col_e4 = st.columns(4)
+        with col_e1:
+            table = st.selectbox("Table", EXPORT_TABLES, index=EXPORT_TABLES.index(table))
+        with col_e2:
+            fmt = st.selectbox("Format", AVAILABLE_FORMATS)
+        with col_e3:
+            since = st.text_input("Since", placeholder="2025-01")
+        with col_e4:
+            until = st.text_input("Until", placeholder="2025-12-31")
+        if st.form_submit_button("📤 Prepare export"):
+            path = os.path.join(EXPORT_DIR, f"{wallet_pod_key(wallet_address)}-{table}.{fmt}")
+            rows = EXPORTER.rows(table, wallet_address, since.strip() or None, until.strip() or None)
+            st.session_state.export = (path, table, fmt, export_file(rows, path, table, fmt))
+    ready = st.session_state.get("export")
+    if ready and os.path.exists(ready[0]):
+        path, table, fmt, count = ready
+        with open(path, "rb") as f:
+            st.download_button(
+                f"⬇️ {table}.{fmt} ({count:,} rows)", f, file_name=f"morphire-{table}.{fmt}", mime=MIME_TYPES[fmt],
+            )
 
-        st.divider()
+@functools.lru_cache(maxsize=None)
+def service_status_md():
+    """Webhook / IPFS indicators; both are fixed for the process lifetime."""
+    lines = []
+    if DISCORD_WEBHOOK_URL:
+        lines.append("🟢 Discord Webhook **Active**")
+    else:
+        lines.append("🔴 Discord Webhook **Not Set**  \n*Set `MORPHIRE_DISCORD_WEBHOOK` env var*")
+    if not IPFS_SIMULATION:
+        lines.append("🟢 Pinata IPFS **Active**")
+    else:
+        lines.append("🟡 IPFS **Simulation Mode**")
+    return "\n\n".join(lines)
+
+
+def render_navigation(current_wallet):
+    """Sidebar header and page picker; changing page is a full rerun."""
+    st.markdown("# 🐾 Morphire.ai")
+    st.markdown("**Privacy-First Work Platform**")
+    st.markdown(f"🔑 `{current_wallet[:6]}...{current_wallet[-4:]}`")
+    if st.button("🔌 Disconnect"):
+        st.session_state.wallet_address = None
+        st.rerun()
+
+    st.divider()
+
+    page = st.radio("🧭 Navigation", PAGES, label_visibility="collapsed")
+
+    st.divider()
+    return page
+
+
+@fragment(run_every=SIDEBAR_REFRESH_S)
+def sidebar_status(current_wallet):
+    """Quick stats and status; refreshes on its own, without rerunning the page."""
+    with rerun("sidebar"):
+        data = load_sections(current_wallet, "meta", "stats")
 
         # Quick stats
-        my_jobs_count = len(data["jobs"])
-        total_skr = sum(j.get("reward_skr", 0) for j in data["jobs"])
+        my_jobs_count = data["stats"]["jobs"]["count"]
+        total_skr = data["stats"]["jobs"]["reward_skr"]
 
         st.metric("My Active Jobs", my_jobs_count)
         st.metric("Potential Earnings", f"🪙 {total_skr:,}")
 
         st.divider()
-
-        # Webhook status indicator
-        if DISCORD_WEBHOOK_URL:
-            st.markdown("🟢 Discord Webhook **Active**")
-        else:
-            st.markdown("🔴 Discord Webhook **Not Set**")
-            st.caption("Set `MORPHIRE_DISCORD_WEBHOOK` env var")
-
-        if not IPFS_SIMULATION:
-            st.markdown("🟢 Pinata IPFS **Active**")
-        else:
-            st.markdown("🟡 IPFS **Simulation Mode**")
+        st.markdown(service_status_md())
 
         st.divider()
         st.caption(f"v{data['meta']['version']}")
         st.caption(f"Last update: {data['meta']['lastUpdated'][:19]}")
+        cache_stats = POD_CACHE.stats()
+        st.caption(f"Pod cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+        timings = describe(RERUN_STATS.summary(), "app")
+        if timings:
+            st.caption(f"Rerun: {timings}")
 
 
+def main():
+    st.set_page_config(
+        page_title="🐾 Morphire.ai",
+        page_icon="🐾",
+        layout="wide",
+        initial_sidebar_state="expanded",
+    )
+    with rerun("app") as run:
+        with run.section("css"):
+            inject_custom_css()
+        show_flash()
+
+        with run.section("auth"):
+            # 1. Password Protection, 2. Wallet Authentication
+            if not (check_password() and wallet_auth()):
+                return
+
+        # 3. Wallet-specific sidebar and page (each loads the pod via POD_CACHE)
+        current_wallet = st.session_state.wallet_address
+        with st.sidebar:
+            with run.section("nav"):
+                page = render_navigation(current_wallet)
+            sidebar_status(current_wallet)
+        render_page(page, current_wallet)
+
+
+@fragment
+def render_page(page, current_wallet):
+    """The selected page; widgets on it rerun only this fragment."""
+    with rerun("page"):
+        sections = PAGE_SECTIONS.get(page)
+        data = load_sections(current_wallet, *sections) if sections else load_data(current_wallet)
+        _render_page(page, current_wallet, data)
+
+
+def _render_page(page, current_wallet, data):
     # ═══════════════════════════════════════════════
     # 🏠 DASHBOARD
     # ═══════════════════════════════════════════════
@@ -534,27 +834,51 @@ def main():
         if not data["jobs"]:
             st.info("🐾 まだジョブ履歴がありません。「Post a Job」で依頼するか、他の人のジョブに参加しよう！")
         else:
-            for job in data["jobs"]:
-                status = job.get("status", "pending")
-                emoji = STATUS_EMOJI.get(status, "❓")
-                color = STATUS_COLORS.get(status, "#999")
-
-                st.markdown(
-                    f"""
-                <div class="job-card">
-                    <div style="display:flex; justify-content:space-between; align-items:center;">
-                        <h3 style="margin:0; font-size:1.2em;">{job['title']}</h3>
-                        <span class="status-badge" style="background:{color};">{emoji} {status.upper()}</span>
-                    </div>
-                    <p style="color:rgba(255,255,255,0.7); margin:8px 0;">{job.get('description', 'No description')}</p>
-                    <div style="display:flex; gap:20px; color:rgba(255,255,255,0.5); font-size:0.9em;">
-                        <span>🪙 {job.get('reward_skr', '?')} SKR</span>
-                        <span>🏷️ {job.get('role', 'Unknown Role')}</span>
-                    </div>
-                </div>
-                """,
-                    unsafe_allow_html=True,
-                )
+            col_f1, col_f2, col_f3, col_f4, col_f5 = st.columns(5)
+            with col_f1:
+                status_filter = st.selectbox("Status", ["All"] + list(STATUS_EMOJI))
+            with col_f2:
+                role_filter = st.selectbox("Role", ["All", "recruiter", "agent"])
+            with col_f3:
+                tag_filter = st.text_input("Tag", placeholder="ai")
+            with col_f4:
+                sort_field = st.selectbox("Sort by", list(SORT_FIELDS))
+            with col_f5:
+                page_size = st.selectbox("Per page", PAGE_SIZES, index=1)
+
+            # Changing any filter starts over from the first page
+            view = (status_filter, role_filter, tag_filter.strip(), sort_field, page_size)
+            if st.session_state.get("dash_view") != view:
+                st.session_state.dash_view = view
+                st.session_state.dash_cursors = [None]
+
+            matching = filter_jobs(
+                data["jobs"],
+                status=None if status_filter == "All" else status_filter,
+                role=None if role_filter == "All" else role_filter,
+                tag=tag_filter.strip() or None,
+            )
+            visible_jobs, next_cursor = page_jobs(
+                matching,
+                sort=sort_field,
+                page_size=page_size,
+                cursor=st.session_state.dash_cursors[-1],
+            )
+            if not visible_jobs:
+                st.info("🐾 No jobs match these filters.")
+            st.markdown(render_cards(visible_jobs), unsafe_allow_html=True)
+
+            col_n1, col_n2, col_n3 = st.columns([1, 2, 1])
+            with col_n1:
+                if len(st.session_state.dash_cursors) > 1 and st.button("⬅️ Previous"):
+                    st.session_state.dash_cursors.pop()
+                    rerun_fragment()
+            with col_n2:
+                st.caption(f"Page {len(st.session_state.dash_cursors)}")
+            with col_n3:
+                if next_cursor is not None and st.button("Next ➡️"):
+                    st.session_state.dash_cursors.append(next_cursor)
+                    rerun_fragment()
 
     # ═══════════════════════════════════════════════
     # 📋 POST A JOB
@@ -587,25 +911,25 @@ def main():
                 if not title:
                     st.error("🐾 タイトルを入力してね！")
                 else:
-                    new_job = {
-                        "id": gen_id("MF"),
-                        "title": title,
-                        "description": description,
-                        "requirements": requirements,
-                        "reward_skr": reward_skr,
-                        "role": "recruiter", # I am the recruiter
-                        "posted_by": data["profile"]["name"],
-                        "posted_at": datetime.now(JST).isoformat(),
-                        "status": "pending",
-                        "tags": [t.strip() for t in tags_str.split(",") if t.strip()],
-                        "chat_history": [],
-                        "delivery_ipfs": [],
-                    }
-                    data["jobs"].append(new_job)
-                    save_data(data, current_wallet)
+                    new_job = post_job(data, current_wallet, title, description, requirements, reward_skr, tags_str.split(","))
                     st.success(f"🎉 Job posted! ID: {new_job['id']} — Saved to your private pod.")
                     st.balloons()
 
+        # Agents whose skills fit the open jobs (matching.py)
+        my_open_jobs = [j for j in data["jobs"] if is_open(j)]
+        if my_open_jobs:
+            st.markdown("### 🎯 Suggested agents")
+            for job in my_open_jobs[-5:]:
+                with st.expander(f"{job['title']} ({job['id']})"):
+                    suggested = MATCHER.agents_for(current_wallet, job["id"], 5)
+                    if not suggested:
+                        st.caption("🐾 No matching agents yet — tags and requirements help.")
+                    for agent in suggested:
+                        st.markdown(
+                            f"**{agent['name']}** — ⭐ {agent['credit_score']} · "
+                            f"{', '.join(agent['skills'])} · match {agent['score']:.2f}"
+                        )
+
     # ═══════════════════════════════════════════════
     # ⚙️ PROFILE SETTINGS
     # ═══════════════════════════════════════════════
@@ -618,10 +942,8 @@ def main():
             skills_str = st.text_input("Skills (comma separated)", value=", ".join(data["profile"].get("skills", [])))
             
             if st.form_submit_button("💾 Save Profile"):
-                data["profile"]["name"] = new_name
-                data["profile"]["bio"] = new_bio
-                data["profile"]["skills"] = [s.strip() for s in skills_str.split(",") if s.strip()]
-                save_data(data, current_wallet)
+                data = load_data(current_wallet)  # the page only read the profile
+                update_profile(data, current_wallet, new_name, new_bio, skills_str.split(","))
                 st.success("Profile updated!")
                 st.rerun()
 
@@ -629,42 +951,278 @@ def main():
     # For MVP simplicity, other tabs reuse basic logic
     # but strictly read/write to `data` (which is user-isolated)
     # ═══════════════════════════════════════════════
-    elif page in ["⚡ Task Manager", "💬 Task Chat", "📦 Delivery Box", "💰 Wallet & Payments"]:
+    elif page == "💬 Task Chat":
+        st.markdown("# 💬 Task Chat")
+        chat_jobs = [j for j in data["jobs"] if j.get("status") != "cancelled"]
+        if not chat_jobs:
+            st.info("🐾 No jobs to chat about yet.")
+        else:
+            job = chat_jobs[
+                st.selectbox(
+                    "Job",
+                    range(len(chat_jobs)),
+                    format_func=lambda i: f"{chat_jobs[i]['title']} ({chat_jobs[i]['id']})",
+                )
+            ]
+            chat, chat_key = job_chat(data, current_wallet)
+
+            # Only the newest messages are read; older ones load on demand
+            if st.session_state.get("chat_job") != job["id"]:
+                st.session_state.chat_job = job["id"]
+                st.session_state.chat_limit = CHAT_PAGE_SIZE
+            messages, older = chat.page(chat_key, job["id"], limit=st.session_state.chat_limit)
+            if older is not None and st.button("⬆️ Load older messages"):
+                st.session_state.chat_limit += CHAT_PAGE_SIZE
+                rerun_fragment()
+
+            my_name = data["profile"]["name"]
+            for message in messages:
+                side = "right" if message.get("sender") == my_name else "left"
+                st.markdown(
+                    f'''<div class="chat-bubble chat-bubble-{side}">{html.escape(message.get("text", ""))}
+                    <div class="chat-meta">{html.escape(message.get("sender", "?"))} · {message.get("sent_at", "")[:16]}</div></div>''',
+                    unsafe_allow_html=True,
+                )
+
+            with st.form("chat_form", clear_on_submit=True):
+                text = st.text_input("Message", placeholder="メッセージを入力...")
+                if st.form_submit_button("📨 Send") and text.strip():
+                    send_chat_message(data, current_wallet, job, text.strip())
+                    rerun_fragment()
+
+    elif page in ["⚡ Task Manager", "📦 Delivery Box"]:
         st.markdown(f"# {page}")
         st.info("🚧 This section works with your local data pod. (Detailed logic abbreviated for this MVP update)")
+
+        # Accepting a delivery starts the window after which the agent is paid automatically
+        active_jobs = [j for j in data["jobs"] if j.get("role") == "recruiter" and j.get("status") in ("pending", "in_progress", "hired")]
+        if page == "⚡ Task Manager" and active_jobs:
+            with st.form("accept_form", clear_on_submit=True):
+                job = active_jobs[
+                    st.selectbox(
+                        "Job",
+                        range(len(active_jobs)),
+                        format_func=lambda i: f"{active_jobs[i]['title']} ({active_jobs[i]['id']})",
+                    )
+                ]
+                agent_wallet = st.text_input("Agent Wallet Address")
+                st.caption(f"🐾 The agent is paid automatically {ACCEPT_WINDOW_H:.0f}h after acceptance (or sooner from 💰 Wallet & Payments).")
+                if st.form_submit_button("✅ Accept Delivery"):
+                    if len(agent_wallet.strip()) < 10 or agent_wallet.strip() == current_wallet:
+                        st.error("Invalid agent wallet address.")
+                    else:
+                        completed = dict(job, status="completed", completed_at=datetime.now(JST).isoformat(),
+                                         agent_wallet=agent_wallet.strip())
+                        replace_job(data, job["id"], completed)
+                        track_job_changed(data, job, completed)
+                        save_data(data, current_wallet, [job_updated(completed)])
+                        flash(f"✅ Delivery accepted: {job['title']}")
+                        st.rerun()
         
-        # Display raw job data for verification of data separation
-        st.json(data["jobs"])
-        
-        if page == "💰 Wallet & Payments":
-             st.markdown("### Wallet Info")
-             st.code(current_wallet)
-             st.markdown(f"**Total Transactions:** {len(data['transactions'])}")
+        # Rate the agent once a job is paid or completed (moves their credit score)
+        rateable_jobs = [j for j in data["jobs"] if rateable(j)]
+        if page == "⚡ Task Manager" and rateable_jobs:
+            with st.form("rate_form", clear_on_submit=True):
+                job = rateable_jobs[
+                    st.selectbox(
+                        "Job",
+                        range(len(rateable_jobs)),
+                        format_func=lambda i: f"{rateable_jobs[i]['title']} ({rateable_jobs[i]['id']})",
+                    )
+                ]
+                stars = st.slider("⭐ Stars", min_value=1, max_value=5, value=5)
+                if st.form_submit_button("⭐ Rate Agent"):
+                    rate_agent(data, current_wallet, job, stars)
+                    flash(f"⭐ Rated {stars}/5: {job['title']}")
+                    st.rerun()
+
+        # Every job of this pod (live and archived), as a file rather than on the page
+        st.caption(f"🐾 {len(data['jobs'])} live job(s) in your pod")
+        render_export(current_wallet, "deliveries" if page == "📦 Delivery Box" else "jobs")
+
+    # ═══════════════════════════════════════════════
+    # 💰 WALLET & PAYMENTS (ledger.py)
+    # ═══════════════════════════════════════════════
+    elif page == "💰 Wallet & Payments":
+        st.markdown("# 💰 Wallet & Payments")
+        LEDGER.maybe_settle(SETTLEMENT)  # a round is due every BATCH_SIZE payouts / BATCH_WINDOW_S
+        balances = LEDGER.wallet_balance(current_wallet)
+        col_b1, col_b2, col_b3 = st.columns(3)
+        col_b1.metric("Available", f"🪙 {balances['available']:,}")
+        col_b2.metric("In Escrow", f"🪙 {balances['escrowed']:,}")
+        col_b3.metric("Awaiting Settlement", f"🪙 {balances['pending_payout']:,}")
+        st.code(current_wallet)
+
+        if st.button(f"🪙 Faucet: +{FAUCET_SKR:,} SKR (Sim)"):
+            deposit = LEDGER.deposit(current_wallet, FAUCET_SKR, memo="faucet")
+            save_data(data, current_wallet, [pod_transaction(data, deposit, "deposit")])
+            flash(f"🪙 {FAUCET_SKR:,} SKR deposited")
+            st.rerun()
+
+        # Pay an agent for one of my jobs: escrow → payable → settled in a batch
+        payable_jobs = [j for j in data["jobs"] if j.get("role") == "recruiter" and j.get("status") not in ("paid", "cancelled")]
+        if payable_jobs:
+            with st.form("pay_form", clear_on_submit=True):
+                job = payable_jobs[
+                    st.selectbox(
+                        "Job",
+                        range(len(payable_jobs)),
+                        format_func=lambda i: f"{payable_jobs[i]['title']} ({payable_jobs[i]['id']}) — 🪙 {payable_jobs[i].get('reward_skr', 0)}",
+                    )
+                ]
+                agent_wallet = st.text_input("Agent Wallet Address")
+                if st.form_submit_button("💸 Pay Agent"):
+                    if len(agent_wallet.strip()) < 10 or agent_wallet.strip() == current_wallet:
+                        st.error("Invalid agent wallet address.")
+                    else:
+                        amount = job.get("reward_skr", 0) or 0
+                        try:
+                            # None if already released (a save that failed, or the scheduler's auto-pay)
+                            release = LEDGER.pay(current_wallet, job["id"], agent_wallet.strip(), amount)
+                        except InsufficientFunds:
+                            st.error(f"🐾 Not enough SKR: {amount:,} needed, {balances['available']:,} available.")
+                        else:
+                            paid = dict(job, status="paid", paid_at=datetime.now(JST).isoformat(), paid_to=agent_wallet.strip())
+                            replace_job(data, job["id"], paid)
+                            track_job_changed(data, job, paid)
+                            changes = [job_updated(paid)]
+                            if release is not None:
+                                changes.append(pod_transaction(data, release, "payout", job["id"], paid["paid_to"]))
+                            save_data(data, current_wallet, changes)
+                            LEDGER.maybe_settle(SETTLEMENT)
+                            flash(f"💸 Payment queued for settlement: {paid['reward_skr']:,} SKR")
+                            st.rerun()
+
+        st.markdown("### Ledger")
+        st.markdown(f"**Total Transactions:** {data['stats']['transactions']['count']}")
+        st.markdown(f"**Total Payouts:** 🪙 {data['stats']['total_payouts']:,} SKR")
+        for month, earned in sorted(data["stats"]["earnings_by_month"].items()):
+            st.markdown(f"- {month}: 🪙 {earned:,} SKR earned")
+        for entry in LEDGER.recent(current_wallet):
+            # This wallet's side of the posting, e.g. "wallet -100 · escrow +100"
+            mine = " · ".join(
+                f"{account.split(':')[0]} {amount:+,}"
+                for account, amount in entry["entries"]
+                if account.split(":")[1:2] == [current_wallet]
+            )
+            line = f"`{entry['kind']}` {mine}"
+            if entry["kind"] == "release":
+                line += " · ⏳ awaiting settlement" if LEDGER.payout_status(entry["id"]) == "pending" else " · ⛓️ settled"
+            elif entry["kind"] == "settle":
+                line += f" · ⛓️ `{entry['round']['signature'][:12]}…` slot {entry['round']['slot']}"
+            st.caption(line)
+        st.caption(f"{LEDGER.pending_count()} payout(s) waiting for the next settlement round")
+        render_export(current_wallet, "transactions")
+
+        # Settled jobs moved out of the pod (archive.py), read a page at a time
+        archived = data.get("archive", {})
+        if archived.get("count"):
+            st.markdown("### 📜 Job History")
+            st.caption(f"{archived['count']:,} archived job(s) · last archived {archived.get('archived_at', '?')[:10]}")
+            with st.form("history_search"):
+                col_h1, col_h2, col_h3 = st.columns([3, 1, 1])
+                with col_h1:
+                    history_query = st.text_input("Search history", placeholder="logo design")
+                with col_h2:
+                    history_status = st.selectbox("Status", ["", "paid", "completed", "cancelled"], format_func=lambda s: s or "any")
+                with col_h3:
+                    history_since = st.text_input("Since (YYYY-MM)", placeholder="2025-01")
+                if st.form_submit_button("🔍 Search"):
+                    st.session_state.history_cursors = [None]
+            cursors = st.session_state.setdefault("history_cursors", [None])
+            history_key = wallet_pod_key(current_wallet)
+            history_jobs, next_cursor = [], None
+            for cursor in cursors:
+                history_page, next_cursor = ARCHIVE.search(
+                    history_key, history_query, status=history_status or None,
+                    since=history_since.strip() or None, limit=HISTORY_PAGE_SIZE, cursor=cursor,
+                )
+                history_jobs += history_page
+            for job in history_jobs:
+                emoji = STATUS_EMOJI.get(job.get("status"), "•")
+                with st.expander(f"{emoji} {job['title']} — 🪙 {job.get('reward_skr', 0):,} · {job.get('role', '?')} · {archive_settled_at(job)[:10]}"):
+                    st.caption(job.get("description") or "")
+                    for delivery in job.get("delivery_ipfs", []):
+                        st.markdown(f"📦 `{delivery['filename']}` · `{delivery['ipfs_hash']}`")
+                    for message in job.get("chat_history", [])[-CHAT_PAGE_SIZE:]:
+                        st.caption(f"💬 **{message['sender']}**: {message['text']}")
+            if next_cursor is not None and st.button("⬇️ Older"):
+                cursors.append(next_cursor)
+                st.rerun()
 
     # ═══════════════════════════════════════════════
     # 🤝 My Jobs (As Agent) - Simulation
     # ═══════════════════════════════════════════════
     elif page == "🤝 My Jobs (As Agent)":
         st.markdown("# 🤝 Find & Join Jobs")
-        st.markdown("*(Simulating public job board fetching...)*")
-        
-        # In a real app, this would fetch from a central DB or chain.
-        # Here we just allow adding a "test job" to simulate being hired.
-        
+
+        def show_board_job(job, key_prefix):
+            col_j1, col_j2 = st.columns([4, 1])
+            with col_j1:
+                st.markdown(f"**{job['title']}** — 🪙 {job.get('reward_skr', '?')} SKR · by {job.get('posted_by', 'Unknown')}")
+                st.caption(job.get("description") or "")
+            with col_j2:
+                if find_job(data, job["id"]) is not None:
+                    st.caption("✅ Joined")
+                elif st.button("🤝 Join", key=f"{key_prefix}_{job['owner_wallet']}_{job['id']}"):
+                    join_job(data, current_wallet, job)
+                    st.rerun()
+
+        # Matched to the profile's skills (matching.py)
+        recommended = MATCHER.jobs_for(current_wallet, 5)
+        if recommended:
+            st.markdown("### ✨ Recommended for you")
+            for job in recommended:
+                show_board_job(job, "rec")
+            st.divider()
+
+        # Open jobs from every wallet, via the shared board index (board.py)
+        with st.form("board_search"):
+            col_s1, col_s2, col_s3, col_s4 = st.columns([3, 1, 1, 1])
+            with col_s1:
+                board_query = st.text_input("Search", placeholder="python scraper")
+            with col_s2:
+                board_tag = st.text_input("Tag", placeholder="ai", key="board_tag")
+            with col_s3:
+                min_reward = st.number_input("Min SKR", min_value=0, value=0, step=50)
+            with col_s4:
+                max_reward = st.number_input("Max SKR", min_value=0, value=0, step=50, help="0 = no limit")
+            searched = st.form_submit_button("🔍 Search")
+        if searched:
+            st.session_state.board_limit = 20
+
+        board_jobs = BOARD.search(
+            board_query,
+            tags=[board_tag.strip()] if board_tag.strip() else (),
+            min_reward=min_reward or None,
+            max_reward=max_reward or None,
+            exclude_wallet=current_wallet,
+            limit=st.session_state.get("board_limit", 20),
+        )
+        if not board_jobs:
+            st.info("🐾 No open jobs on the board match right now.")
+        for job in board_jobs:
+            show_board_job(job, "join")
+        if len(board_jobs) == st.session_state.get("board_limit", 20) and st.button("⬇️ Show more"):
+            st.session_state.board_limit = st.session_state.get("board_limit", 20) + 20
+            rerun_fragment()
+        st.divider()
+
+        # Jobs from outside Morphire can still be added by hand.
         if st.button("➕ Simulate: 'I got hired for a Python scripts job'"):
             job_sim = {
-                "id": gen_id("JOB"),
+                "id": new_job_id(data, "JOB"),
                 "title": "Automated Python Scraper",
                 "description": "Need a scraper for news sites.",
                 "reward_skr": 500,
                 "role": "agent",  # I am the agent
                 "status": "in_progress",
                 "posted_by": "External Client",
-                "chat_history": [],
                 "delivery_ipfs": []
             }
             data["jobs"].append(job_sim)
-            save_data(data, current_wallet)
+            track_job_added(data, job_sim)
+            save_data(data, current_wallet, [job_added(job_sim)])
             st.success("Added 'Automated Python Scraper' to your job list.")
             st.rerun()
 
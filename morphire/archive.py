@@ -0,0 +1,498 @@
+"""
+🐾 Morphire.ai — Archive tier for settled jobs.
+
+Paid, completed and cancelled jobs leave the live pod once they settled
+more than ARCHIVE_AFTER_DAYS ago, or once a wallet has more than
+ARCHIVE_KEEP of them (oldest first), so the pod every rerun loads stays
+small however long the wallet has been active. Jobs still waiting for
+an auto-payment (lifecycle.py) stay put. Each archiving run writes
+immutable, compressed JSONL segments, partitioned by settlement month,
+with the jobs' chat and deliveries inside:
+
+    <data dir>/archive/<pod key>/2025-03/seg-<ulid>.jsonl.gz   (.zst with zstandard)
+    <data dir>/archive/<pod key>/index.jsonl                   (one line per segment)
+
+The pod keeps a summary in `data["archive"]`, including the archived
+jobs' share of the stats, so stats.py totals (payouts, earnings by
+month) still count them. History views read segments lazily, newest
+month first, through `Archive.iter_jobs` / `search` / `find`.
+
+A segment is written first, then the jobs are removed from the pod
+(compare-and-swap; a concurrent save means retrying on the next pass),
+and only then is the segment listed in the index. A crash in between
+is sorted out on the wallet's next pass.
+
+    python morphire/archive.py run|once [DATA_DIR]
+
+or set MORPHIRE_SCHEDULER=1 to run it on a thread inside the app.
+"""
+
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from board import get_board
+from chatstore import get_chat_store
+from ids import new_ulid
+from ledger import JST
+from lifecycle import deadlines, get_queue
+from placement import get_placement
+from stats import track_job_archived
+from storage import POD_CACHE, ConflictError, commit, get_store, job_removed, pod_key, pod_lock, section_set
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SETTLED = ("paid", "completed", "cancelled")
+ARCHIVE_AFTER_DAYS = float(os.environ.get("MORPHIRE_ARCHIVE_AFTER_DAYS", "30"))
+# Settled jobs a pod keeps live at most, whatever their age
+ARCHIVE_KEEP = int(os.environ.get("MORPHIRE_ARCHIVE_KEEP", "100"))
+ARCHIVE_EVERY_S = float(os.environ.get("MORPHIRE_ARCHIVE_EVERY_S", "3600"))
+SEGMENT_CACHE = int(os.environ.get("MORPHIRE_ARCHIVE_SEGMENT_CACHE", "64"))
+PENDING = ".pending"
+ZSTD_LEVEL = 9
+GZIP_LEVEL = 6
+
+
+# ─── Policy ───
+def _epoch(stamp):
+    try:
+        return datetime.fromisoformat(stamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def settled_at(job):
+    """When the job reached its final status (ISO stamp, best effort)."""
+    return (
+        job.get("paid_at") or job.get("expired_at") or job.get("cancelled_at")
+        or job.get("completed_at") or job.get("posted_at") or ""
+    )
+
+
+def archivable(job):
+    """Settled for good: nothing is due for it any more (lifecycle.py)."""
+    return job.get("status") in SETTLED and not deadlines(job)
+
+
+def select(jobs, now, after_days=ARCHIVE_AFTER_DAYS, keep=ARCHIVE_KEEP):
+    """The jobs to archive: settled more than `after_days` ago, plus the
+    oldest settled ones beyond the newest `keep`."""
+    settled = sorted(
+        ((_epoch(settled_at(job)) or 0, job) for job in jobs if archivable(job)),
+        key=lambda pair: pair[0],
+    )
+    cutoff = now - after_days * 86400
+    n = max(len(settled) - keep, 0)
+    while n < len(settled) and settled[n][0] <= cutoff:
+        n += 1
+    return [job for _, job in settled[:n]]
+
+
+# ─── Segments ───
+def encode_segment(jobs):
+    """(bytes, suffix) of a segment: one job per line, compressed."""
+    raw = "".join(json.dumps(job, ensure_ascii=False, separators=(",", ":")) + "\n" for job in jobs).encode()
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), ".jsonl.zst"
+    return gzip.compress(raw, GZIP_LEVEL, mtime=0), ".jsonl.gz"
+
+
+def decode_segment(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("this archive segment is zstd-compressed: pip install zstandard")
+        raw = zstandard.ZstdDecompressor().decompress(raw)
+    else:
+        raw = gzip.decompress(raw)
+    return [json.loads(line) for line in raw.splitlines() if line]
+
+
+def segment_entry(name, month, jobs, nbytes):
+    """The index line for a segment of `jobs` (newest settled first)."""
+    statuses, roles = {}, {}
+    for job in jobs:
+        statuses[job.get("status")] = statuses.get(job.get("status"), 0) + 1
+        roles[job.get("role")] = roles.get(job.get("role"), 0) + 1
+    return {
+        "segment": name,
+        "month": month,
+        "count": len(jobs),
+        "bytes": nbytes,
+        "first": settled_at(jobs[-1]),
+        "last": settled_at(jobs[0]),
+        "statuses": statuses,
+        "roles": roles,
+        "ids": [job["id"] for job in jobs],
+    }
+
+
+def _text(job):
+    return " ".join([job.get("title") or "", job.get("description") or "", *(job.get("tags") or [])]).lower()
+
+
+class Archive:
+    """Every wallet's segments under `root`, read lazily.
+
+    Decoded segments are kept in a small LRU (they never change); treat
+    the jobs handed out as read-only.
+    """
+
+    def __init__(self, root, cache_size=SEGMENT_CACHE):
+        self.root = root
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._indexes = {}  # pod key -> (index size, entries, {job id: newest entry no})
+        self._segments = OrderedDict()  # segment path -> jobs
+
+    def _dir(self, key):
+        return os.path.join(self.root, key)
+
+    def _index(self, key):
+        path = os.path.join(self._dir(key), "index.jsonl")
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return [], {}
+        with self._lock:
+            cached = self._indexes.get(key)
+        if cached is not None and cached[0] == size:
+            return cached[1], cached[2]
+        entries = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # torn line from an interrupted append
+        newest = {job_id: no for no, entry in enumerate(entries) for job_id in entry["ids"]}
+        with self._lock:
+            self._indexes[key] = (size, entries, newest)
+        return entries, newest
+
+    def index(self, key):
+        """A wallet's segment entries, in the order they were archived."""
+        return self._index(key)[0]
+
+    def count(self, key):
+        entries, newest = self._index(key)
+        return len(newest)
+
+    def _jobs(self, key, entry):
+        path = os.path.join(self._dir(key), entry["segment"])
+        with self._lock:
+            jobs = self._segments.get(path)
+            if jobs is not None:
+                self._segments.move_to_end(path)
+                return jobs
+        try:
+            jobs = decode_segment(path)
+        except FileNotFoundError:
+            try:
+                jobs = decode_segment(path + PENDING)  # listed, not yet renamed (see publish)
+            except FileNotFoundError:
+                jobs = decode_segment(path)  # renamed in between
+        with self._lock:
+            self._segments[path] = jobs
+            while len(self._segments) > self.cache_size:
+                self._segments.popitem(last=False)
+        return jobs
+
+    # ─── Readers ───
+    def iter_jobs(self, key, status=None, role=None, since=None, until=None, start=None):
+        """Lazily yield (position, job), newest month first.
+
+        `since`/`until` are "YYYY-MM" months (inclusive), so whole
+        partitions are skipped unread, as are segments the index says
+        hold no job with `status`/`role`. `start` is a position yielded
+        earlier to resume from. A job archived twice comes out once, in
+        its newest copy.
+        """
+        entries, newest = self._index(key)
+        order = sorted(range(len(entries)), key=lambda no: (entries[no]["month"], no), reverse=True)
+        for no in order:
+            entry = entries[no]
+            month = entry["month"]
+            if start is not None and (month, no) > (start[0], start[1]):
+                continue
+            if (since and month < since) or (until and month > until):
+                continue
+            if (status and not entry["statuses"].get(status)) or (role and not entry["roles"].get(role)):
+                continue
+            first = start[2] if start is not None and (month, no) == (start[0], start[1]) else 0
+            jobs = self._jobs(key, entry)
+            for line in range(first, len(jobs)):
+                job = jobs[line]
+                if newest.get(job["id"]) != no:
+                    continue
+                if (status and job.get("status") != status) or (role and job.get("role") != role):
+                    continue
+                yield (month, no, line), job
+
+    def search(self, key, query="", status=None, role=None, since=None, until=None, limit=20, cursor=None):
+        """Up to `limit` archived jobs with every word of `query` in their
+        title, description or tags, newest first.
+
+        Returns (jobs, cursor); pass the cursor back for the next page
+        (None once there are no more).
+        """
+        words = query.lower().split()
+        found = []
+        for position, job in self.iter_jobs(key, status, role, since, until, start=cursor):
+            if words and not all(word in _text(job) for word in words):
+                continue
+            if len(found) == limit:
+                return found, position
+            found.append(job)
+        return found, None
+
+    def find(self, key, job_id):
+        """The archived copy of one job, or None (reads one segment)."""
+        entries, newest = self._index(key)
+        no = newest.get(job_id)
+        if no is None:
+            return None
+        return next((job for job in self._jobs(key, entries[no]) if job["id"] == job_id), None)
+
+    # ─── Writers (used by Archiver) ───
+    def stage(self, key, jobs):
+        """Write `jobs` as new segments, one per settlement month, that
+        nothing reads until `publish`; returns [(entry, path)]."""
+        by_month = {}
+        for job in jobs:
+            by_month.setdefault(settled_at(job)[:7] or "0000-00", []).append(job)
+        staged = []
+        for month, batch in sorted(by_month.items()):
+            batch.sort(key=settled_at, reverse=True)
+            raw, suffix = encode_segment(batch)
+            name = f"{month}/seg-{new_ulid()}{suffix}"
+            path = os.path.join(self._dir(key), name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + PENDING, "wb") as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            staged.append((segment_entry(name, month, batch, len(raw)), path))
+        return staged
+
+    def publish(self, key, staged):
+        """List staged segments in the index, then give them their final name."""
+        if not staged:
+            return
+        index_path = os.path.join(self._dir(key), "index.jsonl")
+        with self._lock, open(index_path, "ab") as f:
+            if f.tell() and not _ends_with_newline(index_path):
+                f.write(b"\n")  # after a torn append
+            for entry, _ in staged:
+                f.write(json.dumps(entry, ensure_ascii=False).encode() + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        for _, path in staged:
+            os.replace(path + PENDING, path)
+
+    def discard(self, staged):
+        for _, path in staged:
+            try:
+                os.remove(path + PENDING)
+            except FileNotFoundError:
+                pass
+
+    def recover(self, key, data):
+        """Settle segments left staged by a crash: published if their jobs
+        are gone from the pod (the commit happened), deleted otherwise."""
+        wallet_dir = self._dir(key)
+        try:
+            months = [name for name in os.listdir(wallet_dir) if os.path.isdir(os.path.join(wallet_dir, name))]
+        except FileNotFoundError:
+            return 0
+        live = {job.get("id") for job in data.get("jobs", [])}
+        listed = {entry["segment"] for entry in self.index(key)}
+        recovered = 0
+        for month in months:
+            for name in os.listdir(os.path.join(wallet_dir, month)):
+                if not name.endswith(PENDING):
+                    continue
+                segment = f"{month}/{name[:-len(PENDING)]}"
+                path = os.path.join(wallet_dir, segment)
+                jobs = decode_segment(path + PENDING)
+                staged = [(segment_entry(segment, month, jobs, os.path.getsize(path + PENDING)), path)]
+                if any(job["id"] in live for job in jobs):
+                    self.discard(staged)
+                elif segment in listed:
+                    os.replace(path + PENDING, path)
+                else:
+                    self.publish(key, staged)
+                recovered += 1
+        return recovered
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+_archives = {}
+_archives_guard = threading.Lock()
+
+
+def get_archive(root):
+    """Process-wide Archive for `root`."""
+    with _archives_guard:
+        if root not in _archives:
+            _archives[root] = Archive(root)
+        return _archives[root]
+
+
+# ─── Archiver ───
+def _pod_changed(data):
+    # on_merge for commit: never merge onto a pod saved meanwhile (its
+    # jobs may have changed since they were copied); retry next pass
+    raise ConflictError(f"{data['meta'].get('owner_wallet')} was saved while archiving")
+
+
+class Archiver:
+    """Moves settled jobs out of every pod under `data_dir`."""
+
+    def __init__(self, data_dir, store=None, after_days=ARCHIVE_AFTER_DAYS, keep=ARCHIVE_KEEP):
+        self.data_dir = data_dir
+        self.store = store or get_store()
+        self.after_days = after_days
+        self.keep = keep
+        self.archive = get_archive(os.path.join(data_dir, "archive"))
+        self.chat = get_chat_store(os.path.join(data_dir, "chat"))
+        self.board = get_board(os.path.join(data_dir, "board", "board.jsonl"))
+        self.queue = get_queue(os.path.join(data_dir, "lifecycle", "queue.jsonl"))
+        self.archived = 0
+        self.conflicts = 0
+        self.chats_kept = 0  # chat logs left in place because they grew while archiving
+
+    def _has_settled(self, path):
+        """False when the pod's stats show no settled job left live."""
+        if not hasattr(self.store, "load_sections"):
+            return True
+        sections = self.store.load_sections(path, ("stats", "archive")) or {}
+        if "stats" not in sections:
+            return True
+        archived = sections.get("archive", {}).get("stats", {}).get("jobs", {}).get("by_status", {})
+        by_status = sections["stats"]["jobs"]["by_status"]
+        return any(
+            by_status.get(status, {}).get("count", 0) > archived.get(status, {}).get("count", 0)
+            for status in SETTLED
+        )
+
+    def archive_pod(self, path, now=None):
+        """Archive one pod's due jobs; returns how many moved."""
+        now = time.time() if now is None else now
+        key = pod_key(path)
+        data = self.store.load(path)
+        if data is None:
+            return 0
+        self.archive.recover(key, data)
+        jobs = select(data.get("jobs", []), now, self.after_days, self.keep)
+        if not jobs:
+            return 0
+        # Chat leaves the chat store with the job (pods that predate it
+        # still carry an embedded chat_history)
+        records, snapshot = [], {}
+        for job in jobs:
+            messages = self.chat.messages(key, job["id"])
+            snapshot[job["id"]] = len(messages)
+            records.append(dict(job, chat_history=messages) if messages else job)
+        staged = self.archive.stage(key, records)
+        summary = data.setdefault("archive", {})
+        replaced = 0
+        for job in jobs:
+            previous = self.archive.find(key, job["id"])  # saved again after being archived
+            replaced += previous is not None
+            track_job_archived(data, job, previous)
+        summary["count"] = summary.get("count", 0) + len(jobs) - replaced
+        summary["segments"] = summary.get("segments", 0) + len(staged)
+        summary["bytes"] = summary.get("bytes", 0) + sum(entry["bytes"] for entry, _ in staged)
+        summary["archived_at"] = datetime.fromtimestamp(now, JST).isoformat()
+        gone = {job["id"] for job in jobs}
+        data["jobs"] = [job for job in data["jobs"] if job.get("id") not in gone]
+        changes = [job_removed(job["id"]) for job in jobs]
+        changes += [section_set("archive", summary), section_set("stats", data["stats"])]
+        try:
+            commit(self.store, path, data, changes, on_merge=_pod_changed)
+        except ConflictError:
+            self.archive.discard(staged)
+            self.conflicts += 1
+            return 0
+        self.archive.publish(key, staged)
+        for job in jobs:
+            # Messages sent since the snapshot never reached the segment: keep the log
+            if not self.chat.drop(key, job["id"], expected=snapshot[job["id"]]):
+                self.chats_kept += 1
+        POD_CACHE.invalidate(path)
+        self.board.sync_pod(data, changes)
+        self.queue.sync_pod(data, changes, path)
+        return len(jobs)
+
+    def run_once(self, now=None):
+        """One pass over every pod; returns how many jobs were archived."""
+        moved = 0
+        for path in get_placement(self.data_dir, self.store).pod_paths():
+            if self._has_settled(path):
+                moved += self.archive_pod(path, now)
+        self.store.flush()
+        self.archived += moved
+        return moved
+
+    def exclusive(self):
+        """Lock held by the one archiver per data dir (staged segments of
+        another would look like leftovers from a crash)."""
+        os.makedirs(self.archive.root, exist_ok=True)
+        return pod_lock(os.path.join(self.archive.root, "archiver"))
+
+    def run(self, stop=None):
+        """Loop until `stop` is set."""
+        stop = stop or threading.Event()
+        with self.exclusive():
+            while not stop.is_set():
+                self.run_once()
+                stop.wait(ARCHIVE_EVERY_S)
+
+
+_background = None
+_background_guard = threading.Lock()
+
+
+def start_background(data_dir):
+    """Run the archiver on a daemon thread (once per process)."""
+    global _background
+    with _background_guard:
+        if _background is None:
+            _background = threading.Thread(target=Archiver(data_dir).run, daemon=True, name="morphire-archive")
+            _background.start()
+        return _background
+
+
+# ─── CLI ───
+def main(argv):
+    if not argv or argv[0] not in ("run", "once"):
+        print("usage: python morphire/archive.py run|once [DATA_DIR]")
+        return 2
+    data_dir = argv[1] if len(argv) > 1 else os.path.join(os.path.dirname(__file__), "data_store")
+    archiver = Archiver(data_dir)
+    if argv[0] == "run":
+        archiver.run()
+        return 0
+    with archiver.exclusive():
+        moved = archiver.run_once()
+    print(f"🐾 {moved} job(s) archived ({archiver.conflicts} pod(s) busy, retried next pass)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
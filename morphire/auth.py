@@ -0,0 +1,516 @@
+"""
+🐾 Morphire.ai — Wallet sign-in.
+
+A Solana wallet signs in by signing a one-time login message with its
+Ed25519 key (Phantom's `signMessage`, `solana sign-offchain-message`):
+
+    morphire.ai wants you to sign in with your Solana account:
+    <address>
+
+    Nonce: <nonce>
+    Issued At: <time>
+
+The address is the base58 public key and the signature is pasted back
+as base58 (or hex). Nonces are one-time and expire after NONCE_TTL_S;
+the NonceCache holds at most NONCE_CACHE_SIZE of them, oldest dropped
+first. A verified wallet gets a session token (HMAC-SHA256, valid
+TOKEN_TTL_S) that later reruns and API calls check instead of a
+signature. Tokens are signed with MORPHIRE_AUTH_SECRET, or with a key
+kept in `<data dir>/auth/secret.key` so every process accepts them.
+
+Signatures are checked with PyNaCl (libsodium) when it is installed and
+with the pure-Python RFC 8032 code below otherwise. `login_batch`
+checks a burst of logins with one multi-scalar multiplication (a random
+linear combination of the verification equations), then one by one
+only if the batch fails, to find the bad signatures.
+"""
+
+import base64
+import functools
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+try:
+    import nacl.exceptions
+    import nacl.signing
+except ImportError:
+    nacl = None
+
+JST = timezone(timedelta(hours=9))
+NONCE_TTL_S = int(os.environ.get("MORPHIRE_NONCE_TTL_S", "300"))
+NONCE_CACHE_SIZE = int(os.environ.get("MORPHIRE_NONCE_CACHE_SIZE", "100000"))
+TOKEN_TTL_S = int(os.environ.get("MORPHIRE_TOKEN_TTL_S", "900"))
+LOGIN_HEADER = "morphire.ai wants you to sign in with your Solana account:"
+
+
+class AuthError(ValueError):
+    pass
+
+
+# ─── Base58 (Solana addresses and signatures) ───
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {c: i for i, c in enumerate(B58_ALPHABET)}
+
+
+def b58encode(raw):
+    n = int.from_bytes(raw, "big")
+    out = []
+    while n:
+        n, rem = divmod(n, 58)
+        out.append(B58_ALPHABET[rem])
+    pad = len(raw) - len(raw.lstrip(b"\0"))
+    return "1" * pad + "".join(reversed(out))
+
+
+def b58decode(text):
+    n = 0
+    for c in text:
+        if c not in _B58_INDEX:
+            raise AuthError(f"{c!r} is not a base58 character")
+        n = n * 58 + _B58_INDEX[c]
+    pad = len(text) - len(text.lstrip("1"))
+    return b"\0" * pad + (n.to_bytes((n.bit_length() + 7) // 8, "big") if n else b"")
+
+
+def decode_address(address):
+    """The 32-byte public key of a Solana address (AuthError if it is not one)."""
+    raw = b58decode(address.strip())
+    if len(raw) != 32:
+        raise AuthError("a Solana address is 32 bytes of base58")
+    return raw
+
+
+def decode_signature(text):
+    text = text.strip()
+    if len(text) == 128:
+        try:
+            return bytes.fromhex(text)
+        except ValueError:
+            pass
+    raw = b58decode(text)
+    if len(raw) != 64:
+        raise AuthError("an Ed25519 signature is 64 bytes")
+    return raw
+
+
+# ─── Ed25519 (RFC 8032) ───
+# Points are extended coordinates (X, Y, Z, T) on -x² + y² = 1 + d·x²·y²;
+# the addition formulas are complete, so doubling and the identity need
+# no special cases.
+P = 2 ** 255 - 19
+L = 2 ** 252 + 27742317777372353535851937790883648493
+D = -121665 * pow(121666, -1, P) % P
+D2 = 2 * D % P
+SQRT_M1 = pow(2, (P - 1) // 4, P)
+IDENTITY = (0, 1, 1, 0)
+
+
+def _add(p1, p2):
+    x1, y1, z1, t1 = p1
+    x2, y2, z2, t2 = p2
+    a = (y1 - x1) * (y2 - x2) % P
+    b = (y1 + x1) * (y2 + x2) % P
+    c = t1 * t2 % P * D2 % P
+    d = 2 * z1 * z2 % P
+    e, f, g, h = b - a, d - c, d + c, b + a
+    return e * f % P, g * h % P, f * g % P, e * h % P
+
+
+def _double(p1):
+    x1, y1, z1, _ = p1
+    a = x1 * x1 % P
+    b = y1 * y1 % P
+    c = 2 * z1 * z1 % P
+    h = a + b
+    e = h - (x1 + y1) * (x1 + y1) % P
+    g = a - b
+    f = c + g
+    return e * f % P, g * h % P, f * g % P, e * h % P
+
+
+def _neg(p1):
+    x1, y1, z1, t1 = p1
+    return (P - x1) % P, y1, z1, (P - t1) % P
+
+
+def _is_identity(p1):
+    x1, y1, z1, _ = p1
+    return x1 % P == 0 and (y1 - z1) % P == 0
+
+
+def _mul8(p1):
+    return _double(_double(_double(p1)))
+
+
+def _recover_x(y, sign):
+    x2 = (y * y - 1) * pow(D * y * y + 1, -1, P) % P
+    if x2 == 0:
+        return None if sign else 0
+    x = pow(x2, (P + 3) // 8, P)
+    if (x * x - x2) % P:
+        x = x * SQRT_M1 % P
+    if (x * x - x2) % P:
+        return None
+    if (x & 1) != sign:
+        x = P - x
+    return x
+
+
+def decompress(raw):
+    """The point encoded in 32 bytes, or None if it is not on the curve."""
+    if len(raw) != 32:
+        return None
+    y = int.from_bytes(raw, "little")
+    sign = y >> 255
+    y &= (1 << 255) - 1
+    if y >= P:
+        return None
+    x = _recover_x(y, sign)
+    if x is None:
+        return None
+    return x, y, 1, x * y % P
+
+
+def compress(p1):
+    x1, y1, z1, _ = p1
+    z_inv = pow(z1, -1, P)
+    x, y = x1 * z_inv % P, y1 * z_inv % P
+    return (y | ((x & 1) << 255)).to_bytes(32, "little")
+
+
+_BY = 4 * pow(5, -1, P) % P
+_BX = _recover_x(_BY, 0)
+BASE = (_BX, _BY, 1, _BX * _BY % P)
+_base_table = []  # [i][j] = j·16^i·B, built on first use
+_base_table_guard = threading.Lock()
+
+
+def _base_mul(scalar):
+    """scalar·B from a precomputed table: one addition per 4 bits."""
+    if not _base_table:
+        with _base_table_guard:
+            if not _base_table:
+                rows = []
+                point = BASE
+                for _ in range(64):
+                    row = [IDENTITY]
+                    for _ in range(15):
+                        row.append(_add(row[-1], point))
+                    rows.append(row)
+                    point = _add(row[-1], point)
+                _base_table.extend(rows)
+    q = IDENTITY
+    for i in range(64):
+        nibble = (scalar >> (4 * i)) & 15
+        if nibble:
+            q = _add(q, _base_table[i][nibble])
+    return q
+
+
+def _mul(scalar, p1):
+    """scalar·p1 with a 4-bit window."""
+    row = [IDENTITY, p1]
+    for _ in range(14):
+        row.append(_add(row[-1], p1))
+    q = IDENTITY
+    for shift in range((scalar.bit_length() + 3) // 4 * 4 - 4, -4, -4):
+        q = _double(_double(_double(_double(q))))
+        nibble = (scalar >> shift) & 15
+        if nibble:
+            q = _add(q, row[nibble])
+    return q
+
+
+def _msm(scalars, points):
+    """Σ scalar·point with Pippenger's bucket method."""
+    n = len(points)
+    c = 4 if n < 32 else 5 if n < 128 else 6 if n < 512 else 7
+    bits = max(s.bit_length() for s in scalars)
+    mask = (1 << c) - 1
+    q = IDENTITY
+    for shift in range((bits + c - 1) // c * c - c, -c, -c):
+        for _ in range(c):
+            q = _double(q)
+        buckets = [None] * (mask + 1)
+        for s, point in zip(scalars, points):
+            digit = (s >> shift) & mask
+            if digit:
+                bucket = buckets[digit]
+                buckets[digit] = point if bucket is None else _add(bucket, point)
+        running = total = IDENTITY
+        for digit in range(mask, 0, -1):
+            if buckets[digit] is not None:
+                running = _add(running, buckets[digit])
+            total = _add(total, running)
+        q = _add(q, total)
+    return q
+
+
+def _hash_scalar(*parts):
+    return int.from_bytes(hashlib.sha512(b"".join(parts)).digest(), "little") % L
+
+
+def _expand(seed):
+    h = hashlib.sha512(seed).digest()
+    a = int.from_bytes(h[:32], "little")
+    a &= (1 << 254) - 8
+    a |= 1 << 254
+    return a, h[32:]
+
+
+@functools.lru_cache(maxsize=65536)
+def _public_point(public_key):
+    """The decompressed key, or None if invalid or of small order."""
+    point = decompress(public_key)
+    if point is None or _is_identity(_mul8(point)):
+        return None
+    return point
+
+
+def generate_keypair(seed=None):
+    """(seed, public key) for a new wallet: local tests and the demo wallet."""
+    seed = secrets.token_bytes(32) if seed is None else seed
+    if nacl is not None:
+        return seed, bytes(nacl.signing.SigningKey(seed).verify_key)
+    return seed, compress(_base_mul(_expand(seed)[0]))
+
+
+def sign(seed, message):
+    """The 64-byte Ed25519 signature of `message` by the key `seed`."""
+    if nacl is not None:
+        return nacl.signing.SigningKey(seed).sign(message).signature
+    a, prefix = _expand(seed)
+    public_key = compress(_base_mul(a))
+    r = _hash_scalar(prefix, message)
+    r_bytes = compress(_base_mul(r))
+    s = (r + _hash_scalar(r_bytes, public_key, message) * a) % L
+    return r_bytes + s.to_bytes(32, "little")
+
+
+def _parse(public_key, message, signature):
+    """(A, R, S, k) for the verification equation, or None if malformed."""
+    if len(signature) != 64:
+        return None
+    a_point = _public_point(public_key)
+    r_point = decompress(signature[:32])
+    s = int.from_bytes(signature[32:], "little")
+    if a_point is None or r_point is None or s >= L:
+        return None
+    return a_point, r_point, s, _hash_scalar(signature[:32], public_key, message)
+
+
+def verify(public_key, message, signature):
+    """True if `signature` is a valid signature of `message` by `public_key`."""
+    if nacl is not None:
+        try:
+            nacl.signing.VerifyKey(public_key).verify(message, signature)
+            return True
+        except (nacl.exceptions.BadSignatureError, ValueError, TypeError):
+            return False
+    parsed = _parse(public_key, message, signature)
+    if parsed is None:
+        return False
+    a_point, r_point, s, k = parsed
+    # [8]([S]B - [k]A - R) == identity (cofactored, as in verify_batch)
+    check = _add(_base_mul(s), _neg(_add(_mul(k, a_point), r_point)))
+    return _is_identity(_mul8(check))
+
+
+def verify_batch(items):
+    """[bool] for a list of (public key, message, signature).
+
+    Checks Σ z·R + Σ (z·k)·A - (Σ z·S)·B == identity for random 128-bit
+    z in one multi-scalar multiplication; if that fails the items are
+    checked one by one.
+    """
+    if nacl is not None or len(items) < 2:
+        return [verify(*item) for item in items]
+    parsed = [_parse(*item) for item in items]
+    if None in parsed:
+        return [p is not None and verify(*item) for p, item in zip(parsed, items)]
+    scalars, points = [], []
+    s_sum = 0
+    for a_point, r_point, s, k in parsed:
+        z = secrets.randbits(128) | 1
+        scalars += [z, z * k % L]
+        points += [r_point, a_point]
+        s_sum += z * s
+    check = _add(_msm(scalars, points), _neg(_base_mul(s_sum % L)))
+    if _is_identity(_mul8(check)):
+        return [True] * len(items)
+    return [verify(*item) for item in items]
+
+
+# ─── Nonces ───
+class NonceCache:
+    """Outstanding login nonces: one-time, expiring, at most `max_size`."""
+
+    def __init__(self, max_size=NONCE_CACHE_SIZE, ttl=NONCE_TTL_S):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._nonces = OrderedDict()  # nonce -> (wallet, message, expires_at), oldest first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._nonces)
+
+    def _expire(self, now):
+        while self._nonces:
+            nonce, (_, _, expires_at) = next(iter(self._nonces.items()))
+            if expires_at > now and len(self._nonces) <= self.max_size:
+                break
+            del self._nonces[nonce]
+
+    def issue(self, wallet, now=None):
+        """(nonce, login message) for `wallet` to sign."""
+        now = time.time() if now is None else now
+        nonce = secrets.token_urlsafe(16)
+        issued_at = datetime.fromtimestamp(now, JST).isoformat(timespec="seconds")
+        message = f"{LOGIN_HEADER}\n{wallet}\n\nNonce: {nonce}\nIssued At: {issued_at}"
+        with self._lock:
+            self._nonces[nonce] = (wallet, message, now + self.ttl)
+            self._expire(now)
+        return nonce, message
+
+    def message(self, nonce, wallet, now=None):
+        """The login message of a live nonce issued to `wallet`, else None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._nonces.get(nonce)
+        if entry is None or entry[0] != wallet or entry[2] <= now:
+            return None
+        return entry[1]
+
+    def consume(self, nonce):
+        """Use up a nonce; False if it was already used (or dropped)."""
+        with self._lock:
+            return self._nonces.pop(nonce, None) is not None
+
+
+# ─── Session Tokens ───
+class TokenSigner:
+    """`<wallet>.<expiry>.<mac>` tokens, HMAC-SHA256 over wallet and expiry."""
+
+    def __init__(self, secret, ttl=TOKEN_TTL_S):
+        self.secret = secret
+        self.ttl = ttl
+
+    def _mac(self, payload):
+        digest = hmac.new(self.secret, payload.encode(), hashlib.sha256).digest()[:18]
+        return base64.urlsafe_b64encode(digest).decode()
+
+    def issue(self, wallet, now=None):
+        now = time.time() if now is None else now
+        payload = f"{wallet}.{int(now) + self.ttl}"
+        return f"{payload}.{self._mac(payload)}"
+
+    def check(self, token, now=None):
+        """(wallet, expires_at) of a valid, unexpired token, else None."""
+        payload, _, mac = (token or "").rpartition(".")
+        wallet, _, expires_at = payload.partition(".")
+        if not (wallet and expires_at.isdigit() and hmac.compare_digest(mac, self._mac(payload))):
+            return None
+        if int(expires_at) <= (time.time() if now is None else now):
+            return None
+        return wallet, int(expires_at)
+
+
+def load_secret(data_dir):
+    """MORPHIRE_AUTH_SECRET, else the data dir's key file (created once)."""
+    secret = os.environ.get("MORPHIRE_AUTH_SECRET")
+    if secret:
+        return secret.encode()
+    path = os.path.join(data_dir, "auth", "secret.key")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not os.path.exists(path):
+        # Written in full under a temp name, then linked into place: a
+        # process starting alongside never reads a half-written key
+        key = secrets.token_bytes(32)
+        tmp_path = f"{path}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(key)
+                f.flush()
+                os.fsync(f.fileno())
+            os.link(tmp_path, path)
+            return key
+        except FileExistsError:
+            pass  # another process linked its key first
+        finally:
+            os.remove(tmp_path)
+    with open(path, "rb") as f:
+        key = f.read()
+    if not key:
+        raise RuntimeError(f"{path} is empty: delete it to generate a new key")
+    return key
+
+
+# ─── Sign-in ───
+class WalletAuth:
+    """Challenge → signature → session token."""
+
+    def __init__(self, secret, nonces=None, ttl=TOKEN_TTL_S):
+        self.nonces = nonces or NonceCache()
+        self.tokens = TokenSigner(secret, ttl)
+
+    def challenge(self, wallet):
+        """(nonce, message) to sign; AuthError if `wallet` is not an address."""
+        decode_address(wallet)
+        return self.nonces.issue(wallet.strip())
+
+    def login(self, wallet, nonce, signature):
+        """A session token, or None if the signature or nonce is no good."""
+        return self.login_batch([(wallet, nonce, signature)])[0]
+
+    def login_batch(self, attempts):
+        """[token or None] for a burst of (wallet, nonce, signature)."""
+        now = time.time()
+        results = [None] * len(attempts)
+        checks = []
+        for i, (wallet, nonce, signature) in enumerate(attempts):
+            message = self.nonces.message(nonce, wallet, now)
+            try:
+                if message is not None:
+                    checks.append((i, (decode_address(wallet), message.encode(), decode_signature(signature))))
+            except AuthError:
+                pass
+        valid = verify_batch([item for _, item in checks])
+        for (i, _), ok in zip(checks, valid):
+            # The nonce is spent only by a good signature, and only once
+            if ok and self.nonces.consume(attempts[i][1]):
+                results[i] = self.tokens.issue(attempts[i][0], now)
+        return results
+
+    def session(self, token):
+        """The wallet a session token belongs to, or None."""
+        checked = self.tokens.check(token)
+        return None if checked is None else checked[0]
+
+    def refresh(self, token):
+        """The token, renewed once past half its life; None if invalid."""
+        checked = self.tokens.check(token)
+        if checked is None:
+            return None
+        wallet, expires_at = checked
+        if expires_at - time.time() < self.tokens.ttl / 2:
+            return self.tokens.issue(wallet)
+        return token
+
+
+_auths = {}
+_auths_guard = threading.Lock()
+
+
+def get_auth(data_dir):
+    """Process-wide WalletAuth for a data dir (its nonces are per process)."""
+    with _auths_guard:
+        if data_dir not in _auths:
+            _auths[data_dir] = WalletAuth(load_secret(data_dir))
+        return _auths[data_dir]
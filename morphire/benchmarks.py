@@ -0,0 +1,1636 @@
+"""
+🐾 Morphire.ai — Benchmarks.
+
+Run from the repo root:
+
+    python morphire/benchmarks.py            # every benchmark
+    python morphire/benchmarks.py storage    # just one
+    python morphire/benchmarks.py micro sessions --json before.json
+    python morphire/benchmarks.py compare before.json after.json
+
+`micro`, `sessions` and `api` drive app.py itself (they need Streamlit);
+the benchmarks that return numbers land in the --json file.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import storage
+
+
+def make_job(i):
+    """A realistic-looking job dict."""
+    return {
+        "id": f"MF-{i:06d}",
+        "title": f"Benchmark job #{i}",
+        "description": "Label 1,000 images of morphing cats for a vision model.",
+        "requirements": "Python, NLP, GPU",
+        "reward_skr": 100 + i % 900,
+        "role": "recruiter" if i % 3 else "agent",
+        "posted_by": "Bench Recruiter",
+        "posted_at": "2026-01-01T00:00:00+09:00",
+        "status": "pending",
+        "tags": ["ai", "data"],
+        "chat_history": [],
+        "delivery_ipfs": [],
+    }
+
+
+def make_transaction(i):
+    return {
+        "id": f"TX-{i:06d}",
+        "job_id": f"MF-{i:06d}",
+        "type": "payout",
+        "amount_skr": 100 + i % 900,
+        "tx_hash": f"5x{i:040x}...MorphireSim",
+        "created_at": "2026-01-01T00:00:00+09:00",
+    }
+
+
+def make_message(i, sender="Bench Agent"):
+    return {"sender": sender, "text": f"Progress update #{i}: 120 of 1,000 images labelled.",
+            "sent_at": "2026-01-01T00:00:00+09:00"}
+
+
+def make_pod(n_jobs, wallet="SoLBenchWallet", transactions=0):
+    return {
+        "meta": {
+            "version": "Morphire.ai v2.0 (Private)",
+            "owner_wallet": wallet,
+            "created_at": "2026-01-01T00:00:00+09:00",
+            "lastUpdated": "2026-01-01T00:00:00+09:00",
+            "totalPayouts": 0,
+        },
+        "jobs": [make_job(i) for i in range(n_jobs)],
+        "profile": {"name": "Bench Agent", "bio": "", "skills": [], "credit_score": 50},
+        "transactions": [make_transaction(i) for i in range(transactions)],
+    }
+
+
+def seed_wallet(app, wallet, jobs=100, messages=0, transactions=0):
+    """Write a synthetic pod for `wallet` where `app` looks for it.
+
+    `messages` chat messages go to the wallet's first job; returns the pod.
+    """
+    from chatstore import get_chat_store
+    from stats import ensure_stats
+
+    data = make_pod(jobs, wallet=wallet, transactions=transactions)
+    ensure_stats(data)
+    path = app.get_data_file_path(wallet)
+    app.STORE.save(path, data)
+    app.STORE.flush()
+    app.POD_CACHE.invalidate(path)
+    app.BOARD.sync_pod(data)
+    app.AGENTS.sync_pod(data)
+    if messages and jobs:
+        chat = get_chat_store(app.CHAT_DIR)
+        for i in range(messages):
+            chat.append(storage.pod_key(path), data["jobs"][0]["id"], make_message(i))
+    return data
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def latency(fn, repeat):
+    """{"p50_ms", "p95_ms", "max_ms"} of `fn()` over `repeat` calls."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples):
+    return {
+        "p50_ms": round(percentile(samples, 50), 4),
+        "p95_ms": round(percentile(samples, 95), 4),
+        "max_ms": round(max(samples), 4),
+    }
+
+
+def timed(fn, repeat):
+    """Median and max wall time of `fn()` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+# ─── Storage: save latency vs pod size ───
+def bench_storage(sizes=(10, 100, 1_000, 10_000, 100_000)):
+    """Cost of posting one job as the pod grows, legacy JSON vs journal."""
+    print(f"{'jobs':>8} | {'json save (ms)':>16} | {'journal save (ms)':>18} | {'journal load (ms)':>18}")
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    try:
+        for n in sizes:
+            results = {}
+            for name in ("json", "journal"):
+                store = storage.STORAGE_BACKENDS[name]()
+                path = os.path.join(tmp_dir, f"morphire-{name}-{n}.json")
+                data = make_pod(n)
+                store.save(path, data)
+                counter = [n]
+
+                def post_job():
+                    job = make_job(counter[0])
+                    counter[0] += 1
+                    data["jobs"].append(job)
+                    store.save(path, data, [storage.job_added(job)])
+
+                results[name] = timed(post_job, repeat=3 if name == "json" and n >= 10_000 else 20)
+                store.flush()
+                if name == "journal":
+                    results["load"] = timed(lambda: storage.JournalStore().load(path), repeat=3)
+            print(
+                f"{n:>8} | {results['json'][0]:>16.2f} | {results['journal'][0]:>18.2f} | {results['load'][0]:>18.2f}"
+            )
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── Pod cache: rerun load cost ───
+def bench_pod_cache(sizes=(100, 10_000, 100_000)):
+    """load_data cost on an unchanged pod: parse every time vs cached."""
+    print(f"{'jobs':>8} | {'uncached (ms)':>14} | {'cached (ms)':>12}")
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    try:
+        for n in sizes:
+            store = storage.JournalStore()
+            cache = storage.PodCache()
+            path = os.path.join(tmp_dir, f"morphire-cache-{n}.json")
+            store.save(path, make_pod(n))
+            cold = timed(lambda: store.load(path), repeat=3)
+            cache.load(path, store)
+            warm = timed(lambda: cache.load(path, store), repeat=20)
+            print(f"{n:>8} | {cold[0]:>14.2f} | {warm[0]:>12.3f}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── Webhook: page latency with a slow Discord ───
+class StubWebhook:
+    """Local stand-in for a Discord webhook that answers slowly.
+
+    The first `rate_limit_first` requests get a 429 with `retry_after`.
+    """
+
+    def __init__(self, delay=1.0, rate_limit_first=0):
+        stub = self
+        self.delay = delay
+        self.rate_limit_left = rate_limit_first
+        self.requests = []
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub._lock:
+                    limited = stub.rate_limit_left > 0
+                    stub.rate_limit_left -= limited
+                    if not limited:
+                        stub.requests.append(json.loads(body))
+                time.sleep(stub.delay)
+                if limited:
+                    reply = json.dumps({"retry_after": 0.2}).encode()
+                    self.send_response(429)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(reply)))
+                    self.end_headers()
+                    self.wfile.write(reply)
+                else:
+                    self.send_response(204)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/webhook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+def bench_webhook(messages=200, delay=1.0):
+    """p99 latency of a notify call: blocking requests.post vs dispatcher."""
+    import requests
+
+    from notify import MAX_EMBEDS, WebhookDispatcher
+
+    def chat_payload(i):
+        return {
+            "content": f"💬 [MF-BENCH] bench: message {i}",
+            "username": "🐾 Morphire.ai",
+            "embeds": [{"title": "💬 Task Chat — bench", "description": f"message {i}"}],
+        }
+
+    stub = StubWebhook(delay=delay)
+    try:
+        blocking = []
+        for i in range(5):
+            t0 = time.perf_counter()
+            requests.post(stub.url, json=chat_payload(i), timeout=10)
+            blocking.append((time.perf_counter() - t0) * 1000)
+        print(f"blocking post      p99 {percentile(blocking, 99):9.2f} ms  (5 calls, stub delay {delay}s)")
+    finally:
+        stub.close()
+
+    stub = StubWebhook(delay=delay, rate_limit_first=2)
+    try:
+        dispatcher = WebhookDispatcher(stub.url)
+        queued = []
+        for i in range(messages):
+            t0 = time.perf_counter()
+            dispatcher.submit(chat_payload(i), coalesce=True)
+            queued.append((time.perf_counter() - t0) * 1000)
+        t0 = time.perf_counter()
+        dispatcher.join()
+        drained = time.perf_counter() - t0
+        embeds = [e["description"] for r in stub.requests for e in r.get("embeds", [])]
+        assert sorted(embeds) == sorted(f"message {i}" for i in range(messages)), \
+            f"stub got {len(embeds)} of {messages} messages"
+        assert len(stub.requests) == -(-messages // MAX_EMBEDS), \
+            f"{len(stub.requests)} posts for {messages} messages: not coalesced"
+        assert all(len(r["embeds"]) <= MAX_EMBEDS for r in stub.requests), "post over Discord's embed limit"
+        assert dispatcher.stats["rate_limited"] == 2 and dispatcher.stats["failed"] == 0, \
+            f"429 retry_after not honored: stats={dispatcher.stats}"
+        print(f"dispatcher submit  p99 {percentile(queued, 99):9.4f} ms  ({messages} calls)")
+        print(f"drained in {drained:.1f}s: {len(stub.requests)} posts carrying {len(embeds)} embeds, stats={dispatcher.stats}")
+    finally:
+        stub.close()
+
+
+# ─── IPFS: streaming upload memory ceiling ───
+class StubPinata:
+    """Local stand-in for Pinata's pinFileToIPFS that reads bodies in chunks."""
+
+    def __init__(self):
+        stub = self
+        self.uploads = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                remaining = int(self.headers.get("Content-Length", 0))
+                h = hashlib.sha256()
+                while remaining:
+                    chunk = self.rfile.read(min(remaining, 1024 * 1024))
+                    h.update(chunk)
+                    remaining -= len(chunk)
+                stub.uploads += 1
+                reply = json.dumps({"IpfsHash": f"QmStub{h.hexdigest()[:40]}"}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/pinning/pinFileToIPFS"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+def peak_memory(fn):
+    """(result, peak traced Python allocation in MB) of `fn()`."""
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, peak / (1024 * 1024)
+
+
+def bench_ipfs(size_mb=256):
+    """Peak memory uploading one large deliverable: bytes vs streaming."""
+    import ipfs
+
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    path = os.path.join(tmp_dir, "deliverable.bin")
+    with open(path, "wb") as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(size_mb):
+            f.write(block)
+    stub = StubPinata()
+    try:
+        def whole_file_hash():
+            with open(path, "rb") as f:
+                file_bytes = f.read()
+            return hashlib.sha256(file_bytes).hexdigest()
+
+        _, old_peak = peak_memory(whole_file_hash)
+        _, new_peak = peak_memory(lambda: ipfs.upload_stream(path, "deliverable.bin"))
+        print(f"simulation, whole file in memory: {old_peak:8.1f} MB peak")
+        print(f"simulation, streamed:             {new_peak:8.1f} MB peak")
+
+        index = ipfs.CIDIndex(os.path.join(tmp_dir, "ipfs-index.jsonl"))
+        t0 = time.perf_counter()
+        cid, up_peak = peak_memory(
+            lambda: ipfs.upload_stream(path, "deliverable.bin", index=index, simulation=False, pin_url=stub.url)
+        )
+        first = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        again = ipfs.upload_stream(path, "deliverable.bin", index=index, simulation=False, pin_url=stub.url)
+        second = time.perf_counter() - t0
+        print(f"stub pin, streamed:               {up_peak:8.1f} MB peak  ({first:.2f}s, {size_mb / first:.0f} MB/s)")
+        print(f"stub pin, repeat delivery:        {second:.2f}s, {stub.uploads} upload(s) reached the server, "
+              f"same CID: {cid == again}")
+    finally:
+        stub.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── CID engine: throughput ───
+def bench_cid(size_mb=512):
+    """GB/s of the old single-pass SHA-256 vs the chunked Merkle-DAG CID."""
+    import cid
+
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    path = os.path.join(tmp_dir, "deliverable.bin")
+    with open(path, "wb") as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(size_mb):
+            f.write(block)
+    gigabytes = size_mb / 1024
+
+    def single_pass():
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return f"Qm{h.hexdigest()[:44]}"
+
+    try:
+        single_pass()  # warm the page cache
+        rows = [("sha256 single pass (old sim)", single_pass)]
+        for version in (0, 1):
+            rows.append((f"CIDv{version}, 1 worker", lambda v=version: cid.compute_cid(path, version=v, workers=1)))
+            rows.append((f"CIDv{version}, {os.cpu_count()} workers", lambda v=version: cid.compute_cid(path, version=v)))
+        for label, fn in rows:
+            elapsed, _ = timed(fn, repeat=1)
+            print(f"{label:<32} {gigabytes / (elapsed / 1000):6.2f} GB/s  -> {fn()}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── Dashboard: render time and payload ───
+def bench_dashboard(sizes=(100, 10_000, 100_000), page_size=20):
+    """Old render-everything loop vs one filtered, paginated window."""
+    import dashboard
+
+    print(f"{'jobs':>8} | {'all cards (ms)':>14} | {'all payload':>12} | {'page (ms)':>10} | {'page payload':>12}")
+    for n in sizes:
+        jobs = make_pod(n)["jobs"]
+        for i, job in enumerate(jobs):
+            job["posted_at"] = f"2026-01-01T00:00:{i % 60:02d}.{i:06d}+09:00"
+        all_ms, _ = timed(lambda: dashboard.render_cards(jobs), repeat=3)
+        all_bytes = len(dashboard.render_cards(jobs).encode())
+
+        def one_page():
+            matching = dashboard.filter_jobs(jobs, status="pending", role="recruiter")
+            page, _ = dashboard.page_jobs(matching, sort="posted_at", page_size=page_size)
+            return dashboard.render_cards(page)
+
+        dashboard._card_html.cache_clear()
+        page_ms, _ = timed(one_page, repeat=5)
+        page_bytes = len(one_page().encode())
+        print(f"{n:>8} | {all_ms:>14.2f} | {all_bytes / 1024:>9.0f} KB | {page_ms:>10.2f} | {page_bytes / 1024:>9.1f} KB")
+
+
+# ─── Concurrency: many processes posting to one wallet ───
+def _stress_worker(args):
+    backend, path, worker, jobs_each = args
+    import stats
+
+    store = storage.STORAGE_BACKENDS[backend]()
+    merged = 0
+    for i in range(jobs_each):
+        data = store.load(path)
+        rev = data["meta"].get("rev", 0)
+        job = make_job(worker * 1_000_000 + i)
+        data["jobs"].append(job)
+        stats.track_job_added(data, job)
+        changes = [storage.job_added(job), storage.section_set("stats", data["stats"])]
+        new_rev = storage.commit(store, path, data, changes, on_merge=stats.rebuild_stats)
+        merged += new_rev != rev + 1
+    store.flush()
+    return merged
+
+
+def bench_stress(processes=8, jobs_each=50):
+    """Lost-update check: every job posted concurrently must survive."""
+    from multiprocessing import Pool
+
+    import stats
+
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    try:
+        for backend in ("json", "journal"):
+            path = os.path.join(tmp_dir, f"morphire-stress-{backend}.json")
+            seed = make_pod(0)
+            seed["stats"] = stats.compute_stats(seed)
+            storage.STORAGE_BACKENDS[backend]().save(path, seed)
+            t0 = time.perf_counter()
+            with Pool(processes) as pool:
+                merged = sum(pool.map(_stress_worker, [(backend, path, w, jobs_each) for w in range(processes)]))
+            elapsed = time.perf_counter() - t0
+            final = storage.STORAGE_BACKENDS[backend]().load(path)
+            expected = processes * jobs_each
+            ids = {job["id"] for job in final["jobs"]}
+            ok, _ = stats.verify_stats(final)
+            assert len(ids) == expected, f"{backend}: lost {expected - len(ids)} of {expected} jobs"
+            assert ok, f"{backend}: stats block out of sync after merges"
+            print(f"{backend:>8}: {expected} jobs from {processes} processes, none lost, "
+                  f"rev {final['meta']['rev']}, {merged} merged, {expected / elapsed:.0f} saves/s")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── Public board: BM25 search across wallets ───
+SKILLS = ["python", "rust", "solidity", "react", "nlp", "gpu", "scraper", "vision", "audio", "translation",
+          "design", "figma", "sql", "pandas", "docker", "kubernetes", "llm", "agent", "solana", "anchor"]
+TAGS = ["ai", "data", "web3", "design", "writing", "devops", "research", "mobile", "audio", "video"]
+
+
+def make_board_job(rng, i, vocab):
+    """A job with Zipf-ish wording, so some terms are very common."""
+    def words(n):
+        return " ".join(vocab[min(len(vocab) - 1, int(rng.paretovariate(1.1)) - 1)] for _ in range(n))
+
+    return {
+        "id": f"MF-{i:07d}",
+        "title": f"{rng.choice(SKILLS)} {words(rng.randint(2, 5))}",
+        "description": words(rng.randint(10, 30)),
+        "requirements": ", ".join(rng.sample(SKILLS, 3)),
+        "reward_skr": rng.randint(50, 5000),
+        "role": "recruiter",
+        "posted_by": "Bench Recruiter",
+        "posted_at": "2026-01-01T00:00:00+09:00",
+        "status": "pending",
+        "tags": rng.sample(TAGS, rng.randint(1, 3)),
+    }
+
+
+def _exhaustive(board, query, tags=(), min_reward=None, max_reward=None, limit=20):
+    """Reference ranking: every posting of every query term scored."""
+    import math
+
+    from board import BM25_K1, IMPACT_LEVELS, tokenize
+
+    terms = list(dict.fromkeys(t for t in tokenize(query) if t in board._postings))
+    n_docs = len(board._entries)
+    scores = {}
+    for term in terms:
+        buckets = board._postings[term]
+        df = sum(len(docs) for docs in buckets.values())
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) * (BM25_K1 + 1)
+        for level, docs in buckets.items():
+            for doc in docs:
+                if board._passes(doc, frozenset(tags), min_reward, max_reward, None):
+                    scores[doc] = scores.get(doc, 0.0) + idf * level / IMPACT_LEVELS
+    return sorted(round(s, 4) for s in scores.values())[::-1][:limit]
+
+
+def bench_board(sizes=(10_000, 100_000, 1_000_000), repeat=50):
+    """Search latency over every wallet's open jobs; target < 20 ms at 1M."""
+    import random
+
+    import board
+
+    rng = random.Random(7)
+    vocab = SKILLS + [f"w{i}" for i in range(5000)]
+    queries = [
+        ("python", {}),
+        ("python scraper", {}),
+        ("llm agent solana", {}),
+        ("w42 w7 vision", {}),
+        ("rust", {"tags": ("web3",), "min_reward": 1000, "max_reward": 2000}),
+        ("", {"tags": ("ai",), "min_reward": 4000}),
+    ]
+    print(f"{'jobs':>9} | {'build (s)':>9} | " + " | ".join(f"{(q or '<browse>')[:14]:>14}" for q, _ in queries))
+    jobs_board = board.JobBoard()
+    built = 0
+    for n in sizes:
+        t0 = time.perf_counter()
+        for i in range(built, n):
+            jobs_board.put(f"SoLWallet{i % 5000}", make_board_job(rng, i, vocab))
+        build_s = time.perf_counter() - t0
+        built = n
+        cells = []
+        for query, filters in queries:
+            def cold():
+                jobs_board._results.clear()
+                return jobs_board.search(query, **filters)
+
+            jobs_board._level_maps.clear()
+            jobs_board._level_map_size = 0
+            _, first = timed(cold, repeat=1)
+            p50, worst = timed(cold, repeat=repeat)
+            cells.append(f"{p50:>5.2f}/{max(first, worst):>6.2f}")
+            if query and n <= 100_000:
+                got = [job["score"] for job in jobs_board.search(query, **filters)]
+                assert got == _exhaustive(jobs_board, query, **filters), f"early stop changed results for {query!r}"
+        query, filters = queries[2]
+        cached, _ = timed(lambda: jobs_board.search(query, **filters), repeat=repeat)
+        print(f"{n:>9} | {build_s:>9.1f} | " + " | ".join(f"{c:>14}" for c in cells) + f"  (repeat: {cached:.2f})")
+    print("cells: median/max ms per uncached query (max includes building level maps);")
+    print("repeat: the same search again, as on a Streamlit rerun; rankings checked against exhaustive scoring up to 100k")
+
+
+# ─── Matching: all agents x all open jobs ───
+def bench_matching(agents=50_000, jobs=200_000, baseline_agents=100, repeat=20):
+    """Full top-K build vs per-pair Python, then incremental updates."""
+    import heapq
+    import random
+
+    import board
+    import matching
+
+    rng = random.Random(11)
+    vocab = SKILLS + [f"w{i}" for i in range(5000)]
+    jobs_board = board.JobBoard()
+    directory = matching.AgentDirectory()
+    for i in range(jobs):
+        jobs_board.put(f"SoLWallet{i % 5000}", make_board_job(rng, i, vocab))
+    for i in range(agents):
+        profile = {"name": f"Agent {i}", "skills": rng.sample(SKILLS + TAGS, rng.randint(2, 5)),
+                   "credit_score": rng.randint(20, 100)}
+        directory.put(f"AgentWallet{i}", profile)
+
+    engine = matching.MatchEngine(jobs_board, directory)
+    t0 = time.perf_counter()
+    engine.refresh()
+    build_s = time.perf_counter() - t0
+    print(f"{agents} agents x {jobs} jobs ({len(engine.agents.live())} x {len(engine.jobs.live())} distinct vectors, "
+          f"{'NumPy/SciPy' if matching.np is not None else 'pure Python'})")
+    print(f"  full build:            {build_s:8.1f} s")
+
+    # Baseline: the same vectors scored one pair at a time (vectors precomputed)
+    job_vecs = [(key, engine.jobs.vecs[group]) for key, group in engine.jobs.group_of.items()]
+    sample = rng.sample(sorted(engine.agents.group_of), baseline_agents)
+    t0 = time.perf_counter()
+    for owner in sample:
+        vec = engine.agents.vecs[engine.agents.group_of[owner]]
+        scores = ((sum(w * job_vec.get(f, 0.0) for f, w in vec.items()), key) for key, job_vec in job_vecs)
+        heapq.nlargest(engine.top_k, scores)
+    per_agent = (time.perf_counter() - t0) / baseline_agents
+    print(f"  per-pair Python:       {per_agent * agents / 60:8.1f} min (extrapolated from {baseline_agents} agents)")
+
+    owner = sample[0]
+    p50, worst = timed(lambda: engine.jobs_for(owner), repeat=repeat)
+    print(f"  jobs_for:              {p50:8.2f} ms median, {worst:.2f} max")
+    key = next(iter(engine.jobs.group_of))
+    p50, worst = timed(lambda: engine.agents_for(*key), repeat=repeat)
+    print(f"  agents_for:            {p50:8.2f} ms median, {worst:.2f} max")
+
+    counter = [jobs]
+
+    def post_job():
+        counter[0] += 1
+        jobs_board.put("SoLWalletNew", make_board_job(rng, counter[0], vocab))
+        engine.refresh()
+
+    def edit_profile():
+        profile = {"name": "Agent", "skills": rng.sample(SKILLS + TAGS, rng.randint(2, 5)),
+                   "credit_score": rng.randint(20, 100)}
+        directory.put(rng.choice(sample), profile)
+        engine.refresh()
+
+    for label, fn in (("post a job", post_job), ("edit a profile", edit_profile)):
+        p50, worst = timed(fn, repeat=repeat)
+        print(f"  refresh after {label + ':':<16}{p50:6.2f} ms median, {worst:.2f} max")
+    print("refresh: board/directory change pulled and patched into the precomputed lists")
+
+
+# ─── Metrics: instrumentation overhead ───
+def bench_metrics(calls=1_000_000):
+    """Per-call cost of @instrumented / measure(), recording off vs on."""
+    import metrics
+
+    def plain():
+        return None
+
+    decorated = metrics.instrumented("bench")(plain)
+
+    def with_block():
+        with metrics.measure("bench") as m:
+            m.add_bytes(1)
+
+    was = metrics.ENABLED
+    try:
+        print(f"{'variant':>22} | {'off (ns/call)':>14} | {'on (ns/call)':>13}")
+        off = []
+        for label, fn in (("plain call", plain), ("@instrumented", decorated), ("with measure()", with_block)):
+            cells = []
+            for flag in (False, True):
+                metrics.enable(flag)
+                t0 = time.perf_counter()
+                for _ in range(calls):
+                    fn()
+                cells.append((time.perf_counter() - t0) / calls * 1e9)
+            off.append(cells[0])
+            print(f"{label:>22} | {cells[0]:>14.0f} | {cells[1]:>13.0f}")
+        print(f"while off, an instrumented call costs ~{off[1] - off[0]:.0f} ns more than a plain one")
+    finally:
+        metrics.enable(was)
+        metrics.reset()
+
+
+# ─── Packed pods: size and load time vs JSON ───
+def bench_packed(sizes=(100, 1_000, 10_000, 100_000), transactions=0.2):
+    """On-disk size and load time: JSON snapshot vs packed, whole and by section."""
+    import random
+
+    import packed
+    from stats import ensure_stats
+
+    rng = random.Random(5)
+    vocab = SKILLS + [f"w{i}" for i in range(5000)]
+
+    codec = f"{'msgpack' if packed.msgpack else 'json'} + {'zstd' if packed.zstandard else 'zlib'}"
+    print(f"packed sections: {codec} (compressed from {packed.COMPRESS_MIN} bytes)")
+    print(f"{'jobs':>8} | {'json size':>10} | {'packed size':>11} | {'json load (ms)':>14} | "
+          f"{'packed load (ms)':>16} | {'meta+stats (ms)':>15} | {'profile (ms)':>12}")
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    results = {}
+    try:
+        for n in sizes:
+            data = make_pod(0, transactions=int(n * transactions))
+            # Varied wording, so compression is not flattered by copies
+            data["jobs"] = [dict(make_board_job(rng, i, vocab), delivery_ipfs=[]) for i in range(n)]
+            ensure_stats(data)
+            path = os.path.join(tmp_dir, f"morphire-packed-{n}.json")
+            journal, packed_store = storage.JournalStore(), packed.PackedStore()
+            journal.save(path, data)
+            packed_store.write_snapshot(path, data)
+            assert packed_store.read_snapshot(path) == data
+            json_bytes = os.path.getsize(path)
+            packed_bytes = os.path.getsize(packed_store.packed_path(path))
+            repeat = 3 if n >= 100_000 else 10
+            json_ms, _ = timed(lambda: journal.load(path), repeat)
+            packed_ms, _ = timed(lambda: packed_store.load(path), repeat)
+            sidebar_ms, _ = timed(lambda: packed_store.load_sections(path, ("meta", "stats")), repeat * 10)
+            profile_ms, _ = timed(lambda: packed_store.load_sections(path, ("profile",)), repeat * 10)
+            print(f"{n:>8} | {json_bytes / 1024:>7.0f} KB | {packed_bytes / 1024:>8.0f} KB | {json_ms:>14.2f} | "
+                  f"{packed_ms:>16.2f} | {sidebar_ms:>15.3f} | {profile_ms:>12.3f}")
+            results[str(n)] = {
+                "json_bytes": json_bytes,
+                "packed_bytes": packed_bytes,
+                "json_load_ms": round(json_ms, 4),
+                "packed_load_ms": round(packed_ms, 4),
+                "packed_meta_stats_ms": round(sidebar_ms, 4),
+                "packed_profile_ms": round(profile_ms, 4),
+            }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
+
+# ─── Ledger: 1M entries, O(1) balances, batched settlement ───
+def bench_ledger(entries=1_000_000, wallets=10_000, batch=1_000, repeat=100_000):
+    """Append/replay cost of a large posting log, balance lookups and round fees."""
+    import random
+
+    import ledger
+
+    rng = random.Random(3)
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    try:
+        path = os.path.join(tmp_dir, "ledger", "ledger.jsonl")
+        book = ledger.Ledger(path)
+        names = [f"SoLLedger{i:06d}" for i in range(wallets)]
+        for i in range(0, wallets, batch):
+            book._write([ledger.posting("deposit", [(ledger.EXTERNAL, -10**9), (ledger.wallet_account(w), 10**9)])
+                         for w in names[i:i + batch]])
+        # Escrow + release pairs (2 entries each) in appended batches, as many writers would
+        t0 = time.perf_counter()
+        job = 0
+        while book.entries < entries:
+            records = []
+            for _ in range(batch // 2):
+                owner, agent = rng.sample(names, 2)
+                amount = rng.randint(10, 5000)
+                escrow = ledger.escrow_account(owner, f"MF-{job}")
+                records.append(ledger.posting("escrow", [(ledger.wallet_account(owner), -amount), (escrow, amount)],
+                                              job=(owner, f"MF-{job}")))
+                records.append(ledger.posting("release", [(escrow, -amount), (ledger.payable_account(agent), amount)],
+                                              job=(owner, f"MF-{job}"), payout={"agent": agent, "amount": amount}))
+                job += 1
+            book._write(records)
+        append_s = time.perf_counter() - t0
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"{book.postings:,} postings / {book.entries:,} entries ({size_mb:.0f} MB log): "
+              f"appended in {append_s:.1f}s ({book.entries / append_s:,.0f} entries/s)")
+
+        t0 = time.perf_counter()
+        replica = ledger.Ledger(path)
+        replay_s = time.perf_counter() - t0
+        assert replica._balances == book._balances and replica.trial_balance() == 0
+        print(f"replay in a fresh process: {replay_s:.1f}s; trial balance {replica.trial_balance()}")
+
+        wallet = names[0]
+        balance_us = timed(lambda: [book.wallet_balance(wallet) for _ in range(repeat)], 1)[0] * 1000 / repeat
+        print(f"wallet_balance(): {balance_us:.2f} µs from running totals (summing the log instead: the replay above)")
+
+        client = ledger.SimulatedSettlement()
+        pending = book.pending_count()
+        t0 = time.perf_counter()
+        rounds = fee = 0
+        for _ in range(20):
+            receipt = book.settle(client, max_batch=ledger.BATCH_SIZE)
+            rounds += 1
+            fee += receipt["fee"]
+        settle_ms = (time.perf_counter() - t0) * 1000 / rounds
+        settled = rounds * ledger.BATCH_SIZE
+        print(f"settlement: {rounds} rounds of {ledger.BATCH_SIZE} from {pending:,} queued, {settle_ms:.2f} ms/round; "
+              f"fees {fee} SKR batched vs {settled * client.base_fee} SKR paying each payout alone")
+        return {
+            "postings": book.postings,
+            "entries": book.entries,
+            "append_entries_per_s": round(book.entries / append_s),
+            "replay_s": round(replay_s, 3),
+            "wallet_balance_us": round(balance_us, 3),
+            "settle_round_ms": round(settle_ms, 3),
+            "fee_per_payout": round(fee / settled, 4),
+        }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── Lifecycle: deadline queue across wallets ───
+def bench_lifecycle(wallets=5_000, jobs_each=20):
+    """Queue sync per save, batched pops of due deadlines, restart replay."""
+    import random
+
+    import lifecycle
+
+    rng = random.Random(9)
+    now = time.time()
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    try:
+        path = os.path.join(tmp_dir, "lifecycle", "queue.jsonl")
+        queue = lifecycle.DeadlineQueue(path)
+        pods = []
+        t0 = time.perf_counter()
+        for w in range(wallets):
+            data = make_pod(0, wallet=f"SoLLife{w:06d}")
+            for i in range(jobs_each):
+                job = make_job(i)
+                job["role"] = "recruiter"
+                age_days = rng.uniform(0, 40)
+                job["posted_at"] = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(now - age_days * 86400))
+                data["jobs"].append(job)
+            queue.sync_pod(data, None, f"morphire-life-{w:06d}.json")
+            pods.append(data)
+        fill_s = time.perf_counter() - t0
+        print(f"{len(queue):,} deadlines for {wallets * jobs_each:,} jobs in {wallets:,} pods, queued in {fill_s:.1f}s")
+
+        data = pods[0]
+        counter = [jobs_each]
+
+        def post_one():
+            job = make_job(counter[0])
+            counter[0] += 1
+            job["role"] = "recruiter"
+            job["posted_at"] = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(now))
+            data["jobs"].append(job)
+            queue.sync_pod(data, [storage.job_added(job)], "morphire-life-000000.json")
+
+        sync_ms, _ = timed(post_one, repeat=200)
+        t0 = time.perf_counter()
+        due = queue.due(now)
+        pop_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        queue.done([(key, when) for key, when, _ in due])
+        done_ms = (time.perf_counter() - t0) * 1000
+        print(f"sync_pod after a post: {sync_ms:.3f} ms; due(): {len(due)} events in {pop_ms:.2f} ms "
+              f"from {len({pod for _, _, pod in due})} pods; done(): {done_ms:.2f} ms")
+
+        t0 = time.perf_counter()
+        replica = lifecycle.DeadlineQueue(path)
+        replay_s = time.perf_counter() - t0
+        assert replica._due == queue._due
+        print(f"restart: {len(replica):,} deadlines replayed in {replay_s:.2f}s")
+        return {
+            "deadlines": len(queue),
+            "sync_pod_ms": round(sync_ms, 4),
+            "due_batch_ms": round(pop_ms, 3),
+            "replay_s": round(replay_s, 3),
+        }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── Archive: live pod size for long-lived wallets ───
+def bench_archive(days=(365, 1_095, 1_825), jobs_per_day=10):
+    """Pod size and load time of a wallet active for `days`, before and
+    after settled jobs move to the archive tier, plus history reads."""
+    import random
+    from datetime import datetime
+
+    import archive
+    from ledger import JST
+    from stats import compute_stats, ensure_stats
+
+    rng = random.Random(23)
+    vocab = SKILLS + [f"w{i}" for i in range(5000)]
+    statuses = ["paid"] * 6 + ["completed", "cancelled", "in_progress", "pending"]
+    now = time.time()
+    print(f"{'days':>6} | {'jobs':>6} | {'pod before':>10} | {'load (ms)':>9} | {'pod after':>9} | {'load (ms)':>9} | "
+          f"{'archive':>8} | {'pass (s)':>8} | {'page (ms)':>9} | {'search (ms)':>11} | {'find (ms)':>9}")
+    results = {}
+    for n_days in days:
+        tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+        try:
+            store = storage.get_store()
+            path = os.path.join(tmp_dir, f"morphire-archive-{n_days}.json")
+            data = make_pod(0)
+            for i in range(n_days * jobs_per_day):
+                job = dict(make_board_job(rng, i, vocab), delivery_ipfs=[{"ipfs_hash": f"Qm{i:044d}", "filename": "out.zip"}])
+                age_days = i // jobs_per_day
+                stamp = datetime.fromtimestamp(now - age_days * 86400, JST).isoformat()
+                # Only recent jobs are still open (lifecycle.py expires the rest)
+                status = statuses[i % len(statuses)] if age_days < 45 else statuses[i % 8]
+                job.update(posted_at=stamp, status=status, role="agent" if i % 2 else "recruiter")
+                if job["status"] == "paid":
+                    job["paid_at"] = stamp
+                data["jobs"].append(job)
+            ensure_stats(data)
+            store.save(path, data)
+            store.flush()
+            jobs = len(data["jobs"])
+            before_bytes = sum(os.path.getsize(p) for p in store.files(path) if os.path.exists(p))
+            before_ms, _ = timed(lambda: store.load(path), 5)
+
+            archiver = archive.Archiver(tmp_dir, store=store)
+            t0 = time.perf_counter()
+            moved = archiver.archive_pod(path)
+            pass_s = time.perf_counter() - t0
+            store.flush()
+            after = store.load(path)
+            assert after["stats"] == compute_stats(after) == data["stats"]
+            after_bytes = sum(os.path.getsize(p) for p in store.files(path) if os.path.exists(p))
+            after_ms, _ = timed(lambda: store.load(path), 20)
+
+            key = storage.pod_key(path)
+            archive_bytes = after["archive"]["bytes"]
+            root = archiver.archive.root  # a new Archive per read: cold segment cache
+            page_ms, _ = timed(lambda: archive.Archive(root).search(key, limit=20), 10)
+            search_ms, _ = timed(lambda: archive.Archive(root).search(key, rng.choice(SKILLS), limit=20), 10)
+            last_id = data["jobs"][-1]["id"]
+            find_ms, _ = timed(lambda: archive.Archive(root).find(key, last_id), 10)
+            print(f"{n_days:>6} | {jobs:>6} | {before_bytes / 1024:>7.0f} KB | {before_ms:>9.1f} | {after_bytes / 1024:>6.0f} KB | "
+                  f"{after_ms:>9.2f} | {archive_bytes / 1024:>5.0f} KB | {pass_s:>8.2f} | {page_ms:>9.2f} | "
+                  f"{search_ms:>11.2f} | {find_ms:>9.2f}")
+            results[str(n_days)] = {
+                "jobs": jobs,
+                "archived": moved,
+                "pod_bytes_before": before_bytes,
+                "pod_bytes_after": after_bytes,
+                "load_ms_before": round(before_ms, 3),
+                "load_ms_after": round(after_ms, 3),
+                "archive_bytes": archive_bytes,
+                "archive_pass_s": round(pass_s, 3),
+                "history_page_ms": round(page_ms, 3),
+                "history_search_ms": round(search_ms, 3),
+                "history_find_ms": round(find_ms, 3),
+            }
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
+
+# ─── Placement: flat data dir vs sharded roots at 1M+ pods ───
+def bench_placement(pods=1_000_000, roots=4, sample=5_000):
+    """Path lookup and open+read latency for `pods` pods in one flat
+    directory vs hash-prefix shards on a ring of `roots` roots, plus the
+    cost of listing a directory and of moving pods when a root is added."""
+    import random
+
+    import placement
+
+    rng = random.Random(24)
+    payload = json.dumps(make_pod(1), separators=(",", ":")).encode()
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    try:
+        flat_dir = os.path.join(tmp_dir, "flat")
+        data_dir = os.path.join(tmp_dir, "sharded")
+        os.makedirs(flat_dir)
+        os.makedirs(data_dir)
+        root_dirs = [os.path.join(tmp_dir, f"root{i}") for i in range(roots)]
+        with open(os.path.join(data_dir, "placement.json"), "w") as f:
+            json.dump({"roots": root_dirs, "previous": [], "flat": False, "changed_at": 0}, f)
+        sharded = placement.Placement(data_dir, storage.JsonFileStore())
+        wallets = [f"SoLPlace{i:08d}" for i in range(pods)]
+
+        def write(path):
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            os.write(fd, payload)
+            os.close(fd)
+
+        def flat_path(wallet):
+            return os.path.join(flat_dir, f"{placement.wallet_pod_key(wallet)}.json")
+
+        def sharded_path(wallet):
+            return sharded.locate(placement.wallet_pod_key(wallet))
+
+        results = {}
+        for layout, path_of in (("flat", flat_path), ("sharded", sharded_path)):
+            t0 = time.perf_counter()
+            for wallet in wallets:
+                write(path_of(wallet))
+            fill_s = time.perf_counter() - t0
+            placement.wallet_pod_key.cache_clear()
+            picks = rng.sample(wallets, sample)
+            t0 = time.perf_counter()
+            paths = [path_of(wallet) for wallet in picks]
+            lookup_us = (time.perf_counter() - t0) / sample * 1e6
+
+            def open_read(path):
+                with open(path, "rb") as f:
+                    f.read()
+
+            open_samples = []
+            for path in paths:
+                t0 = time.perf_counter()
+                open_read(path)
+                open_samples.append((time.perf_counter() - t0) * 1e6)
+            missing = [path_of(f"SoLNew{i:08d}") for i in range(sample)]
+            t0 = time.perf_counter()
+            for path in missing:
+                os.path.exists(path)
+            miss_us = (time.perf_counter() - t0) / sample * 1e6
+            # What listing the directory a pod lives in costs (backups, pod_paths, ls)
+            t0 = time.perf_counter()
+            listed = len(os.listdir(os.path.dirname(paths[0])))
+            list_ms = (time.perf_counter() - t0) * 1000
+            t0 = time.perf_counter()
+            for i in range(1_000):
+                write(path_of(f"SoLLate{i:08d}"))
+            create_us = (time.perf_counter() - t0) / 1_000 * 1e6
+            print(f"{layout:>8}: {pods:,} pods written in {fill_s:.0f}s | lookup {lookup_us:.2f} µs | "
+                  f"open+read p50 {percentile(open_samples, 50):.1f} µs, p99 {percentile(open_samples, 99):.1f} µs | "
+                  f"miss {miss_us:.2f} µs | create {create_us:.1f} µs | listdir of its dir: {listed:,} entries in {list_ms:.1f} ms")
+            results[layout] = {
+                "lookup_us": round(lookup_us, 3),
+                "open_read_p50_us": round(percentile(open_samples, 50), 2),
+                "open_read_p99_us": round(percentile(open_samples, 99), 2),
+                "miss_us": round(miss_us, 3),
+                "create_us": round(create_us, 2),
+                "dir_entries": listed,
+                "listdir_ms": round(list_ms, 3),
+            }
+
+        # One more root: only the pods the ring hands to it move
+        before = {wallet: sharded_path(wallet) for wallet in picks}
+        sharded.update(root_dirs + [os.path.join(tmp_dir, f"root{roots}")])
+        state = sharded._reload(force=True)
+        moved = sum(
+            1 for wallet in picks
+            if placement.shard_path(state["ring"].owner(placement.wallet_pod_key(wallet)), "x") != placement.shard_path(
+                state["previous_rings"][0].owner(placement.wallet_pod_key(wallet)), "x")
+        )
+        t0 = time.perf_counter()
+        for wallet in picks:
+            assert sharded_path(wallet) == before[wallet]  # found at the old root until rebalanced
+        pending_us = (time.perf_counter() - t0) / sample * 1e6
+        print(f"adding root #{roots + 1}: {moved / sample:.1%} of pods move (ideal {1 / (roots + 1):.1%}); "
+              f"lookup while the rebalance is pending {pending_us:.2f} µs")
+        results["add_root_moved_fraction"] = round(moved / sample, 4)
+        results["pending_lookup_us"] = round(pending_us, 3)
+        return results
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── Export: streaming CSV/Parquet at 1M rows ───
+def bench_export(rows=1_000_000, wallets=1_000):
+    """Rows/s and peak memory of exporting `rows` jobs spread over
+    `wallets` pods, streamed in batches vs materialized first."""
+    import tracemalloc
+
+    import export
+    from placement import get_placement, wallet_pod_key
+
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    try:
+        store = storage.get_store()
+        placement = get_placement(tmp_dir, store)
+        per_wallet = rows // wallets
+        for w in range(wallets):
+            wallet = f"SoLExport{w:06d}"
+            data = make_pod(per_wallet, wallet=wallet)
+            for job in data["jobs"]:
+                job["id"] = f"MF-{w:06d}-{job['id'][3:]}"
+            store.save(placement.locate(wallet_pod_key(wallet)), data)
+        store.flush()
+        pod_bytes = sum(os.path.getsize(p) for p in placement.pod_paths())
+        exporter = export.Exporter(tmp_dir, store)
+        out = os.path.join(tmp_dir, "out")
+        formats = [fmt for fmt in export.FORMATS if fmt in export.AVAILABLE_FORMATS]
+
+        def pyarrow_peak():
+            return export.pyarrow.default_memory_pool().max_memory() if export.pyarrow is not None else 0
+
+        print(f"{rows:,} job rows in {wallets:,} pods ({pod_bytes / 1e6:.0f} MB), batches of {export.BATCH_ROWS:,}")
+        print(f"{'format':>8} | {'mode':>12} | {'rows/s':>9} | {'file (MB)':>9} | {'peak py (MB)':>12} | {'peak arrow (MB)':>15}")
+        results = {"rows": rows, "wallets": wallets, "pod_mb": round(pod_bytes / 1e6, 1)}
+        for fmt in formats:
+            for mode in ("streamed", "materialized"):
+                def run():
+                    source = exporter.rows("jobs")
+                    if mode == "materialized":
+                        source = list(source)  # what building the whole export in memory costs
+                    return export.export_file(source, f"{out}.{fmt}", "jobs", fmt)
+
+                t0 = time.perf_counter()
+                count = run()
+                elapsed = time.perf_counter() - t0
+                assert count == rows, count
+                size = os.path.getsize(f"{out}.{fmt}")
+                tracemalloc.start()
+                run()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{fmt:>8} | {mode:>12} | {count / elapsed:>9,.0f} | {size / 1e6:>9.1f} | {peak / 1e6:>12.1f} | {pyarrow_peak() / 1e6:>15.1f}")
+                results[f"{fmt}_{mode}"] = {
+                    "rows_per_s": round(count / elapsed),
+                    "seconds": round(elapsed, 2),
+                    "file_mb": round(size / 1e6, 1),
+                    "peak_python_mb": round(peak / 1e6, 1),
+                }
+        return results
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── Auth: Ed25519 verifications per core ───
+def bench_auth(keys=256, batch_sizes=(8, 64, 256)):
+    """Login signatures checked per second on this one thread (= one core),
+    one by one and in batches, with locally generated keypairs; also
+    checks that bad signatures, replays and forged tokens are refused."""
+    import auth
+
+    wallet_auth = auth.WalletAuth(b"bench-secret")
+    logins, items = [], []
+    t0 = time.perf_counter()
+    for _ in range(keys):
+        seed, public_key = auth.generate_keypair()
+        wallet = auth.b58encode(public_key)
+        nonce, message = wallet_auth.challenge(wallet)
+        signature = auth.sign(seed, message.encode())
+        logins.append((wallet, nonce, auth.b58encode(signature)))
+        items.append((public_key, message.encode(), signature))
+    sign_s = time.perf_counter() - t0
+    backend = "PyNaCl" if auth.nacl is not None else "pure Python"
+    print(f"{keys} keypairs generated and signed in {sign_s:.2f}s ({backend})")
+
+    t0 = time.perf_counter()
+    single_ok = all(auth.verify(*item) for item in items)
+    single = keys / (time.perf_counter() - t0)
+    rates = {"single": round(single, 1)}
+    print(f"{'path':>12} | {'verifies/s':>10} | {'speedup':>7}")
+    print(f"{'single':>12} | {single:>10,.0f} | {1:>6.1f}x")
+    batch_ok = True
+    for size in batch_sizes:
+        t0 = time.perf_counter()
+        for start in range(0, keys, size):
+            batch_ok &= all(auth.verify_batch(items[start:start + size]))
+        rate = keys / (time.perf_counter() - t0)
+        rates[f"batch_{size}"] = round(rate, 1)
+        print(f"{f'batch of {size}':>12} | {rate:>10,.0f} | {rate / single:>6.1f}x")
+
+    t0 = time.perf_counter()
+    tokens = wallet_auth.login_batch(logins)
+    login_rate = keys / (time.perf_counter() - t0)
+    print(f"login_batch of {keys} (nonces + tokens too): {login_rate:,.0f} logins/s")
+
+    # What must fail
+    tampered = list(items[:64])
+    tampered[7] = (tampered[7][0], b"tampered", tampered[7][2])
+    flagged = [i for i, ok in enumerate(auth.verify_batch(tampered)) if not ok]
+    fresh_nonce, _ = wallet_auth.challenge(logins[0][0])
+    token = tokens[0]
+    expiring = auth.NonceCache(ttl=60)
+    expired_nonce, _ = expiring.issue(logins[0][0], now=time.time() - 120)
+    bounded = auth.NonceCache(max_size=1_000)
+    for _ in range(5_000):
+        bounded.issue(logins[0][0])
+    checks = {
+        "valid_signatures": single_ok and batch_ok and None not in tokens,
+        "bad_one_in_batch_found": flagged == [7],
+        "replayed_nonce_refused": wallet_auth.login(*logins[0]) is None,
+        "wrong_nonce_refused": wallet_auth.login(logins[1][0], fresh_nonce, logins[1][2]) is None,
+        "expired_nonce_refused": expiring.message(expired_nonce, logins[0][0]) is None,
+        "nonce_cache_bounded": len(bounded) == 1_000,
+        "token_accepted": wallet_auth.session(token) == logins[0][0],
+        "forged_token_refused": wallet_auth.session(token.replace(logins[0][0], logins[1][0])) is None,
+        "expired_token_refused": wallet_auth.tokens.check(token, now=time.time() + auth.TOKEN_TTL_S + 1) is None,
+    }
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    return {"backend": backend, "keys": keys, "verifies_per_s": rates,
+            "logins_per_s": round(login_rate, 1), "checks_passed": all(checks.values())}
+
+
+# ─── App: micro-benchmarks of the data helpers ───
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def import_app(data_dir, webhook_url=""):
+    """app.py imported against a scratch data dir; None without Streamlit."""
+    import importlib
+
+    try:
+        import streamlit  # noqa: F401
+    except ImportError:
+        print("🐾 streamlit is not installed; skipped")
+        return None
+    os.environ["MORPHIRE_DATA_DIR"] = data_dir
+    os.environ["MORPHIRE_DISCORD_WEBHOOK"] = webhook_url
+    if "app" in sys.modules:
+        return importlib.reload(sys.modules["app"])
+    import app
+    return app
+
+
+def bench_micro(jobs=1_000, messages=200, transactions=200, repeat=50):
+    """Per-call latency of load_data, save_data, IDs, scores, IPFS and cards."""
+    import dashboard
+    from stats import track_job_added
+
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    try:
+        app = import_app(tmp_dir)
+        if app is None:
+            return None
+        wallet = "SoLBenchMicroWallet"
+        seed_wallet(app, wallet, jobs=jobs, messages=messages, transactions=transactions)
+        path = app.get_data_file_path(wallet)
+        data = app.load_data(wallet)
+        for i, job in enumerate(data["jobs"]):
+            job["posted_at"] = f"2026-01-01T00:00:{i % 60:02d}.{i:06d}+09:00"
+        counter = [jobs]
+
+        def cold_load():
+            app.POD_CACHE.invalidate(path)
+            app.load_data(wallet)
+
+        def save_one():
+            job = make_job(counter[0])
+            counter[0] += 1
+            data["jobs"].append(job)
+            track_job_added(data, job)
+            app.save_data(data, wallet, [storage.job_added(job)])
+
+        ratings = [1 + i % 5 for i in range(200)]
+        blob = os.urandom(256 * 1024)
+
+        def upload_new():
+            counter[0] += 1
+            app.upload_to_ipfs(counter[0].to_bytes(8, "big") + blob, "delivery.bin")
+
+        def dashboard_page():
+            matching = dashboard.filter_jobs(data["jobs"], status="pending", role="recruiter")
+            page, _ = dashboard.page_jobs(matching, sort="posted_at", page_size=20)
+            return dashboard.render_cards(page)
+
+        results = {
+            "load_data_cold": latency(cold_load, repeat),
+            "load_data_cached": latency(lambda: app.load_data(wallet), repeat),
+            "save_data": latency(save_one, repeat),
+            "gen_id": latency(app.gen_id, repeat * 100),
+            "calc_credit_score": latency(lambda: app.calc_credit_score(ratings), repeat * 100),
+            "upload_to_ipfs_new": latency(upload_new, repeat),
+            "upload_to_ipfs_repeat": latency(lambda: app.upload_to_ipfs(blob, "delivery.bin"), repeat),
+            "dashboard_page": latency(dashboard_page, repeat),
+        }
+        print(f"{jobs} jobs, {messages} messages, {transactions} transactions "
+              f"(IPFS {'simulated' if app.IPFS_SIMULATION else 'live'}, 256 KB files)")
+        print(f"{'call':>22} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'max (ms)':>9}")
+        for name, r in results.items():
+            print(f"{name:>22} | {r['p50_ms']:>9.4f} | {r['p95_ms']:>9.4f} | {r['max_ms']:>9.4f}")
+        return {"jobs": jobs, "messages": messages, "transactions": transactions, "calls": results}
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── App: end-to-end sessions through Streamlit's AppTest ───
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def _session(AppTest, i, timings):
+    """One user: unlock, connect, post, join, chat, edit profile."""
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+
+    def step(name, action):
+        t0 = time.perf_counter()
+        action()
+        timings.setdefault(name, []).append((time.perf_counter() - t0) * 1000)
+        if at.exception:
+            raise RuntimeError(f"session {i}, {name}: {at.exception[0].value}")
+
+    def go(page):
+        at.sidebar.radio[0].set_value(page)
+        at.run()
+
+    step("open", at.run)
+    _widget(at.text_input, "🔑 Enter Access Password").input("morphire123")
+    step("unlock", lambda: _widget(at.button, "Unlock 🐾").click().run())
+    step("new_wallet", lambda: _widget(at.button, "🎲 Generate Random Wallet").click().run())
+    step("connect", lambda: _widget(at.button, "🔌 Connect & Sign Message").click().run())
+
+    step("nav_post", lambda: go("📋 Post a Job"))
+    _widget(at.text_input, "🏷️ Job Title").input(f"Load test job {i}")
+    _widget(at.text_input, "📋 Requirements").input("Python, NLP")
+    _widget(at.text_input, "🏷️ Tags (comma separated)").input("ai, data")
+    step("post_job", lambda: _widget(at.button, "🚀 Post Job to Blockchain (Sim)").click().run())
+
+    step("nav_join", lambda: go("🤝 My Jobs (As Agent)"))
+    join = next((b for b in at.button if (b.key or "").startswith("join_")), None)
+    if join is not None:
+        step("join", lambda: join.click().run())
+
+    step("nav_chat", lambda: go("💬 Task Chat"))
+    _widget(at.text_input, "Message").input(f"Hello from session {i}")
+    step("chat_send", lambda: _widget(at.button, "📨 Send").click().run())
+
+    step("nav_profile", lambda: go("⚙️ Profile Settings"))
+    _widget(at.text_input, "Skills (comma separated)").input("python, nlp, scraper")
+    step("save_profile", lambda: _widget(at.button, "💾 Save Profile").click().run())
+
+
+def bench_sessions(sessions=20, workers=1, board_jobs=200, delay=0.05):
+    """Simulated users clicking through the app, with a local stub webhook."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("🐾 streamlit.testing is not available; skipped")
+        return None
+    from notify import get_dispatcher
+
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    stub = StubWebhook(delay=delay)
+    try:
+        app = import_app(tmp_dir, webhook_url=stub.url)
+        # Someone else's open jobs, so there is something to join
+        seed_wallet(app, "SoLLoadRecruiter", jobs=board_jobs)
+        timings = {}
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(workers) as pool:
+            list(pool.map(lambda i: _session(AppTest, i, timings), range(sessions)))
+        elapsed = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        drained = get_dispatcher(stub.url, spill_path=app.WEBHOOK_SPILL_PATH).join(timeout=60)
+        drain_s = time.perf_counter() - t1
+
+        steps = {name: summarize(samples) for name, samples in timings.items()}
+        print(f"{sessions} sessions x {len(steps)} steps, {workers} at a time: {elapsed:.1f}s "
+              f"({sessions / elapsed:.2f} sessions/s)")
+        print(f"{'step':>14} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'max (ms)':>9}")
+        for name, r in steps.items():
+            print(f"{name:>14} | {r['p50_ms']:>9.1f} | {r['p95_ms']:>9.1f} | {r['max_ms']:>9.1f}")
+        embeds = sum(len(r.get("embeds", [])) for r in stub.requests)
+        print(f"webhook: {len(stub.requests)} posts carrying {embeds} embeds, "
+              f"{'drained' if drained else 'NOT drained'} {drain_s:.1f}s after the last session")
+        return {
+            "sessions": sessions,
+            "workers": workers,
+            "sessions_per_s": round(sessions / elapsed, 3),
+            "steps": steps,
+            "webhook": {"posts": len(stub.requests), "embeds": embeds, "drain_s": round(drain_s, 3)},
+        }
+    finally:
+        stub.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── API: bots over HTTP vs the same steps through the UI ───
+API_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api.py")
+# The UI step that does the same thing as each API call
+UI_STEPS = {
+    "save_profile": "save_profile",
+    "post_job": "post_job",
+    "list_jobs": "nav_join",
+    "join": "join",
+    "chat_send": "chat_send",
+    "chat_read": "nav_chat",
+}
+
+
+class ApiBot:
+    """One bot on one keep-alive HTTP/1.1 connection to api.py."""
+
+    def __init__(self):
+        self.token = None
+
+    async def connect(self, host, port):
+        import asyncio
+
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def sign_in(self):
+        """Sign in with a fresh local keypair; returns the login status."""
+        from auth import b58encode, generate_keypair, sign
+
+        seed, public_key = generate_keypair()
+        wallet = b58encode(public_key)
+        _, challenge = await self.call("POST", "/v1/auth/challenge", {"wallet": wallet})
+        signature = b58encode(sign(seed, challenge["message"].encode()))
+        status, reply = await self.call("POST", "/v1/auth/login",
+                                        {"wallet": wallet, "nonce": challenge["nonce"], "signature": signature})
+        self.token = reply.get("token")
+        return status
+
+    async def call(self, method, path, body=None, raw=None):
+        payload = json.dumps(body).encode() if body is not None else raw or b""
+        auth = f"Authorization: Bearer {self.token}\r\n" if self.token else ""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: bench\r\n{auth}"
+            f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+        )
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        length = 0
+        for line in head.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+        reply = await self.reader.readexactly(length)
+        return int(head.split(b" ", 2)[1]), json.loads(reply) if reply else {}
+
+    def close(self):
+        self.writer.close()
+
+
+async def _bot_session(bot, i, rounds, timings, errors):
+    """The steps of a UI session (_session) as API calls, `rounds` times over."""
+    blob = os.urandom(16 * 1024)
+
+    async def step(name, method, path, body=None, raw=None, ok=(200, 201)):
+        t0 = time.perf_counter()
+        status, reply = await bot.call(method, path, body, raw)
+        timings.setdefault(name, []).append((time.perf_counter() - t0) * 1000)
+        if status not in ok:
+            errors.append(f"bot {i}, {name}: {status} {reply.get('error')}")
+        return reply
+
+    await step("save_profile", "PUT", "/v1/me/profile", {"name": f"Bot {i}", "skills": ["python", "nlp", "scraper"]})
+    for r in range(rounds):
+        posted = await step("post_job", "POST", "/v1/jobs",
+                            {"title": f"Load test job {i}.{r}", "requirements": "Python, NLP", "tags": ["ai", "data"]})
+        jobs = (await step("list_jobs", "GET", "/v1/jobs?limit=20")).get("jobs") or []
+        if jobs:
+            job = jobs[(i + r) % len(jobs)]
+            await step("join", "POST", f"/v1/jobs/{job['owner_wallet']}/{job['id']}/join", ok=(201, 409))
+            await step("delivery", "POST", f"/v1/me/jobs/{job['id']}/deliveries?filename=bot{i}-{r}.bin",
+                       raw=f"{i}.{r}".encode() + blob)
+        await step("my_jobs", "GET", "/v1/me/jobs?limit=20")
+        if "job" in posted:
+            await step("chat_send", "POST", f"/v1/me/jobs/{posted['job']['id']}/chat", {"text": f"Hello from bot {i}"})
+            await step("chat_read", "GET", f"/v1/me/jobs/{posted['job']['id']}/chat")
+
+
+def _rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+
+
+def _with_p99(samples):
+    return dict(summarize(samples), p99_ms=round(percentile(samples, 99), 4))
+
+
+def bench_api(bots=200, rounds=5, idle=2_000, ui_sessions=5, board_jobs=200):
+    """Bots driving api.py (in a subprocess, with `idle` more connections
+    held open): requests/s and p99 per step, next to the same steps
+    clicked through the UI with AppTest."""
+    import asyncio
+    import socket
+    import subprocess
+    import urllib.request
+
+    tmp_dir = tempfile.mkdtemp(prefix="morphire-bench-")
+    stub = StubWebhook(delay=0.05)
+    server = None
+    try:
+        app = import_app(tmp_dir, webhook_url=stub.url)
+        if app is None:
+            return None
+        seed_wallet(app, "SoLLoadRecruiter", jobs=board_jobs)
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        env = dict(os.environ, MORPHIRE_DATA_DIR=tmp_dir, MORPHIRE_DISCORD_WEBHOOK=stub.url)
+        server = subprocess.Popen([sys.executable, API_PATH, str(port)], env=env, stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1).read()
+                break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("api.py did not start")
+                time.sleep(0.1)
+
+        timings, errors = {}, []
+
+        async def run():
+            idlers = [ApiBot() for _ in range(idle)]
+            for start in range(0, idle, 500):
+                batch = idlers[start:start + 500]
+                await asyncio.gather(*(bot.connect("127.0.0.1", port) for bot in batch))
+                await asyncio.gather(*(bot.call("GET", "/healthz") for bot in batch))
+            active = [ApiBot() for _ in range(bots)]
+            await asyncio.gather(*(bot.connect("127.0.0.1", port) for bot in active))
+            # Everyone signs in at once: the server verifies the burst in batches
+            t0 = time.perf_counter()
+            logins = await asyncio.gather(*(bot.sign_in() for bot in active))
+            login_s = time.perf_counter() - t0
+            errors.extend(f"bot {i}, login: {status}" for i, status in enumerate(logins) if status != 200)
+            t0 = time.perf_counter()
+            await asyncio.gather(*(_bot_session(bot, i, rounds, timings, errors) for i, bot in enumerate(active)))
+            elapsed = time.perf_counter() - t0
+            rss = _rss_mb(server.pid)
+            for bot in idlers + active:
+                bot.close()
+            return login_s, elapsed, rss
+
+        login_s, elapsed, rss = asyncio.run(run())
+        requests = sum(len(samples) for samples in timings.values())
+        api_steps = {name: _with_p99(samples) for name, samples in timings.items()}
+        print(f"{bots} bots x {rounds} rounds over HTTP, {idle:,} more connections idle: {requests:,} requests "
+              f"in {elapsed:.1f}s = {requests / elapsed:,.0f} req/s"
+              + (f", server RSS {rss} MB" if rss is not None else ""))
+        print(f"sign-in burst: {bots} bots in {login_s:.2f}s (keypairs and signing included)")
+        for error in errors[:5]:
+            print(f"  ⚠️ {error}")
+
+        ui_steps = {}
+        ui_rate = None
+        try:
+            from streamlit.testing.v1 import AppTest
+        except ImportError:
+            print("🐾 streamlit.testing is not available; UI comparison skipped")
+        else:
+            ui_timings = {}
+            t0 = time.perf_counter()
+            for i in range(ui_sessions):
+                _session(AppTest, i, ui_timings)
+            ui_rate = sum(len(samples) for samples in ui_timings.values()) / (time.perf_counter() - t0)
+            ui_steps = {name: _with_p99(samples) for name, samples in ui_timings.items()}
+            print(f"{ui_sessions} UI sessions through AppTest: {ui_rate:.1f} steps/s")
+
+        print(f"{'step':>13} | {'API p50':>8} | {'API p99':>8} | {'UI p50':>8} | {'UI p99':>8}  (ms)")
+        for name, r in api_steps.items():
+            ui_step = ui_steps.get(UI_STEPS.get(name))
+            ui_cols = f"{ui_step['p50_ms']:>8.1f} | {ui_step['p99_ms']:>8.1f}" if ui_step else f"{'-':>8} | {'-':>8}"
+            print(f"{name:>13} | {r['p50_ms']:>8.1f} | {r['p99_ms']:>8.1f} | {ui_cols}")
+        return {
+            "bots": bots,
+            "rounds": rounds,
+            "idle_connections": idle,
+            "requests": requests,
+            "requests_per_s": round(requests / elapsed, 1),
+            "sign_in_burst_s": round(login_s, 3),
+            "errors": len(errors),
+            "server_rss_mb": rss,
+            "steps": api_steps,
+            "ui_steps_per_s": None if ui_rate is None else round(ui_rate, 2),
+            "ui_steps": ui_steps,
+        }
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        stub.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ─── Results: JSON files to compare across commits ───
+def git_revision():
+    import subprocess
+
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, results):
+    import platform
+    from datetime import datetime, timezone
+
+    report = {
+        "commit": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n🐾 results written to {path}")
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, value
+
+
+def compare(old_path, new_path):
+    """Print every metric found in both result files, old vs new."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    before = dict(_flatten(old["results"]))
+    after = dict(_flatten(new["results"]))
+    print(f"{'metric':>44} | {old.get('commit') or 'old':>12} | {new.get('commit') or 'new':>12} | {'change':>8}")
+    for key in [k for k in after if k in before]:
+        a, b = before[key], after[key]
+        change = f"{(b - a) / a * 100:+7.1f}%" if a else "     n/a"
+        print(f"{key[-44:]:>44} | {a:>12.4g} | {b:>12.4g} | {change:>8}")
+
+
+BENCHMARKS = {
+    "storage": bench_storage,
+    "pod_cache": bench_pod_cache,
+    "webhook": bench_webhook,
+    "ipfs": bench_ipfs,
+    "cid": bench_cid,
+    "dashboard": bench_dashboard,
+    "stress": bench_stress,
+    "board": bench_board,
+    "matching": bench_matching,
+    "metrics": bench_metrics,
+    "packed": bench_packed,
+    "ledger": bench_ledger,
+    "lifecycle": bench_lifecycle,
+    "archive": bench_archive,
+    "placement": bench_placement,
+    "export": bench_export,
+    "auth": bench_auth,
+    "micro": bench_micro,
+    "sessions": bench_sessions,
+    "api": bench_api,
+}
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["compare"]:
+        compare(*args[1:3])
+        sys.exit(0)
+    json_path = None
+    if "--json" in args:
+        at = args.index("--json")
+        json_path = args[at + 1]
+        del args[at:at + 2]
+    names = args or list(BENCHMARKS)
+    results = {}
+    for name in names:
+        print(f"\n─── {name} ───")
+        results[name] = BENCHMARKS[name]()
+    if json_path:
+        write_results(json_path, results)
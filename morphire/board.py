@@ -0,0 +1,427 @@
+"""
+🐾 Morphire.ai — Public job board index.
+
+Every wallet's open recruiter jobs (role "recruiter", status "pending")
+in one inverted index over title, description, requirements and tags,
+ranked with BM25. The index is kept in sync from `save_data` and shared
+between processes through an append-only log of put/del records:
+
+    <data dir>/board/board.jsonl
+
+Each process tails the log on every call, so a job posted in one
+session shows up in the others without re-reading any pod. Existing
+data is indexed once with:
+
+    python morphire/board.py rebuild [DATA_DIR]
+
+Postings are impact-ordered: a term's BM25 tf component is quantized
+into IMPACT_LEVELS buckets at index time (with the average document
+length at that moment; compaction re-quantizes). Queries walk buckets
+from the highest impact down, score each job they meet in full (other
+terms are looked up in cached doc -> level maps) and stop as soon as no
+job not met yet can enter the top results, so a query touches a small
+fraction of the postings of common words.
+"""
+
+import heapq
+import math
+import os
+import re
+import sys
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from itertools import chain
+
+from placement import get_placement
+from storage import SharedLog, get_store
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+IMPACT_LEVELS = 64
+# Rewrite the log once superseded records outnumber live jobs
+COMPACT_MIN_DEAD = int(os.environ.get("MORPHIRE_BOARD_COMPACT_MIN", "10000"))
+# Postings kept as doc -> level maps for the most recently queried terms
+LEVEL_MAP_BUDGET = int(os.environ.get("MORPHIRE_BOARD_LEVEL_MAPS", "4000000"))
+RESULT_CACHE_SIZE = 256
+
+_TOKEN = re.compile(r"\w+")
+# Fields kept per job (besides owner wallet and id) to render results
+_FIELDS = ("title", "description", "requirements", "tags", "reward_skr", "posted_by", "posted_at")
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(text.lower()) if len(t) > 1]
+
+
+def is_open(job):
+    """Whether a job belongs on the public board."""
+    return job.get("role") == "recruiter" and job.get("status", "pending") == "pending"
+
+
+def _doc_text(job):
+    return " ".join([
+        job.get("title") or "",
+        job.get("description") or "",
+        job.get("requirements") or "",
+        " ".join(job.get("tags") or []),
+    ])
+
+
+def _level(tf, norm):
+    """Quantized BM25 tf part: tf / (tf + norm) scaled into 1..IMPACT_LEVELS."""
+    return min(IMPACT_LEVELS, int(tf / (tf + norm) * IMPACT_LEVELS) + 1)
+
+
+def _term_counts(job):
+    counts = {}
+    for term in tokenize(_doc_text(job)):
+        counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+def board_entry(owner, job):
+    """The tuple stored for `job` (also the shape of a log "put")."""
+    return (owner, job["id"]) + tuple(
+        tuple(job.get("tags") or []) if field == "tags" else job.get(field) for field in _FIELDS
+    )
+
+
+class JobBoard:
+    """Inverted index over open jobs, optionally backed by a shared log.
+
+    With `log_path=None` the board is purely in memory (benchmarks).
+    """
+
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+        self._lock = threading.RLock()
+        self.generation = 0
+        self._reset()
+        self._log = SharedLog(log_path, self._apply, self._reset) if log_path else None
+        self._catch_up()
+
+    def _reset(self):
+        self._entries = []  # doc -> board_entry tuple, None once removed
+        self._tags = []  # doc -> frozenset of tags
+        self._rewards = array("d")
+        self._by_key = {}  # (owner, job id) -> doc
+        self._postings = {}  # term -> {impact level: array of docs}
+        self._level_maps = OrderedDict()
+        self._level_map_size = 0
+        self._results = OrderedDict()  # search key -> [(doc, score)]
+        self._removed = []  # keys in removal order (see changes)
+        self._total_len = 0
+        self._dead = 0
+        self.generation += 1
+
+    def __len__(self):
+        return len(self._by_key)
+
+    # ─── Index Maintenance ───
+    def _add(self, entry):
+        key = entry[:2]
+        old = self._by_key.get(key)
+        if old is not None:
+            if self._entries[old] == entry:
+                return
+            self._remove(key)
+        self._results.clear()
+        doc = len(self._entries)
+        job = dict(zip(_FIELDS, entry[2:]))
+        counts = _term_counts(job)
+        length = sum(counts.values())
+        self._entries.append(entry)
+        self._tags.append(frozenset(job["tags"]))
+        self._rewards.append(float(job["reward_skr"] or 0))
+        self._by_key[key] = doc
+        self._total_len += length
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self._total_len / len(self._entries)))
+        for term, tf in counts.items():
+            level = _level(tf, norm)
+            buckets = self._postings.get(term)
+            if buckets is None:
+                buckets = self._postings[term] = {}
+            bucket = buckets.get(level)
+            if bucket is None:
+                bucket = buckets[level] = array("I")
+            bucket.append(doc)
+            if term in self._level_maps:
+                self._level_maps[term][doc] = level
+                self._level_map_size += 1
+
+    def _remove(self, key):
+        doc = self._by_key.pop(key, None)
+        if doc is not None:
+            self._entries[doc] = None
+            self._removed.append(key)
+            self._dead += 1
+            self._results.clear()
+
+    def _apply(self, rec):
+        if rec["op"] == "put":
+            self._add(tuple(tuple(v) if isinstance(v, list) else v for v in rec["entry"]))
+        elif rec["op"] == "del":
+            self._remove((rec["owner"], rec["id"]))
+
+    def _catch_up(self):
+        if self._log is not None:
+            self._log.catch_up()
+
+    def _write(self, records):
+        """Apply `records` here and append them for other processes."""
+        if not records:
+            return
+        if self._log is None:
+            for rec in records:
+                self._apply(rec)
+            return
+        self._log.append(records, compact=self._compact)
+
+    def _compact(self):
+        """Live jobs only, once superseded records outnumber them."""
+        if self._dead > max(COMPACT_MIN_DEAD, len(self._by_key)):
+            return [{"op": "put", "entry": entry} for entry in self._entries if entry is not None]
+        return None
+
+    # ─── Sync From Pods ───
+    def put(self, owner, job):
+        with self._lock:
+            self._write([{"op": "put", "entry": board_entry(owner, job)}])
+
+    def sync_pod(self, data, changes=None):
+        """Bring one pod's jobs up to date on the board after a save.
+
+        With change records only the touched jobs are looked at;
+        without them the whole pod is compared to what is indexed.
+        """
+        owner = data["meta"]["owner_wallet"]
+        with self._lock:
+            self._catch_up()
+            if changes is None:
+                jobs = data.get("jobs", [])
+                gone = {key for key in self._by_key if key[0] == owner} - {(owner, job.get("id")) for job in jobs}
+            else:
+                jobs = [rec["job"] for rec in changes if rec["op"] == "job_put"]
+                gone = {(owner, rec["id"]) for rec in changes if rec["op"] == "job_del"}
+            records = []
+            for job in jobs:
+                key = (owner, job.get("id"))
+                if is_open(job):
+                    entry = board_entry(owner, job)
+                    doc = self._by_key.get(key)
+                    if doc is None or self._entries[doc] != entry:
+                        records.append({"op": "put", "entry": entry})
+                elif key in self._by_key:
+                    gone.add(key)
+            for key in gone & self._by_key.keys():
+                records.append({"op": "del", "owner": key[0], "id": key[1]})
+            self._write(records)
+
+    # ─── Readers ───
+    def job(self, owner, job_id):
+        """The open job as indexed, or None."""
+        with self._lock:
+            self._catch_up()
+            doc = self._by_key.get((owner, job_id))
+            return None if doc is None else self._result(doc, 0.0)
+
+    def changes(self, cursor=None):
+        """Jobs put on / taken off the board since `cursor`.
+
+        Returns (cursor, reset, added, removed): `added` is [job dicts],
+        `removed` [(owner, job id)]. `reset` means the caller's view is
+        stale (first call, or the log was compacted): drop it, and
+        `added` holds every open job.
+        """
+        with self._lock:
+            self._catch_up()
+            reset = cursor is None or cursor[0] != self.generation
+            first_doc, first_removed = (0, 0) if reset else cursor[1:]
+            added = [
+                self._result(doc, 0.0) for doc in range(first_doc, len(self._entries))
+                if self._entries[doc] is not None
+            ]
+            removed = [] if reset else self._removed[first_removed:]
+            return (self.generation, len(self._entries), len(self._removed)), reset, added, removed
+
+    # ─── Search ───
+    def _passes(self, doc, tags, min_reward, max_reward, exclude_wallet):
+        entry = self._entries[doc]
+        if entry is None:
+            return False
+        if exclude_wallet is not None and entry[0] == exclude_wallet:
+            return False
+        reward = self._rewards[doc]
+        if (min_reward is not None and reward < min_reward) or (max_reward is not None and reward > max_reward):
+            return False
+        return tags <= self._tags[doc]
+
+    def _result(self, doc, score):
+        entry = self._entries[doc]
+        job = dict(zip(_FIELDS, entry[2:]))
+        job.update(owner_wallet=entry[0], id=entry[1], tags=list(job["tags"]), score=score)
+        return job
+
+    def search(self, query="", tags=(), min_reward=None, max_reward=None, exclude_wallet=None, limit=20):
+        """Top `limit` open jobs for `query`, best first.
+
+        Filters: every tag in `tags`, reward within [min_reward,
+        max_reward], and not posted by `exclude_wallet`. An empty query
+        lists the newest matching jobs.
+        """
+        tags = frozenset(tags)
+        with self._lock:
+            self._catch_up()
+            words = tokenize(query)
+            terms = list(dict.fromkeys(t for t in words if t in self._postings))
+            key = (tuple(terms), bool(words), tags, min_reward, max_reward, exclude_wallet, limit)
+            hits = self._results.get(key)
+            if hits is None:
+                # Streamlit reruns repeat the same search on every click
+                if terms:
+                    hits = self._ranked(terms, tags, min_reward, max_reward, exclude_wallet, limit)
+                elif words:
+                    hits = []
+                else:
+                    hits = self._newest(tags, min_reward, max_reward, exclude_wallet, limit)
+                self._results[key] = hits
+                if len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+            return [self._result(doc, score) for doc, score in hits]
+
+    def _newest(self, tags, min_reward, max_reward, exclude_wallet, limit):
+        results = []
+        for doc in range(len(self._entries) - 1, -1, -1):
+            if self._passes(doc, tags, min_reward, max_reward, exclude_wallet):
+                results.append((doc, 0.0))
+                if len(results) == limit:
+                    break
+        return results
+
+    def _level_map(self, term):
+        """doc -> impact level for one term (cached, kept current by _add)."""
+        levels = self._level_maps.get(term)
+        if levels is None:
+            levels = {}
+            for level, docs in self._postings[term].items():
+                levels.update(dict.fromkeys(docs, level))
+            self._level_maps[term] = levels
+            self._level_map_size += len(levels)
+            while self._level_map_size > LEVEL_MAP_BUDGET and len(self._level_maps) > 1:
+                _, evicted = self._level_maps.popitem(last=False)
+                self._level_map_size -= len(evicted)
+        self._level_maps.move_to_end(term)
+        return levels
+
+    def _ranked(self, terms, tags, min_reward, max_reward, exclude_wallet, limit):
+        n_docs = len(self._entries)
+        segments = []  # (impact, term bit, docs), processed highest impact first
+        weights = []  # per term: idf * (k1 + 1) / IMPACT_LEVELS
+        for bit, term in enumerate(terms):
+            buckets = self._postings[term]
+            df = sum(len(docs) for docs in buckets.values())
+            weights.append(math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) * (BM25_K1 + 1) / IMPACT_LEVELS)
+            for level, docs in buckets.items():
+                segments.append((weights[bit] * level, bit, docs))
+        segments.sort(key=lambda s: s[0], reverse=True)
+
+        remaining = [0.0] * len(terms)  # highest unprocessed impact per term
+        for impact, bit, _ in reversed(segments):
+            remaining[bit] = impact
+        top = []  # min-heap of (score, doc)
+
+        if len(terms) == 1:
+            # Every job in a bucket has the same score: take the newest
+            for impact, _, docs in segments:
+                for doc in reversed(docs):
+                    if self._passes(doc, tags, min_reward, max_reward, exclude_wallet):
+                        top.append((impact, doc))
+                        if len(top) == limit:
+                            break
+                else:
+                    continue
+                break
+            return [(doc, round(score, 4)) for score, doc in top]
+
+        # Each job is scored once, in full, when first met; its other terms
+        # are looked up in the level maps
+        levels = [self._level_map(term) for term in terms]
+        lookups = list(zip(weights, levels))
+        passes = self._passes
+        seen = set()
+        for i, (impact, bit, docs) in enumerate(segments):
+            # No job first met from here on can score above `cap`
+            if len(top) == limit and top[0][0] >= sum(remaining):
+                break
+            remaining[bit] = next((s[0] for s in segments[i + 1:] if s[1] == bit), 0.0)
+            needed = 0
+            if len(top) == limit:
+                # A job needs at least `needed` of the other query terms to
+                # get above the current floor; skip the ones with fewer
+                others = sorted(remaining[j] for j in range(len(terms)) if j != bit)
+                bound = impact
+                while bound <= top[0][0] and others:
+                    bound += others.pop()
+                    needed += 1
+                if bound <= top[0][0]:
+                    continue
+            if needed == 0:
+                new = set(docs)
+            else:
+                present = [levels[j].keys() & docs for j in range(len(terms)) if j != bit]
+                if needed == 1:
+                    new = set().union(*present)
+                else:
+                    counts = Counter(chain.from_iterable(present))
+                    new = {doc for doc, count in counts.items() if count >= needed}
+            new -= seen
+            seen |= new
+            for doc in sorted(new, reverse=True):  # newest first among equal scores
+                if not passes(doc, tags, min_reward, max_reward, exclude_wallet):
+                    continue
+                score = 0.0
+                for weight, level_map in lookups:
+                    score += weight * level_map.get(doc, 0)
+                if len(top) < limit:
+                    heapq.heappush(top, (score, doc))
+                elif score > top[0][0]:
+                    heapq.heapreplace(top, (score, doc))
+        top.sort(key=lambda item: (-item[0], -item[1]))
+        return [(doc, round(score, 4)) for score, doc in top]
+
+
+_boards = {}
+_boards_guard = threading.Lock()
+
+
+def get_board(path):
+    """Process-wide JobBoard backed by the log at `path`."""
+    with _boards_guard:
+        if path not in _boards:
+            _boards[path] = JobBoard(path)
+        return _boards[path]
+
+
+def rebuild(data_dir):
+    """Index every pod's open jobs into a fresh log (one-off migration)."""
+    store = get_store()
+    records = []
+    for pod_path in get_placement(data_dir, store).pod_paths():
+        data = store.load(pod_path)
+        if data is None:
+            continue
+        owner = data["meta"]["owner_wallet"]
+        for job in data.get("jobs", []):
+            if is_open(job):
+                records.append({"op": "put", "entry": board_entry(owner, job)})
+    path = os.path.join(data_dir, "board", "board.jsonl")
+    SharedLog(path, lambda rec: None, lambda: None).rewrite(records)
+    print(f"🐾 Indexed {len(records)} open job(s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("usage: python morphire/board.py rebuild [DATA_DIR]")
+        sys.exit(2)
+    rebuild(sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(__file__), "data_store"))
@@ -0,0 +1,226 @@
+"""
+🐾 Morphire.ai — Segmented chat message store.
+
+Task Chat messages live outside the pod, one append-only log per job,
+split into fixed-size JSONL segments:
+
+    <root>/<pod key>/<job id>/seg-000000000.jsonl   (messages 0..999)
+    <root>/<pod key>/<job id>/seg-000001000.jsonl   (messages 1000..1999)
+
+Sending a message appends one line (under a per-job file lock, so the
+app, the API and the scheduler can all append); reading the newest N
+only touches the last segment or two. Existing pods are migrated off the embedded
+`chat_history` lists with:
+
+    python morphire/chatstore.py migrate [DATA_DIR]
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+
+from placement import get_placement
+from storage import get_store, job_updated, pod_key, pod_lock, trim_torn_tail, update_pod
+
+SEGMENT_SIZE = int(os.environ.get("MORPHIRE_CHAT_SEGMENT", "1000"))
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class ChatStore:
+    """Append-only, per-job segmented message logs."""
+
+    def __init__(self, root, segment_size=SEGMENT_SIZE):
+        self.root = root
+        self.segment_size = segment_size
+        self._counts = {}  # (pod key, job id) -> (message count, size of the segment the next one goes to)
+
+    def _job_dir(self, key, job_id):
+        return os.path.join(self.root, key, _SAFE_ID.sub("_", str(job_id)))
+
+    def _segment_path(self, key, job_id, seq):
+        first = seq - seq % self.segment_size
+        return os.path.join(self._job_dir(key, job_id), f"seg-{first:09d}.jsonl")
+
+    @staticmethod
+    def _load_segment(path):
+        """(messages, bytes read) of one segment file."""
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return [], None
+        messages = []
+        for line in raw.splitlines():
+            try:
+                messages.append(json.loads(line))
+            except ValueError:
+                continue  # torn line from an interrupted append
+        return messages, len(raw)
+
+    def _read_segment(self, path):
+        return self._load_segment(path)[0]
+
+    def _size(self, path):
+        try:
+            return os.stat(path).st_size
+        except FileNotFoundError:
+            return None
+
+    def count(self, key, job_id):
+        """Number of messages stored for a job, by any process.
+
+        The cached count is still good while the segment the next message
+        would go to has the size it had then (one stat per call).
+        """
+        cached = self._counts.get((key, job_id))
+        if cached is not None and self._size(self._segment_path(key, job_id, cached[0])) == cached[1]:
+            return cached[0]
+        job_dir = self._job_dir(key, job_id)
+        try:
+            segments = sorted(name for name in os.listdir(job_dir) if name.startswith("seg-"))
+        except FileNotFoundError:
+            segments = []
+        total, size = 0, None
+        if segments:
+            first = int(segments[-1][4:13])
+            messages, size = self._load_segment(os.path.join(job_dir, segments[-1]))
+            total = first + len(messages)
+            if len(messages) >= self.segment_size:
+                size = None  # full: the next message starts a new segment
+        self._counts[(key, job_id)] = (total, size)
+        return total
+
+    def _append_lock(self, key, job_id):
+        return pod_lock(os.path.join(self._job_dir(key, job_id), "append"))
+
+    def append(self, key, job_id, message):
+        """Append one message; returns its sequence number."""
+        line = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+        os.makedirs(self._job_dir(key, job_id), exist_ok=True)
+        with self._append_lock(key, job_id):
+            seq = self.count(key, job_id)
+            with open(self._segment_path(key, job_id, seq), "a+b") as f:
+                trim_torn_tail(f)
+                f.write(line)
+                size = f.tell()
+            self._counts[(key, job_id)] = (seq + 1, size if (seq + 1) % self.segment_size else None)
+            return seq
+
+    def iter_backward(self, key, job_id, before=None):
+        """Lazily yield (seq, message), newest first, starting below `before`."""
+        end = self.count(key, job_id) if before is None else min(before, self.count(key, job_id))
+        while end > 0:
+            first = (end - 1) - (end - 1) % self.segment_size
+            segment = self._read_segment(self._segment_path(key, job_id, first))
+            for offset in range(min(end - first, len(segment)) - 1, -1, -1):
+                yield first + offset, segment[offset]
+            end = first
+
+    def iter_forward(self, key, job_id):
+        """Lazily yield (seq, message), oldest first, a segment at a time."""
+        total = self.count(key, job_id)
+        first = 0
+        while first < total:
+            segment = self._read_segment(self._segment_path(key, job_id, first))
+            for offset, message in enumerate(segment[: total - first]):
+                yield first + offset, message
+            first += self.segment_size
+
+    def page(self, key, job_id, limit=30, before=None):
+        """Up to `limit` messages ending below `before`, oldest first.
+
+        Returns (messages, cursor) where `cursor` is passed as `before`
+        to fetch the next older page (None once the start is reached).
+        """
+        window = []
+        for seq, message in self.iter_backward(key, job_id, before):
+            window.append((seq, message))
+            if len(window) == limit:
+                break
+        window.reverse()
+        cursor = window[0][0] if window and window[0][0] > 0 else None
+        return [message for _, message in window], cursor
+
+    def latest(self, key, job_id, limit=30):
+        return self.page(key, job_id, limit)[0]
+
+    def messages(self, key, job_id):
+        """Every message of a job, oldest first."""
+        messages = [message for _, message in self.iter_backward(key, job_id)]
+        messages.reverse()
+        return messages
+
+    def drop(self, key, job_id, expected=None):
+        """Delete a job's log (its messages were archived with the job).
+
+        With `expected`, only while the log still holds exactly that many
+        messages, so ones sent after the snapshot are kept; returns
+        whether it was deleted.
+        """
+        if not os.path.isdir(self._job_dir(key, job_id)):
+            return True
+        with self._append_lock(key, job_id):
+            if expected is not None and self.count(key, job_id) != expected:
+                return False
+            shutil.rmtree(self._job_dir(key, job_id), ignore_errors=True)
+            self._counts.pop((key, job_id), None)
+            return True
+
+
+_stores = {}
+_stores_guard = threading.Lock()
+
+
+def get_chat_store(root):
+    """Process-wide ChatStore for `root`."""
+    with _stores_guard:
+        if root not in _stores:
+            _stores[root] = ChatStore(root)
+        return _stores[root]
+
+
+# ─── Migration ───
+def migrate_pod(data, key, chat):
+    """Move embedded chat_history lists into `chat`; returns change records.
+
+    Safe to re-run: messages already in the store are not copied twice.
+    """
+    changes = []
+    jobs = data.get("jobs", [])
+    for pos, job in enumerate(jobs):
+        if "chat_history" not in job:
+            continue
+        # A copy: the job dict may be shared with POD_CACHE (fork_pod)
+        moved = {k: v for k, v in job.items() if k != "chat_history"}
+        for message in job["chat_history"][chat.count(key, job["id"]):]:
+            chat.append(key, job["id"], message)
+        jobs[pos] = moved
+        changes.append(job_updated(moved))
+    return changes
+
+
+def migrate(data_dir):
+    store = get_store()
+    chat = get_chat_store(os.path.join(data_dir, "chat"))
+    migrated = []
+
+    def move_chat(data, key):
+        changes = migrate_pod(data, key, chat)
+        if changes:
+            migrated.append(key)
+        return changes
+
+    for path in get_placement(data_dir, store).pod_paths():
+        update_pod(store, path, lambda data: move_chat(data, pod_key(path)))
+    store.flush()
+    print(f"🐾 Moved chat out of {len(migrated)} pod(s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print("usage: python morphire/chatstore.py migrate [DATA_DIR]")
+        sys.exit(2)
+    migrate(sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(__file__), "data_store"))
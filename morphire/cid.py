@@ -0,0 +1,216 @@
+"""
+🐾 Morphire.ai — Local IPFS CID engine.
+
+Computes the same CIDs `ipfs add` would, without a node: content is cut
+into fixed-size chunks, leaves are hashed in a thread pool (hashlib
+releases the GIL), and the leaves are assembled into a UnixFS balanced
+DAG (174 links per node, like kubo's defaults).
+
+- CIDv0 (`Qm...`): dag-pb leaves wrapping UnixFS File data.
+- CIDv1 (`bafy...`/`bafk...`): raw leaves, dag-pb internal nodes.
+
+The block index (every leaf's CID, offset and size plus the internal
+nodes) can be saved so a later real pin can reuse the layout.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 256 * 1024
+MAX_LINKS = 174
+# Chunks read and hashed per round; bounds memory to BATCH * CHUNK_SIZE
+BATCH_CHUNKS = 64
+
+CODEC_RAW = 0x55
+CODEC_DAG_PB = 0x70
+SHA2_256 = 0x12
+UNIXFS_FILE = 2
+
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+# ─── Encoding Helpers ───
+def varint(n):
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _field(number, wire_type):
+    return varint((number << 3) | wire_type)
+
+
+def _bytes_field(number, value):
+    return _field(number, 2) + varint(len(value)) + value
+
+
+def _uint_field(number, value):
+    return _field(number, 0) + varint(value)
+
+
+def base58btc(data):
+    n = int.from_bytes(data, "big")
+    out = ""
+    while n:
+        n, rem = divmod(n, 58)
+        out = B58_ALPHABET[rem] + out
+    pad = len(data) - len(data.lstrip(b"\0"))
+    return "1" * pad + out
+
+
+def multihash(digest):
+    return bytes([SHA2_256, len(digest)]) + digest
+
+
+def cid_bytes(digest, codec, version):
+    """Binary CID for a sha2-256 `digest`."""
+    if version == 0:
+        return multihash(digest)
+    return varint(1) + varint(codec) + multihash(digest)
+
+
+def cid_string(raw_cid):
+    """Text form: base58btc for CIDv0, base32 ('b' prefix) for CIDv1."""
+    if raw_cid[0] == SHA2_256:
+        return base58btc(raw_cid)
+    return "b" + base64.b32encode(raw_cid).decode().lower().rstrip("=")
+
+
+# ─── UnixFS / dag-pb ───
+def unixfs_file(data=None, filesize=0, blocksizes=()):
+    """UnixFS Data message for a File node."""
+    out = _uint_field(1, UNIXFS_FILE)
+    if data is not None:
+        out += _bytes_field(2, data)
+    out += _uint_field(3, filesize)
+    for size in blocksizes:
+        out += _uint_field(4, size)
+    return out
+
+
+def pb_node(data, links=()):
+    """dag-pb PBNode; links are (cid bytes, tsize). Links precede Data."""
+    out = b""
+    for link_cid, tsize in links:
+        link = _bytes_field(1, link_cid) + _bytes_field(2, b"") + _uint_field(3, tsize)
+        out += _bytes_field(2, link)
+    return out + _bytes_field(1, data)
+
+
+def _leaf(chunk, version):
+    """(cid bytes, tsize, filesize) of one leaf chunk."""
+    if version == 0:
+        # go-unixfs leaves the Data field out entirely for an empty file
+        block = pb_node(unixfs_file(chunk or None, len(chunk)))
+        return cid_bytes(hashlib.sha256(block).digest(), CODEC_DAG_PB, 0), len(block), len(chunk)
+    return cid_bytes(hashlib.sha256(chunk).digest(), CODEC_RAW, 1), len(chunk), len(chunk)
+
+
+# ─── DAG Builder ───
+def open_source(source):
+    """Return (file object, should_close) for a path, bytes or file-like object."""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb"), True
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), True
+    return source, False
+
+
+def read_chunks(f, chunk_size=CHUNK_SIZE):
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        # Short reads from pipes/sockets: fill the chunk before emitting
+        while len(chunk) < chunk_size:
+            more = f.read(chunk_size - len(chunk))
+            if not more:
+                break
+            chunk += more
+        yield chunk
+
+
+def compute_cid(source, version=0, chunk_size=CHUNK_SIZE, workers=None, with_index=False):
+    """CID of a path, file-like object or bytes, as `ipfs add` would make it.
+
+    Returns the CID string, or (cid, block index) with `with_index=True`.
+    """
+    f, should_close = open_source(source)
+    workers = workers or os.cpu_count() or 1
+    leaves = []  # (cid bytes, tsize, filesize)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            batch = []
+            for chunk in read_chunks(f, chunk_size):
+                batch.append(chunk)
+                if len(batch) >= BATCH_CHUNKS:
+                    leaves.extend(pool.map(_leaf, batch, [version] * len(batch)))
+                    batch = []
+            if batch or not leaves:
+                batch = batch or [b""]
+                leaves.extend(pool.map(_leaf, batch, [version] * len(batch)))
+    finally:
+        if should_close:
+            f.close()
+
+    nodes = []
+    level = leaves
+    while len(level) > 1:
+        parents = []
+        for start in range(0, len(level), MAX_LINKS):
+            children = level[start:start + MAX_LINKS]
+            filesize = sum(child[2] for child in children)
+            block = pb_node(
+                unixfs_file(filesize=filesize, blocksizes=[child[2] for child in children]),
+                [(child[0], child[1]) for child in children],
+            )
+            node_cid = cid_bytes(hashlib.sha256(block).digest(), CODEC_DAG_PB, version)
+            nodes.append({"cid": cid_string(node_cid), "links": [cid_string(c[0]) for c in children]})
+            parents.append((node_cid, len(block) + sum(child[1] for child in children), filesize))
+        level = parents
+    root = cid_string(level[0][0])
+    if not with_index:
+        return root
+    offset = 0
+    index_leaves = []
+    for leaf_cid, _, size in leaves:
+        index_leaves.append([cid_string(leaf_cid), offset, size])
+        offset += size
+    return root, {
+        "root": root,
+        "cid_version": version,
+        "chunk_size": chunk_size,
+        "size": offset,
+        "leaves": index_leaves,
+        "nodes": nodes,
+    }
+
+
+# ─── Block Index Store ───
+def save_block_index(index_dir, block_index):
+    """Persist a block index as `<index_dir>/<root>.json`."""
+    os.makedirs(index_dir, exist_ok=True)
+    path = os.path.join(index_dir, f"{block_index['root']}.json")
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(block_index, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_block_index(index_dir, root):
+    try:
+        with open(os.path.join(index_dir, f"{root}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
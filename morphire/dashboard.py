@@ -0,0 +1,115 @@
+"""
+🐾 Morphire.ai — Dashboard job listing.
+
+Filtering, keyset pagination and card rendering for the Dashboard.
+Only one page of jobs is ever rendered, and a card's HTML is cached on
+exactly the fields it shows, so unchanged jobs are not rebuilt.
+"""
+
+import heapq
+import html
+from functools import lru_cache
+
+from metrics import instrumented
+
+PAGE_SIZES = [10, 20, 50, 100]
+SORT_FIELDS = {
+    "posted_at": lambda job: job.get("posted_at") or "",
+    "reward_skr": lambda job: job.get("reward_skr") or 0,
+}
+
+STATUS_EMOJI = {
+    "pending": "⏳",
+    "in_progress": "🔨",
+    "completed": "✅",
+    "paid": "💰",
+    "hired": "🤝",
+    "cancelled": "❌",
+}
+
+STATUS_COLORS = {
+    "pending": "#FFA726",
+    "in_progress": "#42A5F5",
+    "completed": "#66BB6A",
+    "paid": "#AB47BC",
+    "hired": "#26C6DA",
+    "cancelled": "#EF5350",
+}
+
+
+def filter_jobs(jobs, status=None, role=None, tag=None):
+    """Lazily yield jobs matching every given filter."""
+    for job in jobs:
+        if status and job.get("status", "pending") != status:
+            continue
+        if role and job.get("role") != role:
+            continue
+        if tag and tag not in job.get("tags", []):
+            continue
+        yield job
+
+
+def page_jobs(jobs, sort="posted_at", descending=True, page_size=20, cursor=None):
+    """One page of `jobs` in sort order, without sorting the whole list.
+
+    `cursor` is the (sort key, job id) of the last job on the previous
+    page. Returns (page, next_cursor); next_cursor is None on the last
+    page.
+    """
+    key_of = SORT_FIELDS[sort]
+
+    def key(job):
+        return (key_of(job), job.get("id") or "")
+
+    if cursor is not None:
+        cursor = tuple(cursor)
+        if descending:
+            jobs = (job for job in jobs if key(job) < cursor)
+        else:
+            jobs = (job for job in jobs if key(job) > cursor)
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    # One extra job tells us whether there is a next page
+    window = pick(page_size + 1, jobs, key=key)
+    page = window[:page_size]
+    next_cursor = key(page[-1]) if len(window) > page_size else None
+    return page, next_cursor
+
+
+@lru_cache(maxsize=4096)
+def _card_html(title, description, status, reward, role):
+    emoji = STATUS_EMOJI.get(status, "❓")
+    color = STATUS_COLORS.get(status, "#999")
+    # Jobs joined from the board carry another wallet's text
+    title, description, role = html.escape(str(title)), html.escape(str(description)), html.escape(str(role))
+    status, reward = html.escape(str(status).upper()), html.escape(str(reward))
+    return f"""
+                <div class="job-card">
+                    <div style="display:flex; justify-content:space-between; align-items:center;">
+                        <h3 style="margin:0; font-size:1.2em;">{title}</h3>
+                        <span class="status-badge" style="background:{color};">{emoji} {status}</span>
+                    </div>
+                    <p style="color:rgba(255,255,255,0.7); margin:8px 0;">{description}</p>
+                    <div style="display:flex; gap:20px; color:rgba(255,255,255,0.5); font-size:0.9em;">
+                        <span>🪙 {reward} SKR</span>
+                        <span>🏷️ {role}</span>
+                    </div>
+                </div>
+                """
+
+
+def job_card_html(job):
+    """HTML for one job card (cached per version of the shown fields)."""
+    return _card_html(
+        job["title"],
+        job.get("description", "No description"),
+        job.get("status", "pending"),
+        job.get("reward_skr", "?"),
+        job.get("role", "Unknown Role"),
+    )
+
+
+@instrumented("render_cards", bytes_of=len)
+def render_cards(jobs):
+    """HTML for a whole page of cards, sent as one markdown block."""
+    return "".join(job_card_html(job) for job in jobs)
+
@@ -0,0 +1,292 @@
+"""
+🐾 Morphire.ai — Streaming CSV/Parquet export for accounting.
+
+One table (jobs, messages, deliveries or transactions) of one wallet,
+or of every wallet for a date range (admins), live and archived alike:
+
+    python morphire/export.py TABLE WALLET [--format csv|parquet] [--since 2025-01] [--until 2025-03-31] [--out FILE] [--data-dir DIR]
+    python morphire/export.py transactions --all --since 2025-01 --format parquet
+
+Rows are tuples produced by generators over the live pod, the chat
+store and the archive segments, and are written BATCH_ROWS at a time:
+a CSV chunk or a Parquet row group per batch. Only one pod (or one
+archive segment) and one batch are in memory at once, however many
+rows the export has. Parquet needs pyarrow.
+
+`--since`/`--until` are ISO dates of any precision ("2025", "2025-03",
+"2025-03-31"), both inclusive, matched against each row's timestamp.
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+from itertools import islice
+
+from archive import SETTLED, get_archive, settled_at
+from chatstore import get_chat_store
+from placement import get_placement, wallet_pod_key
+from storage import POD_CACHE, get_store, pod_key
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+BATCH_ROWS = int(os.environ.get("MORPHIRE_EXPORT_BATCH", "10000"))
+FORMATS = ("csv", "parquet")
+AVAILABLE_FORMATS = FORMATS if pyarrow is not None else ("csv",)
+MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+# (column, type) per table; every row is a tuple in this order
+COLUMNS = {
+    "jobs": (
+        ("wallet", "str"), ("job_id", "str"), ("title", "str"), ("role", "str"), ("status", "str"),
+        ("reward_skr", "int"), ("posted_by", "str"), ("posted_at", "str"), ("settled_at", "str"),
+        ("paid_to", "str"), ("agent_wallet", "str"), ("tags", "str"), ("deliveries", "int"),
+        ("archived", "bool"),
+    ),
+    "messages": (
+        ("wallet", "str"), ("job_id", "str"), ("seq", "int"), ("sender", "str"), ("text", "str"),
+        ("sent_at", "str"),
+    ),
+    "deliveries": (
+        ("wallet", "str"), ("job_id", "str"), ("filename", "str"), ("ipfs_hash", "str"),
+        ("uploaded_at", "str"),
+    ),
+    "transactions": (
+        ("wallet", "str"), ("tx_id", "str"), ("type", "str"), ("job_id", "str"),
+        ("counterparty", "str"), ("amount_skr", "int"), ("created_at", "str"),
+    ),
+}
+TABLES = tuple(COLUMNS)
+# Pod sections each table reads
+SECTIONS = {
+    "jobs": ("meta", "jobs"),
+    "messages": ("meta", "jobs"),
+    "deliveries": ("meta", "jobs"),
+    "transactions": ("meta", "transactions"),
+}
+
+
+def in_range(stamp, since=None, until=None):
+    """`stamp` (ISO) falls within since..until, compared at their precision."""
+    if since is None and until is None:
+        return True
+    if not stamp:
+        return False
+    return (since is None or stamp[: len(since)] >= since) and (until is None or stamp[: len(until)] <= until)
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# ─── Rows ───
+def job_row(wallet, job, archived=False):
+    return (
+        wallet, job.get("id"), job.get("title"), job.get("role"), job.get("status"),
+        _int(job.get("reward_skr")), job.get("posted_by"), job.get("posted_at"),
+        settled_at(job) if job.get("status") in SETTLED else None,
+        job.get("paid_to"), job.get("agent_wallet"), ";".join(job.get("tags") or ()),
+        len(job.get("delivery_ipfs") or ()), archived,
+    )
+
+
+def message_row(wallet, job_id, seq, message):
+    return (wallet, job_id, seq, message.get("sender"), message.get("text"), message.get("sent_at"))
+
+
+def delivery_row(wallet, job_id, delivery):
+    return (wallet, job_id, delivery.get("filename"), delivery.get("ipfs_hash"), delivery.get("uploaded_at"))
+
+
+def transaction_row(wallet, tx):
+    return (
+        wallet, tx.get("id"), tx.get("type"), tx.get("job_id"), tx.get("counterparty"),
+        _int(tx.get("amount_skr")), tx.get("created_at"),
+    )
+
+
+class Exporter:
+    """Row generators over every pod (placement.py), the chat store and
+    the archive of a data dir."""
+
+    def __init__(self, data_dir, store=None):
+        self.store = store or get_store()
+        self.placement = get_placement(data_dir, self.store)
+        self.chat = get_chat_store(os.path.join(data_dir, "chat"))
+        self.archive = get_archive(os.path.join(data_dir, "archive"))
+
+    def rows(self, table, wallet=None, since=None, until=None):
+        """Rows of `table` for `wallet`, or of every wallet when None."""
+        if table not in COLUMNS:
+            raise ValueError(f"table must be one of {', '.join(TABLES)}")
+        if wallet is not None:
+            key = wallet_pod_key(wallet)
+            return self._pod_rows(self.placement.locate(key), key, table, since, until, wallet)
+        return self._all_rows(table, since, until)
+
+    def _all_rows(self, table, since, until):
+        for path in self.placement.pod_paths():
+            yield from self._pod_rows(path, pod_key(path), table, since, until)
+
+    def _load(self, path, keys, cached):
+        """The pod's `keys` sections; sweeps over every pod skip POD_CACHE
+        so they do not evict the pods the app is serving."""
+        if cached:
+            return POD_CACHE.load_sections(path, self.store, keys) or {}
+        if hasattr(self.store, "load_sections"):
+            return self.store.load_sections(path, keys) or {}
+        return self.store.load(path) or {}
+
+    def _pod_rows(self, path, key, table, since, until, wallet=None):
+        data = self._load(path, SECTIONS[table], cached=wallet is not None)
+        wallet = wallet or data.get("meta", {}).get("owner_wallet")
+        if table == "transactions":
+            for tx in data.get("transactions", []):
+                if in_range(tx.get("created_at"), since, until):
+                    yield transaction_row(wallet, tx)
+            return
+        for job in data.get("jobs", []):
+            yield from self._job_rows(wallet, key, job, table, since, until, archived=False)
+        if not self.archive.count(key):
+            return
+        # A job settles after it is posted, so older months hold nothing from `since` on
+        for _, job in self.archive.iter_jobs(key, since=since[:7] if since else None):
+            yield from self._job_rows(wallet, key, job, table, since, until, archived=True)
+
+    def _job_rows(self, wallet, key, job, table, since, until, archived):
+        if table == "jobs":
+            if in_range(job.get("posted_at"), since, until):
+                yield job_row(wallet, job, archived)
+        elif table == "deliveries":
+            for delivery in job.get("delivery_ipfs") or ():
+                if in_range(delivery.get("uploaded_at"), since, until):
+                    yield delivery_row(wallet, job["id"], delivery)
+        else:
+            for seq, message in self._messages(key, job, archived):
+                if in_range(message.get("sent_at"), since, until):
+                    yield message_row(wallet, job["id"], seq, message)
+
+    def _messages(self, key, job, archived):
+        """(seq, message) of a job: archived jobs carry their chat, live
+        ones may still embed messages not moved to the chat store yet."""
+        if archived:
+            yield from enumerate(job.get("chat_history", []))
+            return
+        stored = 0
+        for seq, message in self.chat.iter_forward(key, job["id"]):
+            stored = seq + 1
+            yield seq, message
+        yield from enumerate(job.get("chat_history", [])[stored:], stored)
+
+
+# ─── Writers ───
+def batches(rows, size=BATCH_ROWS):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def csv_chunks(rows, table, size=BATCH_ROWS):
+    """The CSV file as UTF-8 byte chunks: the header, then one per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in COLUMNS[table]])
+    yield buffer.getvalue().encode("utf-8")
+    for batch in batches(rows, size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def parquet_schema(table):
+    types = {"str": pyarrow.string(), "int": pyarrow.int64(), "bool": pyarrow.bool_()}
+    return pyarrow.schema([(name, types[kind]) for name, kind in COLUMNS[table]])
+
+
+def write_parquet(rows, out, table, size=BATCH_ROWS):
+    """Write `rows` to the binary file `out`, one row group per batch."""
+    if pyarrow is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    schema = parquet_schema(table)
+    count = 0
+    with pyarrow.parquet.ParquetWriter(out, schema, compression="zstd") as writer:
+        for batch in batches(rows, size):
+            arrays = [pyarrow.array(column, type=field.type) for column, field in zip(zip(*batch), schema)]
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+            count += len(batch)
+    return count
+
+
+def write(rows, out, table, fmt="csv", size=BATCH_ROWS):
+    """Stream `rows` to the binary file `out`; returns the row count."""
+    if fmt == "parquet":
+        return write_parquet(rows, out, table, size)
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    for chunk in csv_chunks(counted(), table, size):
+        out.write(chunk)
+    return count
+
+
+def export_file(rows, path, table, fmt="csv", size=BATCH_ROWS):
+    """Write an export to `path` (via a temp file, so a half-written one
+    never shows up there); returns the row count."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "wb") as out:
+            count = write(rows, out, table, fmt, size)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return count
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python morphire/export.py", description="🐾 Export pod data for accounting")
+    parser.add_argument("table", choices=TABLES)
+    parser.add_argument("wallet", nargs="?", help="one wallet's rows (or --all)")
+    parser.add_argument("--all", action="store_true", help="every wallet (admins)")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--since", help="first date, e.g. 2025-01 (inclusive)")
+    parser.add_argument("--until", help="last date, e.g. 2025-03-31 (inclusive)")
+    parser.add_argument("--out", help="output file (default: <table>.<format>, - for stdout)")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(__file__), "data_store"))
+    args = parser.parse_args(argv)
+    if bool(args.wallet) == args.all:
+        parser.error("give a WALLET or --all")
+    if args.format == "parquet" and pyarrow is None:
+        parser.error("--format parquet needs pyarrow (pip install pyarrow)")
+    rows = Exporter(args.data_dir).rows(args.table, args.wallet, args.since, args.until)
+    out = args.out or f"{args.table}.{args.format}"
+    if out == "-":
+        count = write(rows, sys.stdout.buffer, args.table, args.format)
+        sys.stdout.buffer.flush()
+    else:
+        count = export_file(rows, out, args.table, args.format)
+    print(f"🐾 {count:,} {args.table} row(s) → {out}", file=sys.stderr if out == "-" else sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
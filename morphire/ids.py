@@ -0,0 +1,162 @@
+"""
+🐾 Morphire.ai — Job IDs and the id → job index.
+
+New IDs keep the familiar prefixes but use a ULID-style body: a 48-bit
+millisecond timestamp followed by 80 random bits, in Crockford base32
+(`MF-01JAB3...`). They sort by creation time, and IDs generated in the
+same millisecond by this process are strictly increasing, so even a
+busy tenant never collides. Legacy 5-character IDs (`MF-7KQ2Z`) keep
+resolving through the same index.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+INDEX_SLOTS = int(os.environ.get("MORPHIRE_JOB_INDEX_SLOTS", "256"))
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_rand = 0
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        value, rem = divmod(value, 32)
+        chars.append(CROCKFORD[rem])
+    return "".join(reversed(chars))
+
+
+def new_ulid():
+    """A 26-character, time-ordered, monotonic ULID."""
+    global _last_ms, _last_rand
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms <= _last_ms:
+            # Same (or a backwards-stepped) millisecond: keep counting up
+            now_ms = _last_ms
+            _last_rand += 1
+            if _last_rand >= 1 << 80:
+                now_ms += 1
+                _last_rand = int.from_bytes(os.urandom(10), "big") >> 1
+        else:
+            _last_rand = int.from_bytes(os.urandom(10), "big") >> 1
+        _last_ms = now_ms
+        return _encode(now_ms, 10) + _encode(_last_rand, 16)
+
+
+def ulid_time(job_id):
+    """Creation time (epoch ms) encoded in a new-style ID, else None."""
+    body = job_id.rsplit("-", 1)[-1]
+    if len(body) != 26:
+        return None
+    value = 0
+    for char in body[:10]:
+        pos = CROCKFORD.find(char)
+        if pos < 0:
+            return None
+        value = value * 32 + pos
+    return value
+
+
+# ─── id → job Index ───
+class JobIndex:
+    """id → position in one pod's jobs list.
+
+    Lookups verify the position they return, so the index tolerates the
+    list being replaced or edited behind its back: appended jobs are
+    indexed incrementally, anything else triggers one rebuild. A miss is
+    only trusted once the list is known to be the indexed one (plus
+    appends), since one index serves every copy of the owner's pod.
+    """
+
+    def __init__(self):
+        self._positions = {}
+        self._indexed = 0
+        self._last_id = None  # id at position _indexed - 1
+        self._lock = threading.Lock()
+
+    def _extend(self, jobs):
+        for pos in range(self._indexed, len(jobs)):
+            self._positions[jobs[pos].get("id")] = pos
+        self._indexed = len(jobs)
+        self._last_id = jobs[-1].get("id") if jobs else None
+
+    def _matches(self, jobs):
+        """`jobs` is the indexed list, maybe with jobs appended. IDs are
+        unique and only ever appended, so removing any job moves another
+        one into the last indexed position."""
+        if self._indexed > len(jobs):
+            return False
+        return self._indexed == 0 or jobs[self._indexed - 1].get("id") == self._last_id
+
+    def _rebuild(self, jobs):
+        self._positions = {}
+        self._indexed = 0
+        self._extend(jobs)
+
+    def _lookup(self, jobs, job_id):
+        """(position or None, whether the index could be trusted)."""
+        pos = self._positions.get(job_id)
+        if pos is None:
+            return None, True
+        if pos < len(jobs) and jobs[pos].get("id") == job_id:
+            return pos, True
+        return None, False
+
+    def position(self, jobs, job_id):
+        """Position of the job with `job_id` in `jobs`, or None."""
+        with self._lock:
+            if not self._matches(jobs):
+                self._rebuild(jobs)  # jobs were removed (maybe others appended)
+            elif self._indexed < len(jobs):
+                self._extend(jobs)  # jobs were appended
+            pos, trusted = self._lookup(jobs, job_id)
+            if not trusted:
+                self._rebuild(jobs)
+                pos, _ = self._lookup(jobs, job_id)
+            return pos
+
+    def find(self, jobs, job_id):
+        pos = self.position(jobs, job_id)
+        return None if pos is None else jobs[pos]
+
+
+_indexes = OrderedDict()
+_indexes_guard = threading.Lock()
+
+
+def _index_for(data):
+    owner = data.get("meta", {}).get("owner_wallet")
+    with _indexes_guard:
+        index = _indexes.get(owner)
+        if index is None:
+            index = _indexes[owner] = JobIndex()
+            while len(_indexes) > INDEX_SLOTS:
+                _indexes.popitem(last=False)
+        _indexes.move_to_end(owner)
+        return index
+
+
+def find_job(data, job_id):
+    """The job with `job_id` in this pod, or None (O(1) amortized)."""
+    return _index_for(data).find(data["jobs"], job_id)
+
+
+def replace_job(data, job_id, new_job):
+    """Put `new_job` where the job with `job_id` is (O(1) amortized)."""
+    pos = _index_for(data).position(data["jobs"], job_id)
+    if pos is None:
+        raise KeyError(job_id)
+    data["jobs"][pos] = new_job
+
+
+def new_job_id(data, prefix="MF"):
+    """A fresh job ID checked against the pod's index."""
+    while True:
+        job_id = f"{prefix}-{new_ulid()}"
+        if find_job(data, job_id) is None:
+            return job_id
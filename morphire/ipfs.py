@@ -0,0 +1,234 @@
+"""
+🐾 Morphire.ai — Streaming IPFS uploads.
+
+Deliverables can be multi-GB, so nothing here holds a whole file in
+memory: content is hashed in fixed-size chunks, and the Pinata upload
+streams a multipart body straight from the source. A local
+content-hash → CID index lets repeat deliveries of the same bytes skip
+the network entirely.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import uuid
+
+import requests
+
+from cid import compute_cid, open_source, save_block_index
+from metrics import instrumented, measure
+
+PINATA_PIN_URL = "https://api.pinata.cloud/pinning/pinFileToIPFS"
+CHUNK_SIZE = 1024 * 1024
+UPLOAD_TIMEOUT = 60
+# CID version produced locally (simulation mode and failed uploads)
+CID_VERSION = int(os.environ.get("MORPHIRE_CID_VERSION", "0"))
+
+
+# ─── Sources ───
+def hash_stream(f, chunk_size=CHUNK_SIZE):
+    """(sha256 hex, byte count) of the rest of `f`, read in chunks."""
+    h = hashlib.sha256()
+    size = 0
+    with measure("ipfs_hash") as m:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                m.add_bytes(size)
+                return h.hexdigest(), size
+            h.update(chunk)
+            size += len(chunk)
+
+
+def _seekable(f):
+    try:
+        return f.seekable()
+    except AttributeError:
+        return False
+
+
+def spool(f, chunk_size=CHUNK_SIZE):
+    """Copy a one-shot stream to a temp file (hashing as we go)."""
+    tmp = tempfile.TemporaryFile()
+    h = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        h.update(chunk)
+        tmp.write(chunk)
+        size += len(chunk)
+    tmp.seek(0)
+    return tmp, h.hexdigest(), size
+
+
+# ─── Multipart Body ───
+class MultipartStream:
+    """A file-like multipart/form-data body that reads the file lazily.
+
+    `len()` is known up front, so requests sends a Content-Length
+    instead of chunked encoding; the payload is hashed as it streams.
+    """
+
+    def __init__(self, f, filename, size, field="file"):
+        self.boundary = uuid.uuid4().hex
+        safe_name = filename.replace('"', "_")
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{safe_name}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._f = f
+        self._size = size
+        self._parts = [self._head, None, self._tail]
+        self._part = 0
+        self._offset = 0
+        self.sha256 = hashlib.sha256()
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return len(self._head) + self._size + len(self._tail)
+
+    def read(self, n=-1):
+        if n is None or n < 0:
+            n = CHUNK_SIZE
+        while self._part < 3:
+            part = self._parts[self._part]
+            if part is None:
+                chunk = self._f.read(n)
+                if chunk:
+                    self.sha256.update(chunk)
+                    return chunk
+            elif self._offset < len(part):
+                chunk = part[self._offset:self._offset + n]
+                self._offset += len(chunk)
+                return chunk
+            self._part += 1
+            self._offset = 0
+        return b""
+
+
+# ─── Content Hash → CID Index ───
+class CIDIndex:
+    """Append-only JSONL map of content SHA-256 → pinned CID."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._entries[entry["sha256"]] = entry
+        except FileNotFoundError:
+            pass
+
+    def get(self, sha256_hex):
+        entry = self._entries.get(sha256_hex)
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry["cid"]
+
+    def put(self, sha256_hex, cid, size):
+        entry = {"sha256": sha256_hex, "cid": cid, "size": size}
+        with self._lock:
+            if self._entries.get(sha256_hex) == entry:
+                return
+            self._entries[sha256_hex] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_indexes = {}
+_indexes_guard = threading.Lock()
+
+
+def get_cid_index(path):
+    """Process-wide CIDIndex for `path`."""
+    with _indexes_guard:
+        if path not in _indexes:
+            _indexes[path] = CIDIndex(path)
+        return _indexes[path]
+
+
+# ─── Upload ───
+def local_cid(f, block_index_dir=None):
+    """The real CID of `f` computed locally (see cid.py)."""
+    with measure("ipfs_cid"):
+        if block_index_dir is None:
+            return compute_cid(f, version=CID_VERSION)
+        root, block_index = compute_cid(f, version=CID_VERSION, with_index=True)
+        save_block_index(block_index_dir, block_index)
+        return root
+
+
+@instrumented("ipfs_upload")
+def upload_stream(source, filename, api_key="", secret="", index=None,
+                  simulation=True, pin_url=PINATA_PIN_URL, block_index_dir=None):
+    """Upload a path or file-like object to IPFS (Pinata) or simulate.
+
+    Memory use is bounded by the chunk size whatever the file size.
+    Content already in `index` is not uploaded again. Simulation mode
+    computes the CID a real node would produce. Returns the CID.
+    """
+    src, should_close = open_source(source)
+    f = src
+    spooled = None
+    start = 0
+    try:
+        if simulation:
+            return local_cid(f, block_index_dir)
+        if _seekable(f):
+            start = f.tell()
+            digest, size = hash_stream(f)
+            f.seek(start)
+        else:
+            spooled, digest, size = spool(f)
+            f = spooled
+        if index is not None:
+            cid = index.get(digest)
+            if cid:
+                return cid
+        try:
+            body = MultipartStream(f, filename, size)
+            headers = {
+                "pinata_api_key": api_key,
+                "pinata_secret_api_key": secret,
+                "Content-Type": body.content_type,
+            }
+            with measure("ipfs_pin") as m:
+                r = requests.post(pin_url, data=body, headers=headers, timeout=UPLOAD_TIMEOUT)
+                m.add_bytes(size)
+            if r.status_code == 200 and body.sha256.hexdigest() == digest:
+                cid = r.json().get("IpfsHash", "")
+                if cid:
+                    if index is not None:
+                        index.put(digest, cid, size)
+                    return cid
+        except Exception:
+            pass
+        # Fallback to simulation
+        f.seek(start if spooled is None else 0)
+        return local_cid(f, block_index_dir)
+    finally:
+        if spooled is not None:
+            spooled.close()
+        if should_close:
+            src.close()
+
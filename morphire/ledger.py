@@ -0,0 +1,416 @@
+"""
+🐾 Morphire.ai — SKR payments ledger.
+
+An append-only, double-entry ledger shared by every wallet. Each
+posting is a list of (account, amount) entries that sums to zero:
+
+    wallet:<addr>               spendable SKR
+    escrow:<owner>:<job id>     SKR locked for one job
+    payable:<addr>              released to an agent, waiting for settlement
+    external / treasury / network:fees
+
+Postings live in one JSONL log (<data dir>/ledger/ledger.jsonl) that
+every process tails, like the job board. Balances are running totals
+updated as postings are applied, so balance queries are O(1).
+
+Released payouts are not paid one by one: they queue until a
+settlement round (BATCH_SIZE payouts, or the oldest waiting
+BATCH_WINDOW_S) hands them to the settlement client as one batch, so
+the per-transaction fee is paid once per MAX_TRANSFERS_PER_TX
+transfers. The client is pluggable (MORPHIRE_SETTLEMENT); "sim" is a
+local stand-in for the Solana cluster.
+
+    python morphire/ledger.py settle [DATA_DIR]   # settle everything now
+    python morphire/ledger.py verify [DATA_DIR]   # trial balance
+"""
+
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+from cid import base58btc
+from ids import new_ulid
+from stats import track_transaction
+from storage import SharedLog, pod_lock, transaction_appended
+
+# Settle once this many payouts wait, or the oldest has waited this long
+BATCH_SIZE = int(os.environ.get("MORPHIRE_SETTLE_BATCH", "50"))
+BATCH_WINDOW_S = float(os.environ.get("MORPHIRE_SETTLE_WINDOW", "60"))
+SETTLEMENT_CLIENT = os.environ.get("MORPHIRE_SETTLEMENT", "sim")
+# Simulated chain: fee per transaction, transfers that fit in one
+BASE_FEE_SKR = 1
+MAX_TRANSFERS_PER_TX = 20
+RECENT_PER_WALLET = 20
+
+EXTERNAL = "external"
+TREASURY = "treasury"
+FEES = "network:fees"
+_WALLET_KINDS = ("wallet", "escrow", "payable")
+JST = timezone(timedelta(hours=9))
+
+
+class InsufficientFunds(ValueError):
+    """A posting would overdraw a wallet or a job's escrow."""
+
+
+class AlreadyReleased(Exception):
+    """The job's reward was released already (see Ledger.pay)."""
+
+
+class SettlementError(Exception):
+    """The settlement client could not submit a round (payouts stay queued)."""
+
+
+def wallet_account(wallet):
+    return f"wallet:{wallet}"
+
+
+def escrow_account(owner, job_id):
+    return f"escrow:{owner}:{job_id}"
+
+
+def payable_account(wallet):
+    return f"payable:{wallet}"
+
+
+def posting(kind, entries, job=None, **extra):
+    """A balanced posting record; `entries` is [(account, amount), ...]."""
+    entries = [[account, int(amount)] for account, amount in entries if amount]
+    if not entries or sum(amount for _, amount in entries) != 0:
+        raise ValueError(f"unbalanced {kind} posting: {entries}")
+    rec = {"op": "post", "id": f"LG-{new_ulid()}", "kind": kind, "ts": time.time(), "entries": entries}
+    if job is not None:
+        rec["job"] = list(job)
+    rec.update(extra)
+    return rec
+
+
+def pod_transaction(data, posting, tx_type, job_id=None, counterparty=None):
+    """Append a posting to the pod's `transactions`; returns the change record."""
+    tx = {
+        "id": posting["id"],
+        "type": tx_type,
+        "job_id": job_id,
+        "counterparty": counterparty,
+        "amount_skr": sum(amount for account, amount in posting["entries"] if amount > 0),
+        "created_at": datetime.fromtimestamp(posting["ts"], JST).isoformat(),
+    }
+    data["transactions"].append(tx)
+    track_transaction(data, tx)
+    return transaction_appended(len(data["transactions"]) - 1, tx)
+
+
+# ─── Settlement Clients ───
+class SimulatedSettlement:
+    """Local stand-in for the chain: deterministic signatures, a slot
+    counter, BASE_FEE_SKR per transaction of up to `max_transfers`."""
+
+    name = "sim"
+
+    def __init__(self, base_fee=BASE_FEE_SKR, max_transfers=MAX_TRANSFERS_PER_TX):
+        self.base_fee = base_fee
+        self.max_transfers = max_transfers
+        self.slot = int(time.time() * 2.5)  # ~400 ms slots
+        self.rounds = 0
+
+    def submit(self, round_id, transfers):
+        """Pay `transfers` [(wallet, amount)]; returns the round receipt."""
+        n_tx = math.ceil(len(transfers) / self.max_transfers)
+        digest = hashlib.sha512(json.dumps([round_id, transfers]).encode()).digest()
+        self.slot += 1
+        self.rounds += 1
+        return {"signature": base58btc(digest), "slot": self.slot, "transactions": n_tx, "fee": n_tx * self.base_fee}
+
+
+SETTLEMENT_CLIENTS = {
+    "sim": SimulatedSettlement,
+}
+
+
+def get_settlement_client(name=None):
+    name = name or SETTLEMENT_CLIENT
+    if name not in SETTLEMENT_CLIENTS:
+        raise ValueError(f"Unknown settlement client: {name!r} (choose from {', '.join(SETTLEMENT_CLIENTS)})")
+    return SETTLEMENT_CLIENTS[name]()
+
+
+# ─── Ledger ───
+class Ledger:
+    """Running balances over the posting log.
+
+    With `log_path=None` the ledger is purely in memory (benchmarks).
+    """
+
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+        self._lock = threading.RLock()
+        self._reset()
+        self._log = SharedLog(log_path, self._apply, self._reset) if log_path else None
+        # Rounds are submitted by one process at a time
+        self._settle_path = os.path.join(os.path.dirname(log_path), "settlement") if log_path else None
+        self.failed_rounds = 0
+        self._catch_up()
+
+    def _reset(self):
+        self._balances = {}  # account -> SKR
+        self._wallets = {}  # (wallet, account kind) -> SKR across its accounts
+        self._released = {}  # (owner, job id) -> SKR released to agents
+        self._pending = OrderedDict()  # release posting id -> posting, oldest first
+        self._settled = {}  # release posting id -> round signature
+        self._recent = {}  # wallet -> deque of its latest postings
+        self.postings = 0
+        self.entries = 0
+
+    def _apply(self, rec):
+        if rec.get("op") != "post":
+            return
+        touched = set()
+        for account, amount in rec["entries"]:
+            self._balances[account] = self._balances.get(account, 0) + amount
+            kind, _, rest = account.partition(":")
+            if kind in _WALLET_KINDS:
+                wallet = rest.split(":", 1)[0]
+                key = (wallet, kind)
+                self._wallets[key] = self._wallets.get(key, 0) + amount
+                touched.add(wallet)
+        kind = rec["kind"]
+        if kind == "release":
+            job = tuple(rec["job"])
+            self._released[job] = self._released.get(job, 0) + rec["payout"]["amount"]
+            self._pending[rec["id"]] = rec
+        elif kind == "settle":
+            for payout_id in rec["round"]["payouts"]:
+                self._pending.pop(payout_id, None)
+                self._settled[payout_id] = rec["round"]["signature"]
+        for wallet in touched:
+            recent = self._recent.get(wallet)
+            if recent is None:
+                recent = self._recent[wallet] = deque(maxlen=RECENT_PER_WALLET)
+            recent.append(rec)
+        self.postings += 1
+        self.entries += len(rec["entries"])
+
+    def _catch_up(self):
+        if self._log is not None:
+            self._log.catch_up()
+
+    def _write(self, records, check=None):
+        """Append postings; `check()` runs caught up, under the log lock."""
+        with self._lock:
+            if self._log is None:
+                if check is not None:
+                    check()
+                for rec in records:
+                    self._apply(rec)
+            else:
+                self._log.append(records, check=check)
+
+    # ─── Queries (O(1)) ───
+    def balance(self, account):
+        with self._lock:
+            self._catch_up()
+            return self._balances.get(account, 0)
+
+    def wallet_balance(self, wallet):
+        """{"available", "escrowed", "pending_payout"} for one wallet."""
+        with self._lock:
+            self._catch_up()
+            return {
+                "available": self._wallets.get((wallet, "wallet"), 0),
+                "escrowed": self._wallets.get((wallet, "escrow"), 0),
+                "pending_payout": self._wallets.get((wallet, "payable"), 0),
+            }
+
+    def job_balance(self, owner, job_id):
+        """{"escrowed", "released"} for one job."""
+        with self._lock:
+            self._catch_up()
+            return {
+                "escrowed": self._balances.get(escrow_account(owner, job_id), 0),
+                "released": self._released.get((owner, job_id), 0),
+            }
+
+    def recent(self, wallet):
+        """The wallet's latest postings, newest first."""
+        with self._lock:
+            self._catch_up()
+            return list(reversed(self._recent.get(wallet, ())))
+
+    def payout_status(self, payout_id):
+        """Round signature once settled, "pending" before, None if unknown."""
+        with self._lock:
+            self._catch_up()
+            if payout_id in self._pending:
+                return "pending"
+            return self._settled.get(payout_id)
+
+    def pending_count(self):
+        with self._lock:
+            self._catch_up()
+            return len(self._pending)
+
+    def trial_balance(self):
+        """Sum of every account (0 unless the log is corrupt)."""
+        with self._lock:
+            self._catch_up()
+            return sum(self._balances.values())
+
+    # ─── Postings ───
+    def _require(self, account, amount):
+        if self._balances.get(account, 0) < amount:
+            raise InsufficientFunds(f"{account} holds {self._balances.get(account, 0)} SKR, {amount} needed")
+
+    def deposit(self, wallet, amount, memo=""):
+        """Bring SKR in from outside (simulated faucet / on-ramp)."""
+        rec = posting("deposit", [(EXTERNAL, -amount), (wallet_account(wallet), amount)], memo=memo)
+        self._write([rec])
+        return rec
+
+    def escrow(self, owner, job_id, amount):
+        """Lock `amount` of the owner's SKR for a job."""
+        wallet = wallet_account(owner)
+        rec = posting("escrow", [(wallet, -amount), (escrow_account(owner, job_id), amount)], job=(owner, job_id))
+        self._write([rec], check=lambda: self._require(wallet, amount))
+        return rec
+
+    def refund(self, owner, job_id):
+        """Return whatever is left in a job's escrow to its owner."""
+        with self._lock:
+            self._catch_up()
+            left = self._balances.get(escrow_account(owner, job_id), 0)
+        if not left:
+            return None
+        rec = posting("refund", [(escrow_account(owner, job_id), -left), (wallet_account(owner), left)],
+                      job=(owner, job_id))
+        self._write([rec], check=lambda: self._require(escrow_account(owner, job_id), left))
+        return rec
+
+    def pay(self, owner, job_id, agent, amount):
+        """Release `amount` from the job's escrow (topped up from the
+        owner's wallet if short) to `agent`; queued for settlement.
+
+        Returns the release posting (its id tracks the payout), or None if
+        `amount` was released for the job already: a retried or concurrent
+        payment (another click, the scheduler's auto-pay) never pays twice.
+        """
+        escrow = escrow_account(owner, job_id)
+        release = posting(
+            "release", [(escrow, -amount), (payable_account(agent), amount)],
+            job=(owner, job_id), payout={"agent": agent, "amount": int(amount)},
+        )
+        records = [release]
+
+        def check():
+            if self._released.get((owner, job_id), 0) >= amount:
+                raise AlreadyReleased(job_id)
+            shortfall = amount - self._balances.get(escrow, 0)
+            if shortfall > 0:
+                self._require(wallet_account(owner), shortfall)
+                records.insert(0, posting("escrow", [(wallet_account(owner), -shortfall), (escrow, shortfall)],
+                                          job=(owner, job_id)))
+
+        # check() may put the escrow top-up in front, before anything is written
+        try:
+            self._write(records, check=check)
+        except AlreadyReleased:
+            return None
+        return release
+
+    # ─── Settlement ───
+    def due(self, now=None):
+        """Whether a settlement round should run now."""
+        with self._lock:
+            self._catch_up()
+            if not self._pending:
+                return False
+            oldest = next(iter(self._pending.values()))
+            return len(self._pending) >= BATCH_SIZE or (now or time.time()) - oldest["ts"] >= BATCH_WINDOW_S
+
+    def settle(self, client, max_batch=BATCH_SIZE):
+        """Submit one round of up to `max_batch` queued payouts.
+
+        Payouts to the same agent become one transfer. Returns the round
+        (signature, payouts, fee, ...) or None if nothing was queued.
+        """
+        with pod_lock(self._settle_path) if self._settle_path else nullcontext():
+            with self._lock:
+                self._catch_up()
+                due = list(islice(self._pending.values(), max_batch))
+            if not due:
+                return None
+            transfers = {}
+            for rec in due:
+                agent = rec["payout"]["agent"]
+                transfers[agent] = transfers.get(agent, 0) + rec["payout"]["amount"]
+            round_id = f"RD-{new_ulid()}"
+            try:
+                receipt = client.submit(round_id, sorted(transfers.items()))
+            except Exception as e:
+                self.failed_rounds += 1
+                raise SettlementError(f"round {round_id} ({len(due)} payouts) failed: {e}") from e
+            entries = []
+            for agent, amount in transfers.items():
+                entries += [(payable_account(agent), -amount), (wallet_account(agent), amount)]
+            entries += [(TREASURY, -receipt["fee"]), (FEES, receipt["fee"])]
+            rec = posting("settle", entries, round=dict(
+                receipt, id=round_id, client=client.name, payouts=[p["id"] for p in due],
+            ))
+            self._write([rec])
+            return rec["round"]
+
+    def maybe_settle(self, client, now=None):
+        """Run a round if one is due; failures leave payouts queued."""
+        if not self.due(now):
+            return None
+        try:
+            return self.settle(client)
+        except SettlementError:
+            return None
+
+
+_ledgers = {}
+_ledgers_guard = threading.Lock()
+
+
+def get_ledger(path):
+    """Process-wide Ledger backed by the log at `path`."""
+    with _ledgers_guard:
+        if path not in _ledgers:
+            _ledgers[path] = Ledger(path)
+        return _ledgers[path]
+
+
+# ─── CLI ───
+def main(argv):
+    if not argv or argv[0] not in ("settle", "verify"):
+        print("usage: python morphire/ledger.py settle|verify [DATA_DIR]")
+        return 2
+    data_dir = argv[1] if len(argv) > 1 else os.path.join(os.path.dirname(__file__), "data_store")
+    ledger = Ledger(os.path.join(data_dir, "ledger", "ledger.jsonl"))
+    if argv[0] == "verify":
+        total = ledger.trial_balance()
+        print(f"{'🐾 balanced' if total == 0 else '❌ off by ' + str(total)}: "
+              f"{ledger.postings} postings, {ledger.entries} entries, {ledger.pending_count()} payouts queued")
+        return 0 if total == 0 else 1
+    client = get_settlement_client()
+    rounds = 0
+    while True:
+        receipt = ledger.settle(client)
+        if receipt is None:
+            break
+        rounds += 1
+        print(f"⛓️ {receipt['id']}: {len(receipt['payouts'])} payouts, fee {receipt['fee']} SKR, {receipt['signature'][:16]}…")
+    print(f"🐾 {rounds} round(s) settled")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
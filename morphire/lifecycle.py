@@ -0,0 +1,385 @@
+"""
+🐾 Morphire.ai — Job lifecycle scheduler.
+
+Deadlines for every wallet's jobs sit in one queue, so nothing has to
+scan the pods to find what is due:
+
+- "expire":        a pending recruiter job is cancelled JOB_TTL_DAYS after
+                   posting (its escrow goes back to the owner)
+- "auto_pay":      a completed job is paid to its agent once the
+                   ACCEPT_WINDOW_H acceptance window has passed
+- "remind_expire", "remind_pay": a Discord reminder REMIND_BEFORE_H earlier
+
+`save_data` keeps the queue in sync (like the job board). The queue is
+a heap in memory and an append-only log of put/del records on disk
+(<data dir>/lifecycle/queue.jsonl), so it survives restarts and is
+shared between processes. One scheduler at a time pops due events in
+batches, loads only the pods they belong to and commits each pod once:
+
+    python morphire/lifecycle.py run [DATA_DIR]
+
+or set MORPHIRE_SCHEDULER=1 to run it on a thread inside the app.
+Every event is checked against the pod before it fires, so stale or
+repeated events are harmless.
+"""
+
+import heapq
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from board import get_board
+from ids import find_job, replace_job
+from ledger import JST, InsufficientFunds, get_ledger, get_settlement_client, pod_transaction
+from notify import get_dispatcher
+from stats import track_job_changed
+from placement import get_placement
+from storage import SharedLog, get_store, job_updated, pod_key, pod_lock, section_set, update_pod
+
+JOB_TTL_DAYS = float(os.environ.get("MORPHIRE_JOB_TTL_DAYS", "30"))
+ACCEPT_WINDOW_H = float(os.environ.get("MORPHIRE_ACCEPT_WINDOW_H", "72"))
+REMIND_BEFORE_H = float(os.environ.get("MORPHIRE_REMIND_BEFORE_H", "24"))
+# Auto-payments that bounce (owner short of SKR) are retried this much later
+RETRY_S = 6 * 3600
+TICK_S = float(os.environ.get("MORPHIRE_SCHEDULER_TICK", "5"))
+BATCH = 500
+REMINDERS = {"remind_expire": "expire", "remind_pay": "auto_pay"}
+# Rewrite the log once done/superseded records outnumber live deadlines
+COMPACT_MIN_DEAD = int(os.environ.get("MORPHIRE_LIFECYCLE_COMPACT_MIN", "10000"))
+
+
+def _epoch(stamp):
+    try:
+        return datetime.fromisoformat(stamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def deadlines(job):
+    """{kind: epoch seconds} the job should fire (empty when none apply)."""
+    if job.get("role") != "recruiter":
+        return {}
+    status = job.get("status", "pending")
+    if status == "pending":
+        posted = _epoch(job.get("posted_at"))
+        if posted is None:
+            return {}
+        expire = posted + JOB_TTL_DAYS * 86400
+        return {"expire": expire, "remind_expire": expire - REMIND_BEFORE_H * 3600}
+    if status == "completed" and job.get("agent_wallet"):
+        completed = _epoch(job.get("completed_at"))
+        if completed is None:
+            return {}
+        if job.get("retry_pay_at"):
+            return {"auto_pay": job["retry_pay_at"]}
+        pay = completed + ACCEPT_WINDOW_H * 3600
+        return {"auto_pay": pay, "remind_pay": pay - REMIND_BEFORE_H * 3600}
+    return {}
+
+
+# ─── Deadline Queue ───
+class DeadlineQueue:
+    """Latest deadline per (owner, job id, kind), heap-ordered.
+
+    Superseded heap entries are skipped when popped. With
+    `log_path=None` the queue is purely in memory (benchmarks).
+    """
+
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+        self._lock = threading.RLock()
+        self._reset()
+        self._log = SharedLog(log_path, self._apply, self._reset) if log_path else None
+        self._catch_up()
+
+    def _reset(self):
+        self._due = {}  # (owner, job id, kind) -> (due, pod file name)
+        self._by_job = {}  # (owner, job id) -> set of kinds
+        self._heap = []  # (due, key), possibly stale
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._due)
+
+    def _apply(self, rec):
+        key = tuple(rec["key"])
+        current = self._due.get(key)
+        if rec["op"] == "put":
+            self._dead += current is not None
+            self._due[key] = (rec["due"], rec["pod"])
+            self._by_job.setdefault(key[:2], set()).add(key[2])
+            heapq.heappush(self._heap, (rec["due"], key))
+        elif rec["op"] == "del":
+            # Dead either way: the "del" removes an entry, or is itself a no-op
+            self._dead += 1
+            # A "del" for a fired deadline leaves one re-queued since alone
+            if current is None or rec.get("due", current[0]) != current[0]:
+                return
+            del self._due[key]
+            kinds = self._by_job[key[:2]]
+            kinds.discard(key[2])
+            if not kinds:
+                del self._by_job[key[:2]]
+
+    def _catch_up(self):
+        if self._log is not None:
+            self._log.catch_up()
+
+    def _write(self, records):
+        if not records:
+            return
+        with self._lock:
+            if self._log is None:
+                for rec in records:
+                    self._apply(rec)
+            else:
+                self._log.append(records, compact=self._compact)
+
+    def _compact(self):
+        if self._dead > max(COMPACT_MIN_DEAD, len(self._due)):
+            return [{"op": "put", "key": list(key), "due": due, "pod": pod} for key, (due, pod) in self._due.items()]
+        return None
+
+    def put(self, owner, job_id, kind, due, pod):
+        self._write([{"op": "put", "key": [owner, job_id, kind], "due": due, "pod": pod}])
+
+    def done(self, events):
+        """Drop fired [(key, due)] deadlines."""
+        self._write([{"op": "del", "key": list(key), "due": due} for key, due in events])
+
+    def sync_pod(self, data, changes, path):
+        """Bring one pod's deadlines up to date after a save.
+
+        With change records only the touched jobs are looked at;
+        without them the whole pod is compared to what is queued.
+        """
+        owner = data["meta"]["owner_wallet"]
+        pod = os.path.basename(path)
+        with self._lock:
+            self._catch_up()
+            if changes is None:
+                jobs = data.get("jobs", [])
+                gone = {key for key in self._by_job if key[0] == owner} - {(owner, job.get("id")) for job in jobs}
+            else:
+                jobs = [rec["job"] for rec in changes if rec["op"] == "job_put"]
+                gone = {(owner, rec["id"]) for rec in changes if rec["op"] == "job_del"}
+            records = []
+            for job_key in gone:
+                records += [{"op": "del", "key": [*job_key, kind]} for kind in self._by_job.get(job_key, ())]
+            for job in jobs:
+                job_key = (owner, job.get("id"))
+                wanted = deadlines(job)
+                for kind, due in wanted.items():
+                    current = self._due.get((*job_key, kind))
+                    if current is None or current[0] != due:
+                        records.append({"op": "put", "key": [*job_key, kind], "due": due, "pod": pod})
+                for kind in self._by_job.get(job_key, set()) - wanted.keys():
+                    records.append({"op": "del", "key": [*job_key, kind]})
+            self._write(records)
+
+    def due(self, now, limit=BATCH):
+        """Up to `limit` [(key, due, pod)] due by `now`, earliest first."""
+        with self._lock:
+            self._catch_up()
+            found = []
+            seen = set()
+            heap = self._heap
+            while heap and heap[0][0] <= now and len(found) < limit:
+                due, key = heapq.heappop(heap)
+                current = self._due.get(key)
+                if current is None or current[0] != due or key in seen:
+                    continue  # superseded or already done
+                seen.add(key)
+                found.append((key, due, current[1]))
+            # Entries handed out stay queued (and in the heap) until done()
+            for key, due, _ in found:
+                heapq.heappush(heap, (due, key))
+            return found
+
+    def next_due(self):
+        with self._lock:
+            self._catch_up()
+            while self._heap and self._due.get(self._heap[0][1], (None,))[0] != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+
+_queues = {}
+_queues_guard = threading.Lock()
+
+
+def get_queue(path):
+    """Process-wide DeadlineQueue backed by the log at `path`."""
+    with _queues_guard:
+        if path not in _queues:
+            _queues[path] = DeadlineQueue(path)
+        return _queues[path]
+
+
+# ─── Scheduler ───
+class Scheduler:
+    """Fires due events: one load + one commit per pod and batch."""
+
+    def __init__(self, data_dir, webhook_url=None, store=None):
+        self.data_dir = data_dir
+        self.store = store or get_store()
+        self.queue = get_queue(os.path.join(data_dir, "lifecycle", "queue.jsonl"))
+        self.board = get_board(os.path.join(data_dir, "board", "board.jsonl"))
+        self.placement = get_placement(data_dir, self.store)
+        self.ledger = get_ledger(os.path.join(data_dir, "ledger", "ledger.jsonl"))
+        self.settlement = get_settlement_client()
+        self.webhook_url = os.environ.get("MORPHIRE_DISCORD_WEBHOOK", "") if webhook_url is None else webhook_url
+        self.fired = {}  # kind -> events acted on
+        self.skipped = 0
+
+    def notify(self, content, title, description, job_id):
+        if not self.webhook_url:
+            return
+        embed = {
+            "title": title,
+            "description": description,
+            "color": 0xFFA726,
+            "footer": {"text": f"Job: {job_id} | Morphire.ai 🐾"},
+            "timestamp": datetime.now(JST).isoformat(),
+        }
+        dispatcher = get_dispatcher(self.webhook_url, spill_path=os.path.join(self.data_dir, "discord-spill.jsonl"))
+        dispatcher.submit({"content": content, "username": "🐾 Morphire.ai", "embeds": [embed]})
+
+    def _fire(self, data, kind, job, now):
+        """Act on one event; returns the job's new state or None if unchanged."""
+        owner = data["meta"]["owner_wallet"]
+        stamp = datetime.fromtimestamp(now, JST).isoformat()
+        title = job["title"]
+        if kind == "remind_expire":
+            self.notify(f"⏰ [{job['id']}] **{title}** expires in {REMIND_BEFORE_H:.0f}h",
+                        f"⏰ まもなく期限切れ: {title}", "No agent yet — repost or raise the reward 🐾", job["id"])
+        elif kind == "remind_pay":
+            self.notify(f"💸 [{job['id']}] **{title}** auto-pays {job.get('reward_skr', 0)} SKR in {REMIND_BEFORE_H:.0f}h",
+                        f"💸 自動支払い予定: {title}", f"**Agent:** `{job['agent_wallet']}`", job["id"])
+        elif kind == "expire":
+            refund = self.ledger.refund(owner, job["id"])
+            self.notify(f"⌛ [{job['id']}] **{title}** expired", f"⌛ 期限切れ: {title}",
+                        f"Cancelled after {JOB_TTL_DAYS:.0f} days without an agent", job["id"])
+            return dict(job, status="cancelled", expired_at=stamp), refund and ("refund", refund, None)
+        elif kind == "auto_pay":
+            amount = job.get("reward_skr", 0) or 0
+            release = None
+            # Already released (crash before the pod was saved): don't pay twice
+            if self.ledger.job_balance(owner, job["id"])["released"] < amount:
+                try:
+                    release = self.ledger.pay(owner, job["id"], job["agent_wallet"], amount)
+                except InsufficientFunds:
+                    self.notify(f"⚠️ [{job['id']}] auto-payment of {amount} SKR bounced: not enough SKR",
+                                f"⚠️ 自動支払い失敗: {title}", "Top up the wallet; retrying later", job["id"])
+                    return dict(job, retry_pay_at=now + RETRY_S), None
+            paid = dict(job, status="paid", paid_at=stamp, paid_to=job["agent_wallet"])
+            paid.pop("retry_pay_at", None)
+            return paid, release and ("payout", release, job["agent_wallet"])
+        return None, None
+
+    def _run_pod(self, pod, events, now):
+        changes = []
+
+        def fire(data):
+            # Under the pod's lock (update_pod): nothing the owner or agent
+            # saves meanwhile can be overwritten by the jobs fired here
+            for key, due in events:
+                job = find_job(data, key[1])
+                wanted = {} if job is None else deadlines(job)
+                # Only if the job still wants this event at this time (and a
+                # reminder only while its deadline is still ahead)
+                if wanted.get(key[2]) != due or wanted.get(REMINDERS.get(key[2]), now + 1) <= now:
+                    self.skipped += 1
+                    continue
+                new_job, tx = self._fire(data, key[2], job, now)
+                self.fired[key[2]] = self.fired.get(key[2], 0) + 1
+                if new_job is not None:
+                    replace_job(data, job["id"], new_job)
+                    track_job_changed(data, job, new_job)
+                    changes.append(job_updated(new_job))
+                if tx:
+                    changes.append(pod_transaction(data, tx[1], tx[0], job["id"], tx[2]))
+            if changes:
+                data["meta"]["lastUpdated"] = datetime.now(JST).isoformat()
+                changes.append(section_set("stats", data["stats"]))
+            return changes
+
+        path = self.placement.locate(pod_key(pod))
+        data = update_pod(self.store, path, fire)
+        if data is None:
+            self.queue.done(events)
+            return
+        if changes:
+            self.board.sync_pod(data, changes)
+        # Fired events are done; changed jobs get their next deadlines
+        self.queue.done(events)
+        self.queue.sync_pod(data, changes, path)
+
+    def run_once(self, now=None):
+        """Fire up to BATCH due events; returns how many were due."""
+        now = time.time() if now is None else now
+        due = self.queue.due(now)
+        by_pod = {}
+        for key, when, pod in due:
+            by_pod.setdefault(pod, []).append((key, when))
+        for pod, events in by_pod.items():
+            self._run_pod(pod, events, now)
+        if due:
+            self.ledger.maybe_settle(self.settlement)
+        return len(due)
+
+    def run(self, stop=None):
+        """Loop until `stop` is set; one scheduler per data dir at a time."""
+        stop = stop or threading.Event()
+        with pod_lock(os.path.join(self.data_dir, "lifecycle", "scheduler")):
+            while not stop.is_set():
+                if self.run_once() >= BATCH:
+                    continue  # more are due right now
+                next_due = self.queue.next_due()
+                wait = TICK_S if next_due is None else min(TICK_S, max(0.0, next_due - time.time()))
+                stop.wait(wait)
+
+
+_background = None
+_background_guard = threading.Lock()
+
+
+def start_background(data_dir):
+    """Run the scheduler on a daemon thread (once per process)."""
+    global _background
+    with _background_guard:
+        if _background is None:
+            _background = threading.Thread(target=Scheduler(data_dir).run, daemon=True, name="morphire-lifecycle")
+            _background.start()
+        return _background
+
+
+# ─── CLI ───
+def main(argv):
+    if not argv or argv[0] not in ("run", "sync"):
+        print("usage: python morphire/lifecycle.py run|sync [DATA_DIR]")
+        return 2
+    data_dir = argv[1] if len(argv) > 1 else os.path.join(os.path.dirname(__file__), "data_store")
+    if argv[0] == "sync":
+        # One-off: queue the deadlines of pods saved before the scheduler existed
+        store = get_store()
+        queue = get_queue(os.path.join(data_dir, "lifecycle", "queue.jsonl"))
+        for path in get_placement(data_dir, store).pod_paths():
+            data = store.load(path)
+            if data is not None:
+                queue.sync_pod(data, None, path)
+        print(f"🐾 {len(queue)} deadline(s) queued")
+        return 0
+    scheduler = Scheduler(data_dir)
+    print(f"🐾 lifecycle scheduler on {data_dir}: {len(scheduler.queue)} deadline(s) queued")
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print(f"🐾 stopped; fired {scheduler.fired}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,665 @@
+"""
+🐾 Morphire.ai — Skill-to-job matching.
+
+Recommends open board jobs to an agent and agents to a recruiter's job.
+Agents are described by `profile.skills`, jobs by their tags plus the
+comma-separated `requirements`; both become TF-IDF vectors over the
+same normalized feature names, and
+
+    score = cosine(agent, job) * (1 + CREDIT_BOOST * (credit_score - 50) / 50)
+
+so a well-rated agent ranks higher for the same fit. Profiles reach the
+engine through an agent directory that is shared between processes like
+the job board (`<data dir>/board/agents.jsonl`); existing pods are
+published once with:
+
+    python morphire/matching.py rebuild [DATA_DIR]
+
+Agents (and jobs) with the same feature set have the same vector, so
+the engine scores distinct vectors ("groups") only. A full build
+multiplies the two sides in blocks (SciPy sparse @ sparse, dense block,
+argpartition for the top K) and precomputes per group:
+
+* agent group -> best job groups, enough of them to hold TOP_K jobs
+* job group -> best TOP_K + 1 agent groups by cosine * best boost
+
+Later changes only score the new or changed vector against the other
+side through an inverted index, and patch the lists it can enter. Lists
+that may have lost a member are recomputed on their next read. IDF is
+frozen at build time; a full rebuild runs once more than REBUILD_DRIFT
+of the rows changed. Without NumPy/SciPy the build uses the inverted
+index for every group (same results, much slower).
+"""
+
+import heapq
+import math
+import os
+import re
+import sys
+import threading
+from operator import itemgetter
+
+from placement import get_placement
+from storage import SharedLog, get_store
+
+try:
+    import numpy as np
+    import scipy.sparse as sp
+except ImportError:  # optional: only full builds benefit
+    np = sp = None
+
+TOP_K = int(os.environ.get("MORPHIRE_MATCH_TOP_K", "20"))
+CREDIT_BOOST = 0.5
+REBUILD_DRIFT = 0.2
+# Dense score block size (floats) per step of a full build
+BLOCK_FLOATS = int(os.environ.get("MORPHIRE_MATCH_BLOCK_FLOATS", "16000000"))
+BUCKET_WIDTH = 64
+COMPACT_MIN_DEAD = int(os.environ.get("MORPHIRE_AGENTS_COMPACT_MIN", "10000"))
+
+_SPLIT = re.compile(r"[,;/|\n、]+")
+_SPACE = re.compile(r"\s+")
+
+
+# ─── Features ───
+def normalize_skill(text):
+    return _SPACE.sub(" ", text.strip().lower())
+
+
+def _count(counts, items):
+    for item in items:
+        feature = normalize_skill(item)
+        if feature:
+            counts[feature] = counts.get(feature, 0) + 1
+
+
+def job_features(job):
+    """feature -> term count from a job's tags and requirements."""
+    counts = {}
+    _count(counts, job.get("tags") or [])
+    _count(counts, _SPLIT.split(job.get("requirements") or ""))
+    return counts
+
+
+def agent_features(agent):
+    counts = {}
+    _count(counts, agent.get("skills") or [])
+    return counts
+
+
+def credit_boost(credit_score):
+    return 1 + CREDIT_BOOST * ((credit_score if credit_score is not None else 50) - 50) / 50
+
+
+def _signature(counts):
+    return tuple(sorted(counts.items()))
+
+
+# ─── Agent Directory ───
+def agent_entry(owner, profile):
+    """What the directory keeps per wallet (also a log "put")."""
+    return {
+        "owner": owner,
+        "name": profile.get("name", ""),
+        "skills": list(profile.get("skills") or []),
+        "credit_score": profile.get("credit_score", 50),
+    }
+
+
+class AgentDirectory:
+    """Every wallet's public matching profile, shared through a log.
+
+    With `log_path=None` it is purely in memory (benchmarks).
+    """
+
+    def __init__(self, log_path=None):
+        self._lock = threading.RLock()
+        self.generation = 0
+        self._reset()
+        self._log = SharedLog(log_path, self._apply, self._reset) if log_path else None
+        self._catch_up()
+
+    def _reset(self):
+        self._agents = {}  # owner -> agent_entry
+        self._changed = []  # owners in change order (see changes)
+        self._records = 0
+        self.generation += 1
+
+    def __len__(self):
+        return len(self._agents)
+
+    def _apply(self, rec):
+        self._records += 1
+        if rec["op"] == "put":
+            self._agents[rec["agent"]["owner"]] = rec["agent"]
+            self._changed.append(rec["agent"]["owner"])
+        elif rec["op"] == "del" and self._agents.pop(rec["owner"], None) is not None:
+            self._changed.append(rec["owner"])
+
+    def _catch_up(self):
+        if self._log is not None:
+            self._log.catch_up()
+
+    def _compact(self):
+        if self._records - len(self._agents) > max(COMPACT_MIN_DEAD, len(self._agents)):
+            return [{"op": "put", "agent": agent} for agent in self._agents.values()]
+        return None
+
+    def _write(self, records):
+        if self._log is None:
+            for rec in records:
+                self._apply(rec)
+        else:
+            self._log.append(records, compact=self._compact)
+
+    def put(self, owner, profile):
+        with self._lock:
+            self._catch_up()
+            entry = agent_entry(owner, profile)
+            if self._agents.get(owner) != entry:
+                self._write([{"op": "put", "agent": entry}])
+
+    def remove(self, owner):
+        with self._lock:
+            self._catch_up()
+            if owner in self._agents:
+                self._write([{"op": "del", "owner": owner}])
+
+    def sync_pod(self, data, changes=None):
+        """Publish the pod's profile if the save touched it."""
+        if changes is None or any(rec["op"] == "set" and rec["key"] == "profile" for rec in changes):
+            self.put(data["meta"]["owner_wallet"], data["profile"])
+
+    def agent(self, owner):
+        with self._lock:
+            self._catch_up()
+            agent = self._agents.get(owner)
+            return None if agent is None else dict(agent)
+
+    def changes(self, cursor=None):
+        """Agents changed since `cursor`, like JobBoard.changes.
+
+        Returns (cursor, reset, changed, removed): `changed` is [agent
+        dicts] in their current state, `removed` [owner].
+        """
+        with self._lock:
+            self._catch_up()
+            reset = cursor is None or cursor[0] != self.generation
+            owners = self._agents if reset else dict.fromkeys(self._changed[cursor[1]:])
+            changed = [dict(self._agents[o]) for o in owners if o in self._agents]
+            removed = [] if reset else [o for o in owners if o not in self._agents]
+            return (self.generation, len(self._changed)), reset, changed, removed
+
+
+_directories = {}
+_directories_guard = threading.Lock()
+
+
+def get_directory(path):
+    """Process-wide AgentDirectory backed by the log at `path`."""
+    with _directories_guard:
+        if path not in _directories:
+            _directories[path] = AgentDirectory(path)
+        return _directories[path]
+
+
+# ─── Vector Groups ───
+class _Groups:
+    """One side of the match: rows grouped by identical feature vector."""
+
+    def __init__(self):
+        self.group_of = {}  # row key -> group
+        self.members = []  # group -> {row key: boost}, insertion ordered
+        self.vecs = []  # group -> {feature: weight} (unit length), None once empty
+        self.best = []  # group -> highest member boost
+        self.by_sig = {}  # feature signature -> live group
+        self.postings = {}  # feature -> {group: weight}
+
+    def live(self):
+        return [g for g, vec in enumerate(self.vecs) if vec is not None]
+
+    def add(self, key, sig, vec, boost):
+        """File `key` under `sig`; returns (group, whether it is new).
+
+        `vec` is only needed (and used) when `sig` has no live group.
+        """
+        group = self.by_sig.get(sig)
+        created = group is None
+        if created:
+            group = self.by_sig[sig] = len(self.vecs)
+            self.members.append({})
+            self.vecs.append(vec)
+            self.best.append(boost)
+            for feature, weight in vec.items():
+                self.postings.setdefault(feature, {})[group] = weight
+        self.members[group][key] = boost
+        self.best[group] = max(self.best[group], boost)
+        self.group_of[key] = group
+        return group, created
+
+    def remove(self, key, sig_of):
+        """Drop `key`; returns its group (or None)."""
+        group = self.group_of.pop(key, None)
+        if group is None:
+            return None
+        members = self.members[group]
+        boost = members.pop(key)
+        if not members:
+            for feature in self.vecs[group]:
+                del self.postings[feature][group]
+            del self.by_sig[sig_of(group)]
+            self.vecs[group] = None
+            self.best[group] = 0.0
+        elif boost >= self.best[group]:
+            self.best[group] = max(members.values())
+        return group
+
+    def scores(self, vec):
+        """{group: cosine} for every live group sharing a feature with `vec`."""
+        scores = {}
+        for feature, weight in vec.items():
+            for group, other in self.postings.get(feature, {}).items():
+                scores[group] = scores.get(group, 0.0) + weight * other
+        return scores
+
+    def matrix(self, groups, vocab):
+        """CSR rows for `groups` over the columns in `vocab`."""
+        indptr, indices, data = [0], [], []
+        for group in groups:
+            for feature, weight in self.vecs[group].items():
+                col = vocab.get(feature)
+                if col is not None:
+                    indices.append(col)
+                    data.append(weight)
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(groups), len(vocab)),
+        )
+
+
+def _row_top(block, m):
+    """Top m columns of each row with a positive value, best first.
+
+    Returns (rows, cols, offsets, positive): row r's picks are
+    cols[offsets[r]:offsets[r + 1]], and positive[r] counts its positive
+    values (or exceeds the picks when there are more). Each row's
+    columns are dealt into buckets of BUCKET_WIDTH (which must divide
+    the columns; bucket b holds b, b + n_buckets, ...); only buckets
+    whose maximum reaches the m-th largest bucket maximum can hold a
+    top value, so one max-reduce pass replaces a partition of the block.
+    """
+    n_rows, n_cols = block.shape
+    n_buckets = n_cols // BUCKET_WIDTH
+    maxima = block.reshape(n_rows, BUCKET_WIDTH, n_buckets).max(axis=1)
+    if m < n_buckets:
+        kth = np.partition(maxima, n_buckets - m, axis=1)[:, n_buckets - m]
+    else:
+        kth = np.zeros(n_rows, dtype=block.dtype)
+    greater = maxima > kth[:, None]
+    # Ties at the m-th maximum are common (few distinct skill sets):
+    # take just enough tied buckets
+    tied = (maxima == kth[:, None]) & (maxima > 0)
+    from_right = np.cumsum(tied[:, ::-1], axis=1)[:, ::-1]
+    keep = greater | (tied & (from_right <= (m - greater.sum(axis=1))[:, None]))
+    rows, buckets = np.nonzero(keep)
+    cols = buckets[:, None] + np.arange(BUCKET_WIDTH) * n_buckets
+    values = block[rows[:, None], cols]
+    rows = np.broadcast_to(rows[:, None], cols.shape).ravel()
+    cols, values = cols.ravel(), values.ravel()
+    # At least m values reach kth (one per kept bucket): drop the rest
+    hit = (values > 0) & (values >= kth[rows])
+    rows, cols, values = rows[hit], cols[hit], values[hit]
+    order = np.lexsort((-cols, -values, rows))
+    rows, cols = rows[order], cols[order]
+    counts = np.bincount(rows, minlength=n_rows)
+    first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = np.arange(len(rows)) - first[rows]
+    picked = rank < m
+    offsets = np.concatenate(([0], np.cumsum(np.minimum(counts, m))))
+    positive = counts + ((maxima > 0).sum(axis=1) > keep.sum(axis=1))
+    return rows[picked], cols[picked], offsets, positive
+
+
+def _top_groups(q_side, q_groups, m_side, m_groups, weights, m):
+    """For each group in q_groups: the m best m_groups by cosine * weight.
+
+    Returns [( [(cosine, group)] best first, count of positive scores )].
+    """
+    if np is None or not q_groups or not m_groups:
+        results = []
+        for group in q_groups:
+            scores = m_side.scores(q_side.vecs[group])
+            best = heapq.nlargest(m, scores.items(), key=lambda item: item[1] * weights[item[0]])
+            results.append(([(cos, g) for g, cos in best if cos > 0], sum(1 for cos in scores.values() if cos > 0)))
+        return results
+
+    vocab = {}
+    for group in m_groups:
+        for feature in m_side.vecs[group]:
+            vocab.setdefault(feature, len(vocab))
+    Q = q_side.matrix(q_groups, vocab)
+    # Zero columns pad the block to whole buckets
+    width = -(-len(m_groups) // BUCKET_WIDTH) * BUCKET_WIDTH
+    w = np.ones(width, dtype=np.float32)
+    w[:len(m_groups)] = [weights[g] for g in m_groups]
+    MT = (sp.diags(w[:len(m_groups)]) @ m_side.matrix(m_groups, vocab)).T.tocsc()
+    MT.resize((len(vocab), width))
+    # Skill vocabularies are small: a dense product (BLAS) beats a sparse
+    # one whose output is dense anyway; large ones stay sparse
+    dense = len(vocab) * width <= BLOCK_FLOATS
+    if dense:
+        MT = MT.toarray()
+    ids = np.array(m_groups, dtype=np.int64)
+    step = max(1, BLOCK_FLOATS // width)
+    results = []
+    for start in range(0, len(q_groups), step):
+        chunk = Q[start:start + step]
+        block = chunk.toarray() @ MT if dense else (chunk @ MT).toarray()
+        rows, cols, offsets, positive = _row_top(block, m)
+        ranked = (block[rows, cols] / w[cols]).tolist()
+        groups = ids[cols].tolist()
+        offsets = offsets.tolist()
+        for r, count in enumerate(positive.tolist()):
+            lo, hi = offsets[r], offsets[r + 1]
+            results.append((list(zip(ranked[lo:hi], groups[lo:hi])), count))
+    return results
+
+
+# ─── Match Engine ───
+class MatchEngine:
+    """Top-K jobs per agent and agents per job over a board + directory."""
+
+    def __init__(self, board, directory, top_k=TOP_K):
+        self.board = board
+        self.directory = directory
+        self.top_k = top_k
+        self._lock = threading.RLock()
+        self._job_cursor = self._agent_cursor = None
+        self._clear()
+
+    def _clear(self):
+        self.jobs = _Groups()
+        self.agents = _Groups()
+        self._job_sigs = []  # job group -> signature
+        self._agent_sigs = []
+        self._idf = {}
+        self._idf_default = 1.0
+        self._job_lists = []  # agent group -> ([(cosine, job group)], complete) or None
+        self._agent_lists = []  # job group -> ([(cosine, agent group)], complete) or None
+        self._listed_in = []  # agent group -> job groups whose list holds it
+        self._changes = 0
+        self._built_size = 0
+
+    # ─── Vectors ───
+    def _vector(self, counts):
+        vec = {}
+        for feature, tf in counts.items():
+            vec[feature] = (1 + math.log(tf)) * self._idf.get(feature, self._idf_default)
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        return {feature: w / norm for feature, w in vec.items()}
+
+    def _add_job(self, job, counts=None):
+        counts = job_features(job) if counts is None else counts
+        if not counts:
+            return None, False
+        sig = _signature(counts)
+        vec = None if sig in self.jobs.by_sig else self._vector(counts)
+        group, created = self.jobs.add((job["owner_wallet"], job["id"]), sig, vec, 1.0)
+        if created:
+            self._job_sigs.append(sig)
+            self._agent_lists.append(None)
+        return group, created
+
+    def _add_agent(self, agent):
+        counts = agent_features(agent)
+        if not counts:
+            return None, False
+        sig = _signature(counts)
+        boost = credit_boost(agent.get("credit_score"))
+        group = self.agents.by_sig.get(sig)
+        before = None if group is None else self.agents.best[group]
+        vec = None if group is not None else self._vector(counts)
+        group, created = self.agents.add(agent["owner"], sig, vec, boost)
+        if created:
+            self._agent_sigs.append(sig)
+            self._job_lists.append(None)
+            self._listed_in.append(set())
+        return group, created or boost > before
+
+    # ─── Building ───
+    def _rebuild(self, jobs, agents):
+        self._clear()
+        features = [job_features(job) for job in jobs]
+        df = {}
+        for counts in features:
+            for feature in counts:
+                df[feature] = df.get(feature, 0) + 1
+        n = len(jobs)
+        self._idf = {feature: math.log((1 + n) / (1 + count)) + 1 for feature, count in df.items()}
+        self._idf_default = math.log(1 + n) + 1
+        for job, counts in zip(jobs, features):
+            self._add_job(job, counts)
+        for agent in agents:
+            self._add_agent(agent)
+        job_groups, agent_groups = self.jobs.live(), self.agents.live()
+        ones = [1.0] * len(self.jobs.vecs)
+        for group, (best, count) in zip(
+            agent_groups, _top_groups(self.agents, agent_groups, self.jobs, job_groups, ones, self.top_k)
+        ):
+            self._job_lists[group] = self._trim(best, count)
+        for group, (best, count) in zip(
+            job_groups, _top_groups(self.jobs, job_groups, self.agents, agent_groups, self.agents.best, self.top_k + 1)
+        ):
+            self._set_agent_list(group, best, count)
+        self._built_size = len(jobs) + len(agents)
+
+    def _trim(self, best, count):
+        """Cut a job-group list once it holds top_k jobs."""
+        jobs = 0
+        for i, (_, group) in enumerate(best):
+            jobs += len(self.jobs.members[group])
+            if jobs >= self.top_k:
+                return best[:i + 1], count == i + 1
+        return best, count == len(best)
+
+    def _set_agent_list(self, group, best, count):
+        old = self._agent_lists[group]
+        if old is not None:
+            for _, agent_group in old[0]:
+                self._listed_in[agent_group].discard(group)
+        self._agent_lists[group] = (best, count == len(best))
+        for _, agent_group in best:
+            self._listed_in[agent_group].add(group)
+
+    def _drop_agent_list(self, group):
+        """Forget a job group's list; it is rescored when next read."""
+        self._set_agent_list(group, [], 0)
+        self._agent_lists[group] = None
+
+    def _job_list(self, group, full=False):
+        lists = self._job_lists[group]
+        if lists is None or full:
+            scores = self.jobs.scores(self.agents.vecs[group])
+            best = sorted(((cos, g) for g, cos in scores.items() if cos > 0), reverse=True)
+            if full:
+                return best, True
+            lists = self._job_lists[group] = self._trim(best, len(best))
+        return lists
+
+    def _agent_list(self, group, full=False):
+        lists = self._agent_lists[group]
+        if lists is None or full:
+            scores = self.agents.scores(self.jobs.vecs[group])
+            best = [(cos, g) for g, cos in scores.items() if cos > 0]
+            best.sort(key=lambda item: item[0] * self.agents.best[item[1]], reverse=True)
+            if full:
+                return best, True
+            self._set_agent_list(group, best[:self.top_k + 1], len(best))
+            lists = self._agent_lists[group]
+        return lists
+
+    # ─── Incremental Refresh ───
+    def refresh(self):
+        """Pull board and directory changes into the candidate lists."""
+        with self._lock:
+            job_cursor, job_reset, added_jobs, removed_jobs = self.board.changes(self._job_cursor)
+            agent_cursor, agent_reset, changed_agents, removed_agents = self.directory.changes(self._agent_cursor)
+            self._changes += len(added_jobs) + len(removed_jobs) + len(changed_agents) + len(removed_agents)
+            if job_reset or agent_reset or self._changes > REBUILD_DRIFT * max(self._built_size, 100):
+                if not job_reset:
+                    job_cursor, _, added_jobs, _ = self.board.changes()
+                if not agent_reset:
+                    agent_cursor, _, changed_agents, _ = self.directory.changes()
+                self._rebuild(added_jobs, changed_agents)
+            else:
+                self._apply_jobs(added_jobs, removed_jobs)
+                self._apply_agents(changed_agents, removed_agents)
+            self._job_cursor, self._agent_cursor = job_cursor, agent_cursor
+
+    def _apply_jobs(self, added, removed):
+        for key in removed:
+            # Lists holding the group now hold fewer jobs; jobs_for
+            # rescores an agent whose list runs short
+            group = self.jobs.remove(key, self._job_sigs.__getitem__)
+            if group is not None and self.jobs.vecs[group] is None:
+                self._set_agent_list(group, [], 0)
+        for job in added:
+            self.jobs.remove((job["owner_wallet"], job["id"]), self._job_sigs.__getitem__)
+            group, created = self._add_job(job)
+            if not created:
+                continue
+            scores = self.agents.scores(self.jobs.vecs[group])
+            for agent_group, cos in scores.items():
+                lists = self._job_lists[agent_group]
+                if lists is None or cos <= 0:
+                    continue
+                best, complete = lists
+                if complete or cos >= best[-1][0]:
+                    best = sorted(best + [(cos, group)], reverse=True)
+                    self._job_lists[agent_group] = self._trim(best, len(best) if complete else len(best) + 1)
+            best = [(cos, g) for g, cos in scores.items() if cos > 0]
+            best.sort(key=lambda item: item[0] * self.agents.best[item[1]], reverse=True)
+            self._set_agent_list(group, best[:self.top_k + 1], len(best))
+
+    def _apply_agents(self, changed, removed):
+        for owner in removed + [agent["owner"] for agent in changed]:
+            group = self.agents.remove(owner, self._agent_sigs.__getitem__)
+            if group is None:
+                continue
+            # Its best boost may have dropped: job lists that relied on it
+            # are rescored when next read
+            for job_group in list(self._listed_in[group]):
+                self._drop_agent_list(job_group)
+            if self.agents.vecs[group] is None:
+                self._job_lists[group] = None
+        for agent in changed:
+            group, raised = self._add_agent(agent)
+            if not raised:
+                continue
+            # A new vector or a higher best boost can enter job lists
+            best = self.agents.best[group]
+            for job_group, cos in self.jobs.scores(self.agents.vecs[group]).items():
+                lists = self._agent_lists[job_group]
+                if lists is None or cos <= 0:
+                    continue
+                entries, complete = lists
+                floor = 0.0 if complete or not entries else entries[-1][0] * self.agents.best[entries[-1][1]]
+                if cos * best >= floor:
+                    self._drop_agent_list(job_group)
+
+    # ─── Readers ───
+    def _expand_jobs(self, best, owner, k):
+        keys = []
+        for cos, group in best:
+            for key in reversed(self.jobs.members[group]):  # newest first
+                if key[0] != owner:
+                    keys.append((cos, key))
+                    if len(keys) == k:
+                        return keys
+        return keys
+
+    def jobs_for(self, owner, k=None):
+        """Best open jobs for the agent `owner` (not their own), best first."""
+        k = k or self.top_k
+        self.refresh()
+        with self._lock:
+            group = self.agents.group_of.get(owner)
+            if group is None:
+                return []
+            best, complete = self._job_list(group)
+            hits = self._expand_jobs(best, owner, k)
+            if len(hits) < k and not complete:
+                # Jobs left the listed groups (or k > top_k, or the agent's
+                # own jobs took places): rescore, then fall back to all
+                self._job_lists[group] = None
+                best, complete = self._job_list(group)
+                hits = self._expand_jobs(best, owner, k)
+                if len(hits) < k and not complete:
+                    hits = self._expand_jobs(self._job_list(group, full=True)[0], owner, k)
+            boost = self.agents.members[group][owner]
+        results = []
+        for cos, key in hits:
+            job = self.board.job(*key)
+            if job is not None:
+                job["score"] = round(cos * boost, 4)
+                results.append(job)
+        return results
+
+    def _expand_agents(self, best, owner, k):
+        candidates = []
+        for cos, group in best:
+            members = heapq.nlargest(k + 1, self.agents.members[group].items(), key=itemgetter(1))
+            candidates.extend((cos * boost, agent) for agent, boost in members if agent != owner)
+        return heapq.nlargest(k, candidates, key=itemgetter(0))
+
+    def agents_for(self, owner, job_id, k=None):
+        """Best agents for the open job (`owner`, `job_id`), best first."""
+        k = k or self.top_k
+        self.refresh()
+        with self._lock:
+            group = self.jobs.group_of.get((owner, job_id))
+            if group is None:
+                return []
+            best, complete = self._agent_list(group, full=k > self.top_k)
+            hits = self._expand_agents(best, owner, k)
+        results = []
+        for score, agent_owner in hits:
+            agent = self.directory.agent(agent_owner)
+            if agent is not None:
+                agent["score"] = round(score, 4)
+                results.append(agent)
+        return results
+
+
+_matchers = {}
+_matchers_guard = threading.Lock()
+
+
+def get_matcher(board, directory):
+    """Process-wide MatchEngine over `board` and `directory`."""
+    with _matchers_guard:
+        key = (id(board), id(directory))
+        if key not in _matchers:
+            _matchers[key] = MatchEngine(board, directory)
+        return _matchers[key]
+
+
+def rebuild(data_dir):
+    """Publish every pod's profile into a fresh directory log (one-off migration)."""
+    store = get_store()
+    records = []
+    for pod_path in get_placement(data_dir, store).pod_paths():
+        data = store.load(pod_path)
+        if data is None:
+            continue
+        records.append({"op": "put", "agent": agent_entry(data["meta"]["owner_wallet"], data["profile"])})
+    path = os.path.join(data_dir, "board", "agents.jsonl")
+    SharedLog(path, lambda rec: None, lambda: None).rewrite(records)
+    print(f"🐾 Published {len(records)} profile(s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("usage: python morphire/matching.py rebuild [DATA_DIR]")
+        sys.exit(2)
+    rebuild(sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(__file__), "data_store"))
@@ -0,0 +1,281 @@
+"""
+🐾 Morphire.ai — Hot-path instrumentation.
+
+Latency histograms, byte counts and error counts for pod loads/saves,
+IPFS hashing and uploads, webhook posts, card rendering and reruns,
+exported in the Prometheus text format. Everything stays local:
+
+    MORPHIRE_METRICS=1              record (off by default)
+    MORPHIRE_METRICS_PORT=9464      serve http://127.0.0.1:9464/metrics
+    MORPHIRE_METRICS_FILE=x.prom    rewrite a file at most every FLUSH_S
+    MORPHIRE_PROFILE_SAMPLE=0.05    run this fraction of reruns under cProfile,
+    MORPHIRE_PROFILE_SLOW_MS=500    keeping the profiles of slow ones
+
+Code is instrumented with `@instrumented(name)` or `with measure(name)`.
+While recording is off they cost one flag check.
+"""
+
+import cProfile
+import functools
+import glob
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = bool(os.environ.get("MORPHIRE_METRICS"))
+METRICS_PORT = int(os.environ.get("MORPHIRE_METRICS_PORT", "0"))
+METRICS_FILE = os.environ.get("MORPHIRE_METRICS_FILE", "")
+FLUSH_S = 10.0
+PROFILE_SAMPLE = float(os.environ.get("MORPHIRE_PROFILE_SAMPLE", "0"))
+PROFILE_SLOW_MS = float(os.environ.get("MORPHIRE_PROFILE_SLOW_MS", "500"))
+PROFILE_DIR = os.environ.get("MORPHIRE_PROFILE_DIR", os.path.join(os.path.dirname(__file__), "data_store", "profiles"))
+PROFILE_KEEP = 50
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_histograms = {}  # (name, labels) -> [count per bucket..., +Inf count, sum]
+_counters = {}  # (name, labels) -> value
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+# ─── Recording ───
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def observe(name, seconds, **labels):
+    """Add one latency sample to the `morphire_<name>_seconds` histogram."""
+    key = (name, _labels(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+                break
+        else:
+            hist[len(BUCKETS)] += 1
+        hist[-1] += seconds
+
+
+def inc(name, value=1, **labels):
+    """Add to the `morphire_<name>_total` counter."""
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+class _Measure:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.bytes = 0
+
+    def add_bytes(self, n):
+        self.bytes += n
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self._t0, **self.labels)
+        if self.bytes:
+            inc(f"{self.name}_bytes", self.bytes, **self.labels)
+        if exc_type is not None:
+            inc(f"{self.name}_errors", **self.labels)
+        return False
+
+
+class _Off:
+    """Shared stand-in while recording is off."""
+
+    def add_bytes(self, n):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_OFF = _Off()
+
+
+def measure(name, **labels):
+    """Context manager timing a block; `.add_bytes(n)` counts bytes."""
+    if not ENABLED:
+        return _OFF
+    return _Measure(name, labels)
+
+
+def instrumented(name, bytes_of=None):
+    """Decorator form of `measure`; `bytes_of(result)` counts bytes."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _Measure(name, {}) as m:
+                result = func(*args, **kwargs)
+                if bytes_of is not None:
+                    m.add_bytes(bytes_of(result) or 0)
+                return result
+        return wrapper
+    return decorate
+
+
+# ─── Export ───
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        histograms = {key: list(hist) for key, hist in _histograms.items()}
+        counters = dict(_counters)
+    lines = []
+    typed = set()
+    for (name, labels), hist in sorted(histograms.items()):
+        metric = f"morphire_{name}_seconds"
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), hist):
+            cumulative += count
+            lines.append(f"{metric}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {hist[-1]:.6f}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {cumulative}")
+    for (name, labels), value in sorted(counters.items()):
+        metric = f"morphire_{name}_total"
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+_last_flush = 0.0
+
+
+def maybe_flush():
+    """Rewrite METRICS_FILE if it is due (called at the end of reruns)."""
+    global _last_flush
+    if not (ENABLED and METRICS_FILE) or time.monotonic() - _last_flush < FLUSH_S:
+        return
+    _last_flush = time.monotonic()
+    write_file(METRICS_FILE)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = None
+_server_guard = threading.Lock()
+
+
+def serve(port=METRICS_PORT, host="127.0.0.1"):
+    """Start the /metrics endpoint once per process; returns the server."""
+    global _server
+    with _server_guard:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _Handler)
+            threading.Thread(target=_server.serve_forever, daemon=True, name="morphire-metrics").start()
+        return _server
+
+
+def start():
+    """Apply the MORPHIRE_METRICS_* settings (safe to call on every rerun)."""
+    if ENABLED and METRICS_PORT and _server is None:
+        try:
+            serve(METRICS_PORT)
+        except OSError:
+            pass  # another process (Streamlit worker) already serves the port
+
+
+# ─── Sampled Profiles ───
+# cProfile is process-wide on recent Pythons: one sampled rerun at a time
+_profile_guard = threading.Lock()
+
+
+class SampledProfile:
+    """Profile a sampled fraction of reruns; keep the slow ones on disk.
+
+    Profiles land in PROFILE_DIR as `<kind>-<ms>ms-<time>.pstats`
+    (newest PROFILE_KEEP kept); read them with `python -m pstats`.
+    """
+
+    def __init__(self, kind, sample=None, slow_ms=None):
+        self.kind = kind
+        self.sample = PROFILE_SAMPLE if sample is None else sample
+        self.slow_ms = PROFILE_SLOW_MS if slow_ms is None else slow_ms
+        self.profiler = None
+        self.saved = None
+
+    def __enter__(self):
+        if self.sample and random.random() < self.sample and _profile_guard.acquire(blocking=False):
+            self.profiler = cProfile.Profile()
+            self._t0 = time.perf_counter()
+            try:
+                self.profiler.enable()
+            except ValueError:  # another profiler is active
+                self.profiler = None
+                _profile_guard.release()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler is None:
+            return False
+        try:
+            self.profiler.disable()
+            ms = (time.perf_counter() - self._t0) * 1000
+            if ms >= self.slow_ms:
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                self.saved = os.path.join(PROFILE_DIR, f"{self.kind}-{ms:.0f}ms-{time.time_ns()}.pstats")
+                self.profiler.dump_stats(self.saved)
+                inc("slow_profiles", kind=self.kind)
+                for old in sorted(glob.glob(os.path.join(PROFILE_DIR, "*.pstats")), key=os.path.getmtime)[:-PROFILE_KEEP]:
+                    os.remove(old)
+        finally:
+            _profile_guard.release()
+        return False
@@ -0,0 +1,234 @@
+"""
+🐾 Morphire.ai — Background Discord webhook dispatcher.
+
+`send_discord_webhook` only enqueues; a worker thread delivers posts
+over one keep-alive `requests.Session`, coalescing bursts of chat
+messages into multi-embed posts, retrying with backoff and honoring
+Discord's 429 `retry_after`. When the queue is full, posts spill to a
+JSONL file (file-locked, as every process may share it) and are
+replayed once the queue drains (or are dropped if no spill file is
+configured).
+"""
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+import traceback
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import inc, measure
+from storage import pod_lock
+
+QUEUE_SIZE = int(os.environ.get("MORPHIRE_WEBHOOK_QUEUE", "1000"))
+# How long the worker waits for more chat messages to fold into one post
+COALESCE_WINDOW = float(os.environ.get("MORPHIRE_WEBHOOK_COALESCE", "0.5"))
+MAX_EMBEDS = 10  # Discord's limit per message
+MAX_CONTENT = 2000  # Discord's limit for `content`
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+REQUEST_TIMEOUT = 10
+
+
+class WebhookDispatcher:
+    """Deliver Discord webhook payloads from a background thread."""
+
+    def __init__(self, url, queue_size=QUEUE_SIZE, spill_path=None,
+                 coalesce_window=COALESCE_WINDOW, session=None):
+        self.url = url
+        self.spill_path = spill_path
+        self.coalesce_window = coalesce_window
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._spill_lock = threading.Lock()
+        self._session = session or self._make_session()
+        self._held = None  # item read during coalescing that didn't fit
+        self.stats = {"queued": 0, "sent": 0, "posts": 0, "retries": 0,
+                      "rate_limited": 0, "failed": 0, "spilled": 0, "dropped": 0}
+        self._worker = threading.Thread(target=self._run, name="morphire-webhook", daemon=True)
+        self._worker.start()
+
+    @staticmethod
+    def _make_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    # producer side
+    def submit(self, payload, coalesce=False):
+        """Queue a payload without blocking. Returns False if it was dropped."""
+        item = {"payload": payload, "coalesce": coalesce}
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            return self._spill(item)
+        self.stats["queued"] += 1
+        return True
+
+    def _spill(self, item):
+        if not self.spill_path:
+            self.stats["dropped"] += 1
+            return False
+        with self._spill_lock, pod_lock(self.spill_path):
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self.stats["spilled"] += 1
+        return True
+
+    def _unspill(self):
+        """Move spilled items back into the queue once it has room."""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        with self._spill_lock, pod_lock(self.spill_path):
+            try:
+                with open(self.spill_path, "r", encoding="utf-8") as f:
+                    lines = f.readlines()
+            except FileNotFoundError:
+                return  # another process replayed it first
+            items = []
+            for line in lines:
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    continue  # torn line from an interrupted spill
+            leftover = []
+            for item in items:
+                try:
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    leftover.append(item)
+            if leftover:
+                with open(self.spill_path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(item, ensure_ascii=False) + "\n" for item in leftover)
+            else:
+                os.remove(self.spill_path)
+
+    def pending(self):
+        return self._queue.qsize() + (self._held is not None)
+
+    def join(self, timeout=None):
+        """Wait until every queued payload has been handled."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    # worker side
+    def _next(self, timeout=None):
+        if self._held is not None:
+            item, self._held = self._held, None
+            return item
+        return self._queue.get(timeout=timeout)
+
+    def _run(self):
+        while True:
+            try:
+                self._step()
+            except Exception:
+                # Keep the worker alive: a dead one would leave every later post queued
+                traceback.print_exc()
+                inc("webhook_worker_errors")
+                time.sleep(BACKOFF_BASE)
+
+    def _step(self):
+        if self._queue.empty():
+            self._unspill()
+        item = self._next()
+        batch = [item]
+        try:
+            if item["coalesce"]:
+                batch = self._coalesce(item)
+            self._deliver(self._merge(batch))
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _coalesce(self, first):
+        """Collect chat messages that arrive within the coalesce window."""
+        batch = [first]
+        embeds = len(first["payload"].get("embeds", []))
+        deadline = time.monotonic() + self.coalesce_window
+        while embeds < MAX_EMBEDS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._next(timeout=remaining)
+            except queue.Empty:
+                break
+            item_embeds = len(item["payload"].get("embeds", []))
+            if (not item["coalesce"] or embeds + item_embeds > MAX_EMBEDS
+                    or item["payload"].get("username") != first["payload"].get("username")):
+                self._held = item
+                break
+            batch.append(item)
+            embeds += item_embeds
+        return batch
+
+    @staticmethod
+    def _merge(batch):
+        if len(batch) == 1:
+            return batch[0]["payload"]
+        payload = {"username": batch[0]["payload"].get("username"), "embeds": []}
+        lines = []
+        for item in batch:
+            lines.append(item["payload"].get("content", ""))
+            payload["embeds"].extend(item["payload"].get("embeds", []))
+        payload["content"] = "\n".join(lines)[:MAX_CONTENT]
+        return payload
+
+    def _deliver(self, payload):
+        delay = BACKOFF_BASE
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                with measure("webhook_post"):
+                    r = self._session.post(self.url, json=payload, timeout=REQUEST_TIMEOUT)
+            except requests.RequestException:
+                r = None
+            if r is None or r.status_code not in (200, 204):
+                inc("webhook_post_failures", status="error" if r is None else r.status_code)
+            if r is not None and r.status_code in (200, 204):
+                self.stats["posts"] += 1
+                self.stats["sent"] += max(1, len(payload.get("embeds", [])))
+                return True
+            if r is not None and r.status_code == 429:
+                self.stats["rate_limited"] += 1
+                wait = _retry_after(r)
+            elif r is not None and r.status_code < 500:
+                break  # a 4xx other than 429 won't succeed on retry
+            else:
+                wait = delay + random.uniform(0, delay)
+                delay = min(delay * 2, BACKOFF_CAP)
+            if attempt + 1 < MAX_ATTEMPTS:
+                self.stats["retries"] += 1
+                time.sleep(wait)
+        self.stats["failed"] += 1
+        return False
+
+
+def _retry_after(response):
+    """Seconds to wait from a Discord 429 (JSON body or header)."""
+    try:
+        return float(response.json().get("retry_after", 1.0))
+    except (ValueError, AttributeError):
+        return float(response.headers.get("Retry-After", 1.0))
+
+
+_dispatchers = {}
+_dispatchers_guard = threading.Lock()
+
+
+def get_dispatcher(url, spill_path=None):
+    """Process-wide dispatcher for `url` (shared by every Streamlit session)."""
+    with _dispatchers_guard:
+        if url not in _dispatchers:
+            _dispatchers[url] = WebhookDispatcher(url, spill_path=spill_path)
+        return _dispatchers[url]
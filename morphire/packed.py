@@ -0,0 +1,224 @@
+"""
+🐾 Morphire.ai — Packed pod format.
+
+An optional storage backend (MORPHIRE_STORAGE=packed): the journal
+backend with its pretty-printed JSON snapshot swapped for a compact
+binary one, `morphire-<hash>.mpod`:
+
+    "MPOD" | version (u8) | table length (u32) | table | sections...
+
+The table lists every top-level section of the pod (meta, profile,
+jobs, transactions, stats, ...) with its offset, length and codec.
+Sections are msgpack (compact JSON when the msgpack package is missing)
+and compressed with zstd (zlib without zstandard) once they are larger
+than COMPRESS_MIN. Files are mmapped, so `load_sections(path, keys)`
+decodes only the sections asked for: the sidebar reads meta + stats
+without touching the job list.
+
+A wallet's existing `.json` snapshot keeps being read until the first
+compaction writes the `.mpod`. Convert or go back to JSON with:
+
+    python morphire/packed.py import [DATA_DIR]   # .json snapshots → .mpod
+    python morphire/packed.py export [DATA_DIR]   # current pods → .json
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+
+from metrics import measure
+from placement import get_placement
+from storage import JournalStore, atomic_write_json, pod_lock, read_json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = b"MPOD"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBI")
+# Sections smaller than this are stored uncompressed
+COMPRESS_MIN = int(os.environ.get("MORPHIRE_PACKED_COMPRESS_MIN", "4096"))
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+
+# ─── Sections ───
+def encode_section(value):
+    """(bytes, codec) for one section, e.g. (b"...", "msgpack+zstd")."""
+    if msgpack is not None:
+        raw, codec = msgpack.packb(value, use_bin_type=True), "msgpack"
+    else:
+        raw, codec = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode(), "json"
+    if len(raw) >= COMPRESS_MIN:
+        if zstandard is not None:
+            raw, codec = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), f"{codec}+zstd"
+        else:
+            raw, codec = zlib.compress(raw, ZLIB_LEVEL), f"{codec}+zlib"
+    return raw, codec
+
+
+def decode_section(raw, codec):
+    encoding, _, compression = codec.partition("+")
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("this pod was packed with zstd: pip install zstandard")
+        raw = zstandard.ZstdDecompressor().decompress(raw)
+    elif compression == "zlib":
+        raw = zlib.decompress(raw)
+    if encoding == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("this pod was packed with msgpack: pip install msgpack")
+        return msgpack.unpackb(raw, raw=False)
+    return json.loads(raw)
+
+
+def write_packed(path, data):
+    """Atomically write `data` as a packed pod."""
+    sections = [(name, *encode_section(value)) for name, value in data.items()]
+    table = []
+    offset = 0  # from the end of the table
+    for name, raw, codec in sections:
+        table.append([name, offset, len(raw), codec])
+        offset += len(raw)
+    table_bytes = json.dumps(table, ensure_ascii=False, separators=(",", ":")).encode()
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with measure("pod_write") as m, open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(table_bytes)))
+        f.write(table_bytes)
+        for _, raw, _ in sections:
+            f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+        m.add_bytes(f.tell())
+    os.replace(tmp_path, path)
+
+
+def read_packed(path, keys=None):
+    """The pod at `path` (only the `keys` sections if given), or None
+    if there is no such file."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f, measure("pod_parse") as m, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, version, table_len = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version > FORMAT_VERSION:
+            raise ValueError(f"{path} is not a packed pod (v{FORMAT_VERSION} or older)")
+        body = HEADER.size + table_len
+        data = {}
+        for name, offset, length, codec in json.loads(mm[HEADER.size:body]):
+            if keys is None or name in keys:
+                data[name] = decode_section(mm[body + offset:body + offset + length], codec)
+                m.add_bytes(length)
+        return data
+
+
+def record_section(rec):
+    """The top-level section a storage.py change record touches."""
+    op = rec.get("op")
+    if op in ("job_put", "job_del", "chat_append"):
+        return "jobs"
+    if op == "tx_append":
+        return "transactions"
+    return rec.get("key")
+
+
+# ─── Store ───
+class PackedStore(JournalStore):
+    """Journal store whose snapshots are packed pods.
+
+    Pods are still addressed by their `.json` path (get_data_file_path);
+    the snapshot lives next to it as `.mpod`.
+    """
+
+    name = "packed"
+
+    @staticmethod
+    def packed_path(path):
+        return f"{os.path.splitext(path)[0]}.mpod"
+
+    def files(self, path):
+        return [self.packed_path(path), *super().files(path)]
+
+    def pod_paths(self, data_dir):
+        paths = set(JournalStore.pod_paths(self, data_dir))
+        for name in os.listdir(data_dir) if os.path.isdir(data_dir) else ():
+            if name.startswith("morphire-") and name.endswith(".mpod"):
+                paths.add(os.path.join(data_dir, f"{name[:-5]}.json"))
+        return sorted(paths)
+
+    def has_snapshot(self, path):
+        return os.path.exists(self.packed_path(path)) or os.path.exists(path)
+
+    def read_snapshot(self, path, keys=None):
+        data = read_packed(self.packed_path(path), keys)
+        if data is None:
+            # Not converted yet: the legacy JSON snapshot
+            data = read_json(path)
+            if data is not None and keys is not None:
+                data = {key: data[key] for key in keys if key in data}
+        return data
+
+    def write_snapshot(self, path, data):
+        write_packed(self.packed_path(path), data)
+
+    def load_sections(self, path, keys):
+        """Just the `keys` sections, snapshot + journal (None if no pod)."""
+        keys = frozenset(keys)
+        with self._lock(path):
+            return self.consistent(path, lambda: self._read_sections(path, keys))
+
+    def _read_sections(self, path, keys):
+        data = self.read_snapshot(path, keys)
+        if data is None:
+            return None
+        journal = self.journal_path(path)
+        index = {}
+        if "jobs" in data:
+            index = {job.get("id"): i for i, job in enumerate(data["jobs"])}
+        for log in (f"{journal}.compacting", journal):
+            self._replay(data, index, log, keep=lambda rec: record_section(rec) in keys)
+        return {key: value for key, value in data.items() if key in keys}
+
+
+# ─── CLI ───
+def main(argv):
+    if not argv or argv[0] not in ("import", "export"):
+        print("usage: python morphire/packed.py import|export [DATA_DIR]")
+        return 2
+    command = argv[0]
+    data_dir = argv[1] if len(argv) > 1 else os.path.join(os.path.dirname(__file__), "data_store")
+    store = PackedStore()
+    count = 0
+    for path in get_placement(data_dir, store).pod_paths():
+        store.compact(path)
+        # pod_lock: a fold in another process must not land between read and write
+        with pod_lock(path), store._lock(path):
+            if command == "import":
+                data = store.read_snapshot(path)
+                if data is not None:
+                    store.write_snapshot(path, data)
+            else:
+                data, _ = store._read(path)
+                if data is not None:
+                    atomic_write_json(path, data)
+        if data is not None:
+            count += 1
+            print(f"{'📦 packed' if command == 'import' else '📄 exported'}: {os.path.basename(path)}")
+    print(f"🐾 {count} pod(s) {'packed' if command == 'import' else 'exported to JSON'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
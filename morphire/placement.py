@@ -0,0 +1,385 @@
+"""
+🐾 Morphire.ai — Pod placement across storage roots.
+
+Pods used to sit flat in one data dir. Each one now lives in a
+hash-prefix shard directory on one of several storage roots (local
+mounts standing in for storage nodes):
+
+    <root>/pods/<h0h1>/<h2h3>/morphire-<hash>.json   (+ .journal, .mpod, .lock)
+
+The root comes from a consistent-hash ring with VNODES virtual nodes
+per root, so adding or removing a root only moves the pods it gains or
+loses (about 1/N of them). Shared state (board, ledger, chat, archive,
+...) stays in the data dir. The ring lives in <data dir>/placement.json,
+seeded from MORPHIRE_DATA_ROOTS (os.pathsep-separated; default: the
+data dir itself) and changed with:
+
+    python morphire/placement.py add|remove ROOT [DATA_DIR]
+    python morphire/placement.py rebalance [DATA_DIR]
+    python morphire/placement.py status [DATA_DIR]
+
+After a change the previous rings are kept until `rebalance` has moved
+every pod, and lookups fall back to them (and to the old flat layout),
+so the app keeps serving meanwhile. A pod is copied under its lock and
+counts as present at its new home once the lock file (which holds its
+revision) lands there last; the old copy gets a `.moved` marker that
+makes `commit` raise PodMovedError, so a writer that looked the pod up
+just before the move saves at the new home instead. Old copies are
+deleted REBALANCE_GRACE_S later.
+"""
+
+import bisect
+import collections
+import functools
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import time
+
+from storage import (
+    atomic_write_json, get_store, lock_path, moved_path, pod_key, pod_lock, read_json,
+)
+
+VNODES = int(os.environ.get("MORPHIRE_VNODES", "128"))
+# How often a process re-reads placement.json for ring changes
+RELOAD_S = float(os.environ.get("MORPHIRE_PLACEMENT_RELOAD_S", "1"))
+REBALANCE_GRACE_S = float(os.environ.get("MORPHIRE_REBALANCE_GRACE_S", "30"))
+SHARD_WIDTH = 2  # hex characters per directory level
+SHARD_DEPTH = 2  # levels: 256 x 256 directories per root
+
+
+@functools.lru_cache(maxsize=65536)
+def wallet_pod_key(wallet_address):
+    """A wallet's pod key: a hash of the address keeps odd characters out of file names."""
+    return f"morphire-{hashlib.sha256(wallet_address.encode()).hexdigest()[:16]}"
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring over storage roots, `vnodes` points each."""
+
+    def __init__(self, roots, vnodes=VNODES):
+        self.roots = list(roots)
+        points = sorted((_hash64(f"{root}#{i}"), root) for root in self.roots for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [root for _, root in points]
+
+    def owner(self, key):
+        i = bisect.bisect(self._hashes, _hash64(key))
+        return self._owners[i % len(self._owners)]
+
+
+_SHARD_SLICES = [(i * SHARD_WIDTH, (i + 1) * SHARD_WIDTH) for i in range(SHARD_DEPTH)]
+
+
+def shard_path(root, key):
+    """Where the pod `key` lives on `root` (keys end in a hex hash)."""
+    digest = key.rsplit("-", 1)[-1]
+    return os.sep.join((root, "pods", *[digest[start:end] for start, end in _SHARD_SLICES], key + ".json"))
+
+
+def _copy_file(src, dst):
+    tmp = f"{dst}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(src, "rb") as f_in, open(tmp, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out, 1 << 20)
+        f_out.flush()
+        os.fsync(f_out.fileno())
+    os.replace(tmp, dst)
+
+
+def _write_file(path, raw):
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _subdirs(path):
+    try:
+        with os.scandir(path) as entries:
+            return sorted(entry.path for entry in entries if entry.is_dir())
+    except FileNotFoundError:
+        return []
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Placement:
+    """Maps pod keys to paths for one data dir."""
+
+    def __init__(self, data_dir, store=None, vnodes=VNODES):
+        self.data_dir = data_dir
+        self.store = store or get_store()
+        self.vnodes = vnodes
+        self.state_path = os.path.join(data_dir, "placement.json")
+        # Database-backed stores only use the path for its pod key
+        self.sharded = getattr(self.store, "sharded", True)
+        self._lock = threading.Lock()
+        self._dirs = set()
+        self._state = None
+        self._mtime = None
+        self._checked = 0.0
+        if self.sharded:
+            self._seed()
+            self._reload()
+
+    # ─── Ring state ───
+    def _seed(self):
+        """Write the first placement.json (from MORPHIRE_DATA_ROOTS)."""
+        if os.path.exists(self.state_path):
+            return
+        os.makedirs(self.data_dir, exist_ok=True)
+        with pod_lock(self.state_path):
+            if os.path.exists(self.state_path):
+                return
+            roots = os.environ.get("MORPHIRE_DATA_ROOTS", "").split(os.pathsep)
+            roots = [os.path.abspath(root) for root in roots if root] or [os.path.abspath(self.data_dir)]
+            with os.scandir(self.data_dir) as entries:
+                flat = any(entry.name.startswith("morphire-") for entry in entries)
+            self._write_state({"roots": roots, "previous": [], "flat": flat, "changed_at": time.time()})
+
+    def _write_state(self, state):
+        atomic_write_json(self.state_path, dict(state, vnodes=self.vnodes))
+
+    def _reload(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked < RELOAD_S:
+            return self._state
+        try:
+            mtime = os.stat(self.state_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        with self._lock:
+            self._checked = now
+            if mtime is not None and mtime != self._mtime:
+                state = read_json(self.state_path)
+                state["ring"] = HashRing(state["roots"], state.get("vnodes", self.vnodes))
+                state["previous_rings"] = [HashRing(roots, state.get("vnodes", self.vnodes)) for roots in state["previous"]]
+                self._state, self._mtime = state, mtime
+            return self._state
+
+    def update(self, roots):
+        """Switch to a new set of roots; the old ring is kept for lookups
+        until `rebalance` has moved every pod."""
+        with pod_lock(self.state_path):
+            state = read_json(self.state_path)
+            roots = [os.path.abspath(root) for root in roots]
+            if roots == state["roots"]:
+                return False
+            previous = [state["roots"]] + [ring for ring in state["previous"] if ring != roots]
+            self._write_state({"roots": roots, "previous": previous, "flat": state["flat"], "changed_at": time.time()})
+        self._reload(force=True)
+        return True
+
+    @property
+    def roots(self):
+        return list(self._reload()["roots"]) if self.sharded else [self.data_dir]
+
+    # ─── Lookups ───
+    def home(self, key, state=None):
+        """Where the current ring places `key` (its directory is created)."""
+        state = state or self._reload()
+        path = shard_path(state["ring"].owner(key), key)
+        directory = path.rpartition(os.sep)[0]
+        if directory not in self._dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._dirs.add(directory)
+        return path
+
+    def _present(self, path):
+        """A complete, not moved-away copy of a pod sits at `path`."""
+        if os.path.exists(moved_path(path)):
+            return False
+        has_snapshot = getattr(self.store, "has_snapshot", None)
+        return has_snapshot(path) if has_snapshot is not None else os.path.exists(path)
+
+    def locate(self, key):
+        """Path of the pod `key`: its home on the current ring, or where it
+        still is while a rebalance is pending (new pods go home)."""
+        if not self.sharded:
+            return os.path.join(self.data_dir, f"{key}.json")
+        state = self._reload()
+        home = self.home(key, state)
+        if not state["previous"] and not state["flat"]:
+            return home
+        if os.path.exists(lock_path(home)):
+            return home
+        for ring in state["previous_rings"]:
+            path = shard_path(ring.owner(key), key)
+            if path != home and self._present(path):
+                return path
+        if state["flat"]:
+            path = os.path.join(self.data_dir, f"{key}.json")
+            if self._present(path):
+                return path
+        return home
+
+    def _physical(self):
+        """(key, path) of every pod copy on disk, moved-away ones included."""
+        state = self._reload(force=True)
+        roots = list(dict.fromkeys(state["roots"] + [root for ring in state["previous"] for root in ring]))
+        for root in roots:
+            dirs = [os.path.join(root, "pods")]
+            for _ in range(SHARD_DEPTH):
+                dirs = [sub for parent in dirs for sub in _subdirs(parent)]
+            for directory in dirs:
+                for path in self.store.pod_paths(directory):
+                    yield pod_key(path), path
+        if state["flat"]:
+            for path in self.store.pod_paths(self.data_dir):
+                yield pod_key(path), path
+
+    def pod_paths(self):
+        """Path of every pod (once each, where `locate` finds it)."""
+        if not self.sharded:
+            return self.store.pod_paths(self.data_dir)
+        keys = {key for key, _ in self._physical()}
+        return sorted(self.locate(key) for key in keys)
+
+    # ─── Rebalancing ───
+    def move(self, src, dst):
+        """Copy a pod from `src` to `dst` under its lock, then mark `src`
+        as moved; False if it was moved already."""
+        with pod_lock(src) as lock_file:
+            if os.path.exists(moved_path(src)):
+                return False
+            lock_file.seek(0)
+            revision = lock_file.read()
+            while True:
+                # A background compaction (another process) may fold the
+                # journal while we copy: go again until nothing changed
+                before = self.store.signature(src)
+                for f_src, f_dst in zip(self.store.files(src), self.store.files(dst)):
+                    if os.path.exists(f_src):
+                        _copy_file(f_src, f_dst)
+                    else:
+                        _remove(f_dst)  # left by an interrupted earlier copy
+                if self.store.signature(src) == before:
+                    break
+            _write_file(lock_path(dst), revision)  # the pod is now present at dst
+            _write_file(moved_path(src), dst.encode())
+        return True
+
+    def retire(self, src):
+        """Delete a moved-away copy (writers that still had its path got
+        PodMovedError until now)."""
+        for path in self.store.files(src):
+            _remove(path)
+        _remove(lock_path(src))
+        _remove(moved_path(src))
+
+    def rebalance(self, grace=REBALANCE_GRACE_S, log=print):
+        """Move every pod to its home on the current ring; returns the
+        number moved. Safe to run while the app serves."""
+        if not self.sharded:
+            return 0
+        with pod_lock(os.path.join(self.data_dir, "placement-rebalance.json")):
+            state = self._reload(force=True)
+            # Let every process pick up the new ring before pods move
+            time.sleep(max(0.0, state["changed_at"] + 2 * RELOAD_S - time.time()))
+            moved = 0
+            retiring = collections.deque()  # (moved at, old path), oldest first
+            for key, path in self._physical():
+                if os.path.exists(moved_path(path)):
+                    retiring.append((0.0, path))  # moved by an interrupted earlier run
+                    continue
+                home = self.home(key, state)
+                if path == home:
+                    continue
+                if os.path.exists(lock_path(home)):
+                    log(f"⚠️ {key}: copies at {path} and {home}; keeping {home}")
+                    continue
+                if self.move(path, home):
+                    moved += 1
+                    retiring.append((time.monotonic(), path))
+                    if moved % 10_000 == 0:
+                        log(f"🐾 {moved:,} pod(s) moved")
+                while retiring and time.monotonic() - retiring[0][0] >= grace:
+                    self.retire(retiring.popleft()[1])
+            if retiring:
+                time.sleep(max(0.0, retiring[-1][0] + grace - time.monotonic()))
+                for _, path in retiring:
+                    self.retire(path)
+            with pod_lock(self.state_path):
+                latest = read_json(self.state_path)
+                if latest["changed_at"] == state["changed_at"]:
+                    self._write_state({"roots": latest["roots"], "previous": [], "flat": False,
+                                       "changed_at": latest["changed_at"]})
+                else:
+                    log("⚠️ the ring changed during the rebalance: run it again")
+            self._reload(force=True)
+        return moved
+
+    def distribution(self):
+        """{root: pods placed there} on the current ring."""
+        counts = dict.fromkeys(self.roots, 0)
+        state = self._reload()
+        for key, path in self._physical():
+            if not os.path.exists(moved_path(path)):
+                root = state["ring"].owner(key)
+                counts[root] = counts.get(root, 0) + 1
+        return counts
+
+
+_placements = {}
+_placements_guard = threading.Lock()
+
+
+def get_placement(data_dir, store=None):
+    """Process-wide Placement for `data_dir`."""
+    store = store or get_store()
+    with _placements_guard:
+        key = (data_dir, store.name)
+        if key not in _placements:
+            _placements[key] = Placement(data_dir, store)
+        return _placements[key]
+
+
+# ─── CLI ───
+def main(argv):
+    commands = ("status", "add", "remove", "rebalance")
+    if not argv or argv[0] not in commands or (argv[0] in ("add", "remove") and len(argv) < 2):
+        print("usage: python morphire/placement.py status|rebalance [DATA_DIR]\n"
+              "       python morphire/placement.py add|remove ROOT [DATA_DIR]")
+        return 2
+    command, args = argv[0], argv[1:]
+    root = os.path.abspath(args.pop(0)) if command in ("add", "remove") else None
+    data_dir = args[0] if args else os.path.join(os.path.dirname(__file__), "data_store")
+    placement = get_placement(data_dir)
+    if command == "status":
+        state = placement._reload(force=True)
+        for root_path, count in placement.distribution().items():
+            print(f"  {root_path}: {count:,} pod(s)")
+        if state["previous"] or state["flat"]:
+            print("🐾 rebalance pending: python morphire/placement.py rebalance")
+        return 0
+    if command == "add":
+        changed = placement.update(placement.roots + [root])
+    elif command == "remove":
+        if root not in placement.roots or len(placement.roots) == 1:
+            print(f"❌ {root} is not a removable root")
+            return 1
+        changed = placement.update([r for r in placement.roots if r != root])
+    if command in ("add", "remove"):
+        print(f"🐾 ring: {', '.join(placement.roots)}" if changed else "🐾 ring unchanged")
+        print("   now run: python morphire/placement.py rebalance")
+        return 0
+    moved = placement.rebalance()
+    print(f"🐾 {moved:,} pod(s) moved")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,198 @@
+"""
+🐾 Morphire.ai — Reputation (credit score) engine.
+
+Each pod keeps running sufficient statistics in `data["reputation"]`:
+rating count and sum, plus exponentially time-decayed sums (half-life
+REPUTATION_HALF_LIFE_DAYS) anchored at the newest rating. A new rating
+updates them in O(1); the score is the decayed average mapped onto the
+same 0-100 scale as `calc_credit_score`.
+
+`batch_reputation` recomputes many wallets at once for backfills (NumPy
+when installed, plain Python otherwise). Both paths use the same
+formula, and scores are rounded integers, so they can be audited.
+"""
+
+import math
+import os
+import sys
+from datetime import datetime
+
+from placement import get_placement
+from storage import get_store, item_appended, profile_changed, section_set, update_pod
+
+try:
+    import numpy as np
+except ImportError:  # optional: only the batch path benefits
+    np = None
+
+REPUTATION_HALF_LIFE_DAYS = float(os.environ.get("MORPHIRE_REPUTATION_HALF_LIFE_DAYS", "180"))
+NEWCOMER_SCORE = 50
+_DAY = 86400.0
+
+
+def _decay_rate(half_life_days):
+    return math.log(2) / (half_life_days * _DAY)
+
+
+def empty_reputation(half_life_days=REPUTATION_HALF_LIFE_DAYS):
+    return {
+        "count": 0,
+        "sum": 0.0,
+        "decayed_sum": 0.0,
+        "decayed_weight": 0.0,
+        "anchor_ts": None,  # epoch seconds of the newest rating
+        "half_life_days": half_life_days,
+    }
+
+
+def score_from_average(avg):
+    """Map a 1-5 star average onto the 0-100 credit scale."""
+    return max(0, min(100, round(20 + (avg - 1) * 20)))
+
+
+def add_rating(rep, stars, ts):
+    """Fold one rating (stars at epoch seconds `ts`) into `rep` in O(1)."""
+    rate = _decay_rate(rep["half_life_days"])
+    rep["count"] += 1
+    rep["sum"] += stars
+    if rep["anchor_ts"] is None:
+        rep["anchor_ts"] = ts
+    if ts >= rep["anchor_ts"]:
+        # Move the anchor forward: everything so far decays by the gap
+        factor = math.exp(-rate * (ts - rep["anchor_ts"]))
+        rep["decayed_sum"] = rep["decayed_sum"] * factor + stars
+        rep["decayed_weight"] = rep["decayed_weight"] * factor + 1.0
+        rep["anchor_ts"] = ts
+    else:
+        # A late (backdated) rating counts as already decayed
+        weight = math.exp(-rate * (rep["anchor_ts"] - ts))
+        rep["decayed_sum"] += stars * weight
+        rep["decayed_weight"] += weight
+    return rep
+
+
+def credit_score(rep):
+    """Current score from the decayed average (decay cancels out of the
+    ratio, so it does not drift between ratings)."""
+    if not rep or not rep["count"] or rep["decayed_weight"] <= 0:
+        return NEWCOMER_SCORE
+    return score_from_average(rep["decayed_sum"] / rep["decayed_weight"])
+
+
+def lifetime_average(rep):
+    return rep["sum"] / rep["count"] if rep and rep["count"] else None
+
+
+# ─── Pod Helpers ───
+def record_rating(data, stars, rated_at, job_id=None, rated_by=None):
+    """Store a received rating in the pod and refresh the credit score.
+
+    `rated_at` is an aware datetime. Returns the change records for
+    save_data.
+    """
+    rating = {"stars": stars, "rated_at": rated_at.isoformat(), "job_id": job_id, "rated_by": rated_by}
+    ratings = data.setdefault("ratings", [])
+    ratings.append(rating)
+    rep = data.setdefault("reputation", empty_reputation())
+    add_rating(rep, stars, rated_at.timestamp())
+    data["profile"]["credit_score"] = credit_score(rep)
+    return [
+        item_appended("ratings", len(ratings) - 1, rating),
+        section_set("reputation", rep),
+        profile_changed(data["profile"]),
+    ]
+
+
+def pod_ratings(data):
+    """[(epoch seconds, stars), ...] from a pod's rating log."""
+    return [
+        (datetime.fromisoformat(r["rated_at"]).timestamp(), r["stars"])
+        for r in data.get("ratings", [])
+    ]
+
+
+# ─── Batch Recompute ───
+def reputation_from_ratings(ratings, half_life_days=REPUTATION_HALF_LIFE_DAYS):
+    """Rebuild one wallet's state from [(ts, stars), ...]."""
+    return batch_reputation({None: ratings}, half_life_days)[None]
+
+
+def batch_reputation(ratings_by_wallet, half_life_days=REPUTATION_HALF_LIFE_DAYS):
+    """Rebuild the state of many wallets at once.
+
+    `ratings_by_wallet` maps wallet → [(ts, stars), ...]. Returns
+    wallet → reputation dict, equivalent to calling add_rating for each
+    rating (up to float rounding in the last bits).
+    """
+    rate = _decay_rate(half_life_days)
+    wallets = [w for w, ratings in ratings_by_wallet.items() if ratings]
+    result = {w: empty_reputation(half_life_days) for w in ratings_by_wallet}
+    if not wallets:
+        return result
+    if np is None:
+        for wallet in wallets:
+            ratings = ratings_by_wallet[wallet]
+            anchor = max(ts for ts, _ in ratings)
+            weights = [math.exp(-rate * (anchor - ts)) for ts, _ in ratings]
+            result[wallet].update(
+                count=len(ratings),
+                sum=float(math.fsum(stars for _, stars in ratings)),
+                decayed_sum=math.fsum(w * stars for w, (_, stars) in zip(weights, ratings)),
+                decayed_weight=math.fsum(weights),
+                anchor_ts=anchor,
+            )
+        return result
+
+    # Flatten every wallet's ratings into one set of arrays
+    segment = np.concatenate([np.full(len(ratings_by_wallet[w]), i) for i, w in enumerate(wallets)])
+    ts = np.concatenate([np.asarray([r[0] for r in ratings_by_wallet[w]], dtype=np.float64) for w in wallets])
+    stars = np.concatenate([np.asarray([r[1] for r in ratings_by_wallet[w]], dtype=np.float64) for w in wallets])
+    anchors = np.full(len(wallets), -np.inf)
+    np.maximum.at(anchors, segment, ts)
+    weights = np.exp(-rate * (anchors[segment] - ts))
+    n = len(wallets)
+    counts = np.bincount(segment, minlength=n)
+    sums = np.bincount(segment, weights=stars, minlength=n)
+    decayed_sums = np.bincount(segment, weights=weights * stars, minlength=n)
+    decayed_weights = np.bincount(segment, weights=weights, minlength=n)
+    for i, wallet in enumerate(wallets):
+        result[wallet].update(
+            count=int(counts[i]),
+            sum=float(sums[i]),
+            decayed_sum=float(decayed_sums[i]),
+            decayed_weight=float(decayed_weights[i]),
+            anchor_ts=float(anchors[i]),
+        )
+    return result
+
+
+def backfill(data_dir):
+    """Recompute reputation and credit_score for every pod from its ratings."""
+    store = get_store()
+    ratings = {}
+    for path in get_placement(data_dir, store).pod_paths():
+        data = store.load(path)
+        if data is not None:
+            ratings[path] = pod_ratings(data)
+    states = batch_reputation(ratings)
+
+    def rescore(path):
+        def change(data):
+            rep = states[path]
+            if pod_ratings(data) != ratings[path]:  # rated since the first pass
+                rep = batch_reputation({path: pod_ratings(data)})[path]
+            data["reputation"] = rep
+            data["profile"]["credit_score"] = credit_score(rep)
+            return [section_set("reputation", rep), profile_changed(data["profile"])]
+        return change
+
+    for path in states:
+        update_pod(store, path, rescore(path))
+    store.flush()
+    print(f"🐾 Recomputed reputation for {len(states)} pod(s)")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "backfill":
+        print("usage: python morphire/reputation.py backfill [DATA_DIR]")
+        sys.exit(2)
+    backfill(sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(__file__), "data_store"))
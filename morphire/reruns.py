@@ -0,0 +1,144 @@
+"""
+🐾 Morphire.ai — Rerun timing.
+
+Streamlit runs the whole script on every interaction, and a fragment
+runs just its own function. Each of those is timed as one "rerun",
+split into named sections:
+
+    with rerun("app") as run:
+        with run.section("load"):
+            ...
+
+A fragment called during a full run is timed as a section of that run;
+when it reruns on its own it becomes a rerun of its own kind. Recent
+timings are kept per (kind, section) for `summary()`, and every rerun
+is printed to stderr when MORPHIRE_RERUN_LOG is set. Outermost reruns
+also feed the metrics histograms and cProfile sampling (metrics.py).
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import metrics
+
+RERUN_WINDOW = int(os.environ.get("MORPHIRE_RERUN_WINDOW", "500"))
+RERUN_LOG = bool(os.environ.get("MORPHIRE_RERUN_LOG"))
+TOTAL = "total"
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RerunStats:
+    """Recent wall times (ms) per (kind, section), process-wide."""
+
+    def __init__(self, window=RERUN_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}  # (kind, section) -> deque of ms
+        self._counts = {}  # (kind, section) -> reruns recorded
+
+    def record(self, kind, sections, total_ms):
+        with self._lock:
+            for section, ms in list(sections.items()) + [(TOTAL, total_ms)]:
+                key = (kind, section)
+                samples = self._samples.get(key)
+                if samples is None:
+                    samples = self._samples[key] = deque(maxlen=self.window)
+                samples.append(ms)
+                self._counts[key] = self._counts.get(key, 0) + 1
+
+    def summary(self):
+        """{kind: {section: {"count", "p50", "p95", "max"}}} over the window."""
+        with self._lock:
+            items = [(key, sorted(samples)) for key, samples in self._samples.items()]
+            counts = dict(self._counts)
+        result = {}
+        for (kind, section), ordered in items:
+            result.setdefault(kind, {})[section] = {
+                "count": counts[(kind, section)],
+                "p50": _percentile(ordered, 0.5),
+                "p95": _percentile(ordered, 0.95),
+                "max": ordered[-1],
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+RERUN_STATS = RerunStats()
+_local = threading.local()  # Streamlit runs each session's script on its own thread
+
+
+class Rerun:
+    def __init__(self, kind):
+        self.kind = kind
+        self.sections = {}
+
+    @contextmanager
+    def section(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            self.sections[name] = self.sections.get(name, 0.0) + ms
+
+
+@contextmanager
+def rerun(kind, stats=RERUN_STATS):
+    """Time one script run or fragment rerun (see the module docstring)."""
+    outer = getattr(_local, "run", None)
+    if outer is not None:
+        with outer.section(kind):
+            yield outer
+        return
+    run = _local.run = Rerun(kind)
+    t0 = time.perf_counter()
+    try:
+        with metrics.SampledProfile(kind):
+            yield run
+    finally:
+        # st.rerun()/st.stop() end a run by raising; it still counts
+        total_ms = (time.perf_counter() - t0) * 1000
+        _local.run = None
+        stats.record(kind, run.sections, total_ms)
+        if metrics.ENABLED:
+            metrics.observe("rerun", total_ms / 1000, kind=kind)
+            for name, ms in run.sections.items():
+                metrics.observe("rerun_section", ms / 1000, kind=kind, section=name)
+            metrics.maybe_flush()
+        if RERUN_LOG:
+            split = "".join(f" · {name} {ms:.1f}" for name, ms in run.sections.items())
+            print(f"🐾 rerun {kind} {total_ms:.1f} ms{split}", file=sys.stderr)
+
+
+def section(name):
+    """A section of the rerun in progress on this thread (no-op outside one)."""
+    run = getattr(_local, "run", None)
+    if run is None:
+        return _untimed()
+    return run.section(name)
+
+
+@contextmanager
+def _untimed():
+    yield None
+
+
+def describe(summary, kind):
+    """One line like "p50 42.0 ms (page 30.1 · sidebar 5.2)" or ""."""
+    sections = summary.get(kind)
+    if not sections or TOTAL not in sections:
+        return ""
+    parts = [f"{name} {s['p50']:.1f}" for name, s in sections.items() if name != TOTAL]
+    line = f"p50 {sections[TOTAL]['p50']:.1f} ms"
+    return f"{line} ({' · '.join(parts)})" if parts else line
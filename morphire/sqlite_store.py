@@ -0,0 +1,362 @@
+"""
+🐾 Morphire.ai — SQLite pod store.
+
+An optional storage backend (MORPHIRE_STORAGE=sqlite) that keeps every
+wallet's pod in one WAL-mode database with normalized tables, so jobs
+can be queried across wallets without loading anyone's whole pod.
+Wallet isolation is preserved: pods are still addressed by the same
+`morphire-<hash>` key that `get_data_file_path` derives.
+
+Bulk-import the existing JSON pods with:
+
+    python morphire/sqlite_store.py migrate [DATA_DIR] [DB_PATH]
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import sys
+from contextlib import contextmanager
+
+from placement import get_placement
+from storage import JournalStore, pod_key
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), "data_store")
+SQLITE_PATH = os.environ.get(
+    "MORPHIRE_SQLITE_PATH", os.path.join(DEFAULT_DATA_DIR, "morphire.sqlite3")
+)
+POOL_SIZE = int(os.environ.get("MORPHIRE_SQLITE_POOL", "8"))
+# Used to weigh SQLite pods in the pod cache
+APPROX_JOB_BYTES = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pods (
+    pod_key      TEXT PRIMARY KEY,
+    owner_wallet TEXT,
+    version      INTEGER NOT NULL DEFAULT 0,
+    sections     TEXT NOT NULL              -- meta, profile, other top-level keys
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    pod_key      TEXT NOT NULL,
+    job_id       TEXT NOT NULL,
+    owner_wallet TEXT,
+    title        TEXT,
+    role         TEXT,
+    status       TEXT,
+    reward_skr   REAL,
+    posted_at    TEXT,
+    body         TEXT NOT NULL,             -- the job, chat/deliveries emptied
+    PRIMARY KEY (pod_key, job_id)
+);
+CREATE TABLE IF NOT EXISTS job_tags (
+    pod_key TEXT NOT NULL,
+    job_id  TEXT NOT NULL,
+    tag     TEXT NOT NULL,
+    PRIMARY KEY (pod_key, job_id, tag)
+);
+CREATE TABLE IF NOT EXISTS chat_messages (
+    pod_key TEXT NOT NULL,
+    job_id  TEXT NOT NULL,
+    seq     INTEGER NOT NULL,
+    body    TEXT NOT NULL,
+    PRIMARY KEY (pod_key, job_id, seq)
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    pod_key TEXT NOT NULL,
+    job_id  TEXT NOT NULL,
+    seq     INTEGER NOT NULL,
+    body    TEXT NOT NULL,
+    PRIMARY KEY (pod_key, job_id, seq)
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    pod_key TEXT NOT NULL,
+    seq     INTEGER NOT NULL,
+    body    TEXT NOT NULL,
+    PRIMARY KEY (pod_key, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs (owner_wallet);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_role_posted ON jobs (status, role, posted_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_role ON jobs (role);
+CREATE INDEX IF NOT EXISTS idx_jobs_posted ON jobs (posted_at);
+CREATE INDEX IF NOT EXISTS idx_job_tags_tag ON job_tags (tag);
+"""
+
+JOB_CHILDREN = ("chat_history", "delivery_ipfs")
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+# ─── Connection Pool ───
+class ConnectionPool:
+    """A small pool of WAL-mode connections shared by every thread."""
+
+    def __init__(self, db_path, size=POOL_SIZE):
+        self.db_path = db_path
+        self._idle = queue.LifoQueue(maxsize=size)
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+
+# ─── Store ───
+class SQLiteStore:
+    """Pod store backed by normalized SQLite tables."""
+
+    name = "sqlite"
+    sharded = False  # pods are rows; a path only carries the pod key (placement.py)
+
+    def __init__(self, db_path=SQLITE_PATH, pool_size=POOL_SIZE):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, pool_size)
+
+    def files(self, path):
+        return [self.db_path]
+
+    def signature(self, path):
+        """Per-pod version (so one wallet's writes don't invalidate the
+        others' cache entries) and a rough size estimate."""
+        key = pod_key(path)
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT version, (SELECT COUNT(*) FROM jobs WHERE pod_key = ?) FROM pods WHERE pod_key = ?",
+                (key, key),
+            ).fetchone()
+        if row is None:
+            return None, 0
+        return row[0], row[1] * APPROX_JOB_BYTES
+
+    def flush(self):
+        pass
+
+    def pod_paths(self, data_dir):
+        """Pod paths (as get_data_file_path would build them) for every pod."""
+        with self.pool.connection() as conn:
+            keys = [key for (key,) in conn.execute("SELECT pod_key FROM pods ORDER BY pod_key")]
+        return [os.path.join(data_dir, f"{key}.json") for key in keys]
+
+    # reads
+    def load(self, path):
+        key = pod_key(path)
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT sections FROM pods WHERE pod_key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            data = json.loads(row[0])
+            jobs = {}
+            for job_id, body in conn.execute(
+                "SELECT job_id, body FROM jobs WHERE pod_key = ? ORDER BY rowid", (key,)
+            ):
+                jobs[job_id] = json.loads(body)
+            for table, field in (("chat_messages", "chat_history"), ("deliveries", "delivery_ipfs")):
+                for job_id, body in conn.execute(
+                    f"SELECT job_id, body FROM {table} WHERE pod_key = ? ORDER BY job_id, seq", (key,)
+                ):
+                    if job_id in jobs:
+                        jobs[job_id].setdefault(field, []).append(json.loads(body))
+            data["jobs"] = list(jobs.values())
+            data["transactions"] = [
+                json.loads(body)
+                for (body,) in conn.execute(
+                    "SELECT body FROM transactions WHERE pod_key = ? ORDER BY seq", (key,)
+                )
+            ]
+        return data
+
+    def query_jobs(self, status=None, role=None, tag=None, owner_wallet=None,
+                   exclude_wallet=None, limit=50, cursor=None):
+        """Page through jobs across every wallet, newest first.
+
+        `cursor` is the value returned with the previous page. Returns
+        (jobs, next_cursor); each job carries `owner_wallet`.
+        """
+        clauses, params = [], []
+        for column, value in (("status", status), ("role", role), ("owner_wallet", owner_wallet)):
+            if value is not None:
+                clauses.append(f"j.{column} = ?")
+                params.append(value)
+        if exclude_wallet is not None:
+            clauses.append("j.owner_wallet IS NOT ?")
+            params.append(exclude_wallet)
+        if tag is not None:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM job_tags t WHERE t.pod_key = j.pod_key"
+                " AND t.job_id = j.job_id AND t.tag = ?)"
+            )
+            params.append(tag)
+        if cursor is not None:
+            clauses.append("(j.posted_at, j.pod_key, j.job_id) < (?, ?, ?)")
+            params.extend(cursor)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            "SELECT j.pod_key, j.job_id, j.owner_wallet, j.posted_at, j.body FROM jobs j "
+            f"{where} ORDER BY j.posted_at DESC, j.pod_key DESC, j.job_id DESC LIMIT ?"
+        )
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, (*params, limit)).fetchall()
+        jobs = []
+        for key, job_id, owner, posted_at, body in rows:
+            job = json.loads(body)
+            job["owner_wallet"] = owner
+            jobs.append(job)
+        next_cursor = None
+        if len(rows) == limit:
+            key, job_id, _, posted_at, _ = rows[-1]
+            next_cursor = (posted_at or "", key, job_id)
+        return jobs, next_cursor
+
+    # writes
+    @staticmethod
+    def _put_job(conn, key, owner, job):
+        job_id = job.get("id")
+        # Child lists live in their own tables; keep empty markers in the body
+        body = {k: ([] if k in JOB_CHILDREN else v) for k, v in job.items()}
+        conn.execute(
+            "INSERT INTO jobs (pod_key, job_id, owner_wallet, title, role, status, reward_skr, posted_at, body)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (pod_key, job_id) DO UPDATE SET owner_wallet = excluded.owner_wallet,"
+            " title = excluded.title, role = excluded.role, status = excluded.status,"
+            " reward_skr = excluded.reward_skr, posted_at = excluded.posted_at, body = excluded.body",
+            (key, job_id, owner, job.get("title"), job.get("role"), job.get("status"),
+             job.get("reward_skr"), job.get("posted_at") or "", _dumps(body)),
+        )
+        for table in ("job_tags", "chat_messages", "deliveries"):
+            conn.execute(f"DELETE FROM {table} WHERE pod_key = ? AND job_id = ?", (key, job_id))
+        conn.executemany(
+            "INSERT OR IGNORE INTO job_tags (pod_key, job_id, tag) VALUES (?, ?, ?)",
+            [(key, job_id, tag) for tag in job.get("tags", [])],
+        )
+        for table, field in (("chat_messages", "chat_history"), ("deliveries", "delivery_ipfs")):
+            conn.executemany(
+                f"INSERT INTO {table} (pod_key, job_id, seq, body) VALUES (?, ?, ?, ?)",
+                [(key, job_id, seq, _dumps(item)) for seq, item in enumerate(job.get(field, []))],
+            )
+
+    @staticmethod
+    def _delete_pod_rows(conn, key):
+        for table in ("jobs", "job_tags", "chat_messages", "deliveries", "transactions"):
+            conn.execute(f"DELETE FROM {table} WHERE pod_key = ?", (key,))
+
+    def _write_pod(self, conn, key, data):
+        """Replace every row of one pod."""
+        owner = data.get("meta", {}).get("owner_wallet")
+        sections = {k: v for k, v in data.items() if k not in ("jobs", "transactions")}
+        self._delete_pod_rows(conn, key)
+        conn.execute(
+            "INSERT INTO pods (pod_key, owner_wallet, version, sections) VALUES (?, ?, 1, ?)"
+            " ON CONFLICT (pod_key) DO UPDATE SET owner_wallet = excluded.owner_wallet,"
+            " version = pods.version + 1, sections = excluded.sections",
+            (key, owner, _dumps(sections)),
+        )
+        for job in data.get("jobs", []):
+            self._put_job(conn, key, owner, job)
+        conn.executemany(
+            "INSERT INTO transactions (pod_key, seq, body) VALUES (?, ?, ?)",
+            [(key, seq, _dumps(tx)) for seq, tx in enumerate(data.get("transactions", []))],
+        )
+
+    def _apply(self, conn, key, data, rec):
+        """Apply one storage.py change record."""
+        owner = data.get("meta", {}).get("owner_wallet")
+        op = rec.get("op")
+        if op == "job_put":
+            self._put_job(conn, key, owner, rec["job"])
+        elif op == "job_del":
+            for table in ("jobs", "job_tags", "chat_messages", "deliveries"):
+                conn.execute(f"DELETE FROM {table} WHERE pod_key = ? AND job_id = ?", (key, rec["id"]))
+        elif op == "chat_append":
+            conn.execute(
+                "INSERT OR IGNORE INTO chat_messages (pod_key, job_id, seq, body) VALUES (?, ?, ?, ?)",
+                (key, rec["job_id"], rec["seq"], _dumps(rec["message"])),
+            )
+        elif op == "tx_append":
+            conn.execute(
+                "INSERT OR IGNORE INTO transactions (pod_key, seq, body) VALUES (?, ?, ?)",
+                (key, rec["seq"], _dumps(rec["tx"])),
+            )
+        elif op == "set" and rec["key"] == "transactions":
+            conn.execute("DELETE FROM transactions WHERE pod_key = ?", (key,))
+            conn.executemany(
+                "INSERT INTO transactions (pod_key, seq, body) VALUES (?, ?, ?)",
+                [(key, seq, _dumps(tx)) for seq, tx in enumerate(rec["value"])],
+            )
+        # Other "set" records (profile, meta, ...) land in pods.sections below
+
+    def save(self, path, data, changes=None):
+        key = pod_key(path)
+        with self.pool.transaction() as conn:
+            exists = conn.execute("SELECT 1 FROM pods WHERE pod_key = ?", (key,)).fetchone()
+            if changes is None or not exists:
+                self._write_pod(conn, key, data)
+                return
+            for rec in changes:
+                self._apply(conn, key, data, rec)
+            sections = {k: v for k, v in data.items() if k not in ("jobs", "transactions")}
+            conn.execute(
+                "UPDATE pods SET version = version + 1, owner_wallet = ?, sections = ? WHERE pod_key = ?",
+                (data.get("meta", {}).get("owner_wallet"), _dumps(sections), key),
+            )
+
+    # migration
+    def import_pods(self, paths, batch=200):
+        """Bulk-import JSON pods (snapshot + journal) into the database."""
+        reader = JournalStore()
+        imported = 0
+        for start in range(0, len(paths), batch):
+            with self.pool.transaction() as conn:
+                for path in paths[start:start + batch]:
+                    data = reader.load(path)
+                    if data is not None:
+                        self._write_pod(conn, pod_key(path), data)
+                        imported += 1
+        return imported
+
+
+def migrate(data_dir=DEFAULT_DATA_DIR, db_path=SQLITE_PATH):
+    """Import every pod under `data_dir` (flat or sharded) into `db_path`."""
+    paths = get_placement(data_dir, JournalStore()).pod_paths()
+    store = SQLiteStore(db_path)
+    count = store.import_pods(paths)
+    print(f"🐾 Imported {count} pods from {data_dir} into {db_path}")
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print("usage: python morphire/sqlite_store.py migrate [DATA_DIR] [DB_PATH]")
+        sys.exit(2)
+    migrate(*sys.argv[2:4])
@@ -0,0 +1,192 @@
+"""
+🐾 Morphire.ai — Materialized pod statistics.
+
+`data["stats"]` holds running counts and SKR totals so the sidebar and
+Wallet page never loop over jobs or transactions. Every code path that
+adds or changes a job/transaction updates it through the helpers below
+(O(1) each). Jobs moved to the archive tier (archive.py) keep counting
+through `data["archive"]["stats"]`. Pods written by older versions get
+the block rebuilt:
+
+    python morphire/stats.py verify  [DATA_DIR]
+    python morphire/stats.py rebuild [DATA_DIR]
+"""
+
+import os
+import sys
+
+from placement import get_placement
+from storage import get_store, section_set, update_pod
+
+STATS_VERSION = 1
+
+
+def empty_stats():
+    return {
+        "version": STATS_VERSION,
+        "jobs": {"count": 0, "reward_skr": 0, "by_status": {}, "by_role": {}},
+        "transactions": {"count": 0, "amount_skr": 0},
+        "total_payouts": 0,
+        "earnings_by_month": {},
+    }
+
+
+def _month(job):
+    stamp = job.get("paid_at") or job.get("posted_at") or ""
+    return stamp[:7] or "unknown"
+
+
+def _bump(bucket, key, count, reward):
+    entry = bucket.setdefault(key, {"count": 0, "reward_skr": 0})
+    entry["count"] += count
+    entry["reward_skr"] += reward
+    if entry["count"] == 0 and entry["reward_skr"] == 0:
+        del bucket[key]
+
+
+def _account_job(stats, job, sign):
+    """Add (sign=1) or remove (sign=-1) one job's contribution."""
+    reward = job.get("reward_skr", 0) or 0
+    jobs = stats["jobs"]
+    jobs["count"] += sign
+    jobs["reward_skr"] += sign * reward
+    _bump(jobs["by_status"], job.get("status", "pending"), sign, sign * reward)
+    _bump(jobs["by_role"], job.get("role", "unknown"), sign, sign * reward)
+    if job.get("status") == "paid":
+        if job.get("role") == "recruiter":
+            stats["total_payouts"] += sign * reward
+        elif job.get("role") == "agent":
+            months = stats["earnings_by_month"]
+            month = _month(job)
+            months[month] = months.get(month, 0) + sign * reward
+            if not months[month]:
+                del months[month]
+
+
+def _fold(stats, other):
+    """Add another stats block's job totals (the archive's) to `stats`."""
+    jobs, extra = stats["jobs"], other["jobs"]
+    jobs["count"] += extra["count"]
+    jobs["reward_skr"] += extra["reward_skr"]
+    for field in ("by_status", "by_role"):
+        for key, entry in extra[field].items():
+            _bump(jobs[field], key, entry["count"], entry["reward_skr"])
+    stats["total_payouts"] += other["total_payouts"]
+    months = stats["earnings_by_month"]
+    for month, earned in other["earnings_by_month"].items():
+        months[month] = months.get(month, 0) + earned
+        if not months[month]:
+            del months[month]
+
+
+def _stats(data):
+    if "stats" not in data:
+        data["stats"] = compute_stats(data)
+    return data["stats"]
+
+
+def _sync_meta(data):
+    data["meta"]["totalPayouts"] = data["stats"]["total_payouts"]
+
+
+# ─── Incremental Updates ───
+def track_job_added(data, job):
+    _account_job(_stats(data), job, 1)
+    _sync_meta(data)
+
+
+def track_job_removed(data, job):
+    _account_job(_stats(data), job, -1)
+    _sync_meta(data)
+
+
+def track_job_changed(data, before, after):
+    """`before` is a copy of the job's fields prior to the change."""
+    stats = _stats(data)
+    _account_job(stats, before, -1)
+    _account_job(stats, after, 1)
+    _sync_meta(data)
+
+
+def track_job_archived(data, job, previous=None):
+    """`job` left data["jobs"] for the archive: its share moves from the
+    live jobs to `data["archive"]["stats"]`, so the totals don't change.
+    `previous` is an older archived copy of the same job it replaces."""
+    archived = data.setdefault("archive", {}).setdefault("stats", empty_stats())
+    _account_job(archived, job, 1)
+    if previous is not None:
+        _account_job(archived, previous, -1)
+        _account_job(_stats(data), previous, -1)
+        _sync_meta(data)
+
+
+def track_transaction(data, tx):
+    txs = _stats(data)["transactions"]
+    txs["count"] += 1
+    txs["amount_skr"] += tx.get("amount_skr", 0) or 0
+
+
+# ─── Full Rebuild ───
+def compute_stats(data):
+    """Stats recomputed from scratch (O(jobs + transactions))."""
+    stats = empty_stats()
+    archived = data.get("archive", {}).get("stats")
+    if archived:
+        _fold(stats, archived)
+    for job in data.get("jobs", []):
+        _account_job(stats, job, 1)
+    for tx in data.get("transactions", []):
+        stats["transactions"]["count"] += 1
+        stats["transactions"]["amount_skr"] += tx.get("amount_skr", 0) or 0
+    return stats
+
+
+def ensure_stats(data):
+    """Make sure an (older) pod carries a stats block; True if one was added."""
+    if data.get("stats", {}).get("version") == STATS_VERSION:
+        return False
+    data["stats"] = compute_stats(data)
+    _sync_meta(data)
+    return True
+
+
+def rebuild_stats(data):
+    """Recompute the block in place; returns the change record for it."""
+    data["stats"] = compute_stats(data)
+    _sync_meta(data)
+    return [section_set("stats", data["stats"])]
+
+
+def verify_stats(data):
+    """(ok, expected stats) for the pod's stored block."""
+    expected = compute_stats(data)
+    return data.get("stats") == expected, expected
+
+
+# ─── CLI ───
+def main(argv):
+    if not argv or argv[0] not in ("verify", "rebuild"):
+        print("usage: python morphire/stats.py verify|rebuild [DATA_DIR]")
+        return 2
+    command = argv[0]
+    data_dir = argv[1] if len(argv) > 1 else os.path.join(os.path.dirname(__file__), "data_store")
+    store = get_store()
+    bad = 0
+    for path in get_placement(data_dir, store).pod_paths():
+        data = store.load(path)
+        if data is None:
+            continue
+        ok, expected = verify_stats(data)
+        if ok:
+            continue
+        bad += 1
+        print(f"{'🔧 rebuilt' if command == 'rebuild' else '❌ stale'}: {os.path.basename(path)}")
+        if command == "rebuild":
+            update_pod(store, path, rebuild_stats)
+    store.flush()
+    print(f"🐾 {bad} pod(s) {'rebuilt' if command == 'rebuild' else 'with stale stats'}")
+    return 1 if bad and command == "verify" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
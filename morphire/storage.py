@@ -0,0 +1,865 @@
+"""
+🐾 Morphire.ai — Pod storage backends.
+
+`load_data`/`save_data` in app.py delegate to one of these stores:
+
+- "json":    legacy layout, the whole pod rewritten (atomically) on each save.
+- "journal": the pod snapshot plus an append-only change log
+             (`morphire-<hash>.journal`). A save appends only the records
+             that changed; the log is folded back into the snapshot by a
+             background compaction.
+- "packed":  the journal with a binary, section-addressable snapshot
+             (`morphire-<hash>.mpod`, see packed.py).
+- "sqlite":  normalized tables shared by every wallet (sqlite_store.py).
+
+Select with the MORPHIRE_STORAGE env var (default: journal).
+"""
+
+import copy
+import glob
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from metrics import measure
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+STORAGE_BACKEND = os.environ.get("MORPHIRE_STORAGE", "journal")
+# Journal records written before a background compaction is kicked off
+COMPACT_EVERY = int(os.environ.get("MORPHIRE_COMPACT_EVERY", "1000"))
+# Number of wallets whose last-saved state is kept in memory for diffing
+SHADOW_SLOTS = int(os.environ.get("MORPHIRE_SHADOW_SLOTS", "64"))
+# Budget for the process-wide parsed-pod cache (measured as stored bytes)
+POD_CACHE_MB = int(os.environ.get("MORPHIRE_POD_CACHE_MB", "256"))
+
+
+# ─── File Helpers ───
+def atomic_write_json(path, data):
+    """Write JSON to a temp file, fsync, then rename over `path`."""
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with measure("pod_write") as m, open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+        m.add_bytes(f.tell())
+    os.replace(tmp_path, path)
+
+
+def read_json(path):
+    """Read a JSON file, or None if it does not exist."""
+    try:
+        with open(path, "r", encoding="utf-8") as f, measure("pod_parse") as m:
+            m.add_bytes(os.fstat(f.fileno()).st_size)
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def trim_torn_tail(f):
+    """Cut a partial last line (left by an interrupted append) off the
+    log open as binary `f`, so the next record starts on its own line."""
+    end = f.seek(0, os.SEEK_END)
+    if end == 0:
+        return
+    f.seek(end - 1)
+    if f.read(1) == b"\n":
+        return  # appends always land at the end ("a" mode)
+    pos = end
+    while pos > 0:
+        step = min(4096, pos)
+        f.seek(pos - step)
+        chunk = f.read(step)
+        newline = chunk.rfind(b"\n")
+        if newline != -1:
+            pos = pos - step + newline + 1
+            break
+        pos -= step
+    f.truncate(pos)
+
+
+def pod_key(path):
+    """`.../morphire-<hash>.json` → `morphire-<hash>` (a pod's stable key)."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+# ─── Change Records ───
+# Every record is idempotent so a log can safely be replayed twice
+# (e.g. after a crash in the middle of a compaction).
+def job_added(job):
+    """Record: insert or replace a job (matched by id)."""
+    return {"op": "job_put", "job": job}
+
+
+def job_updated(job):
+    return {"op": "job_put", "job": job}
+
+
+def job_removed(job_id):
+    return {"op": "job_del", "id": job_id}
+
+
+def message_appended(job_id, seq, message):
+    """Record: `message` is chat_history[seq] of job `job_id`."""
+    return {"op": "chat_append", "job_id": job_id, "seq": seq, "message": message}
+
+
+def transaction_appended(seq, tx):
+    return {"op": "tx_append", "seq": seq, "tx": tx}
+
+
+def item_appended(key, seq, item):
+    """Record: `item` is data[key][seq] of a top-level list section."""
+    return {"op": "append", "key": key, "seq": seq, "item": item}
+
+
+def section_set(key, value):
+    """Record: replace a whole top-level section (profile, meta, ...)."""
+    return {"op": "set", "key": key, "value": value}
+
+
+def profile_changed(profile):
+    return section_set("profile", profile)
+
+
+def index_jobs(data):
+    """Map job id → position in data["jobs"]."""
+    return {job.get("id"): i for i, job in enumerate(data.get("jobs", []))}
+
+
+def apply_change(data, rec, index):
+    """Apply one change record to `data` in place (`index` is kept in sync)."""
+    op = rec.get("op")
+    jobs = data.setdefault("jobs", [])
+    if op == "job_put":
+        job = rec["job"]
+        pos = index.get(job.get("id"))
+        if pos is None:
+            index[job.get("id")] = len(jobs)
+            jobs.append(job)
+        else:
+            jobs[pos] = job
+    elif op == "job_del":
+        pos = index.get(rec["id"])
+        if pos is not None:
+            del jobs[pos]
+            index.clear()
+            index.update(index_jobs(data))
+    elif op == "chat_append":
+        pos = index.get(rec["job_id"])
+        if pos is not None:
+            chat = jobs[pos].setdefault("chat_history", [])
+            if len(chat) == rec["seq"]:
+                chat.append(rec["message"])
+    elif op == "tx_append":
+        txs = data.setdefault("transactions", [])
+        if len(txs) == rec["seq"]:
+            txs.append(rec["tx"])
+    elif op == "append":
+        items = data.setdefault(rec["key"], [])
+        if len(items) == rec["seq"]:
+            items.append(rec["item"])
+    elif op == "set":
+        data[rec["key"]] = rec["value"]
+
+
+def _chat_appends(old_job, new_job):
+    """Return chat_append records if new_job only grew its chat, else None."""
+    old_chat = old_job.get("chat_history", [])
+    new_chat = new_job.get("chat_history", [])
+    if len(new_chat) <= len(old_chat) or new_chat[: len(old_chat)] != old_chat:
+        return None
+    for key in old_job.keys() | new_job.keys():
+        if key != "chat_history" and old_job.get(key) != new_job.get(key):
+            return None
+    return [
+        message_appended(new_job.get("id"), seq, new_chat[seq])
+        for seq in range(len(old_chat), len(new_chat))
+    ]
+
+
+def diff_pods(old, new):
+    """Compute the change records that turn pod `old` into pod `new`."""
+    records = []
+    for key in new.keys() - {"jobs", "transactions"}:
+        if old.get(key) != new[key]:
+            records.append(section_set(key, new[key]))
+
+    old_jobs = {job.get("id"): job for job in old.get("jobs", [])}
+    new_ids = set()
+    for job in new.get("jobs", []):
+        job_id = job.get("id")
+        new_ids.add(job_id)
+        prev = old_jobs.get(job_id)
+        if prev is None:
+            records.append(job_added(job))
+        elif prev != job:
+            records.extend(_chat_appends(prev, job) or [job_updated(job)])
+    for job_id in old_jobs.keys() - new_ids:
+        records.append(job_removed(job_id))
+
+    old_txs = old.get("transactions", [])
+    new_txs = new.get("transactions", [])
+    if new_txs[: len(old_txs)] == old_txs:
+        for seq in range(len(old_txs), len(new_txs)):
+            records.append(transaction_appended(seq, new_txs[seq]))
+    else:
+        records.append(section_set("transactions", new_txs))
+    return records
+
+
+# ─── Backends ───
+class JsonFileStore:
+    """Legacy backend: the whole pod is rewritten on every save."""
+
+    name = "json"
+
+    def load(self, path):
+        return read_json(path)
+
+    def save(self, path, data, changes=None):
+        atomic_write_json(path, data)
+
+    def files(self, path):
+        """On-disk files that make up the pod at `path`."""
+        return [path]
+
+    def signature(self, path):
+        """(token that changes whenever the pod does, size in bytes)."""
+        return files_signature(self.files(path))
+
+    def pod_paths(self, data_dir):
+        """Paths of every pod stored under `data_dir`."""
+        return sorted(glob.glob(os.path.join(data_dir, "morphire-*.json")))
+
+    def flush(self):
+        pass
+
+
+class JournalStore:
+    """Snapshot + append-only change log per wallet.
+
+    `save(path, data, changes)` appends `changes` when the caller knows
+    them (O(size of change)); otherwise the pod is diffed against the
+    last state this process saw for the wallet.
+    """
+
+    name = "journal"
+
+    def __init__(self, compact_every=COMPACT_EVERY, shadow_slots=SHADOW_SLOTS, fsync=True):
+        self.compact_every = compact_every
+        self.shadow_slots = shadow_slots
+        self.fsync = fsync
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._shadows = OrderedDict()  # path -> {"data", "index"}
+        self._pending = {}  # path -> records in the live journal
+        self._compactions = {}  # path -> Thread
+
+    # paths
+    @staticmethod
+    def journal_path(path):
+        return f"{os.path.splitext(path)[0]}.journal"
+
+    def files(self, path):
+        journal = self.journal_path(path)
+        return [path, f"{journal}.compacting", journal]
+
+    def signature(self, path):
+        return files_signature(self.files(path))
+
+    pod_paths = JsonFileStore.pod_paths
+
+    def _lock(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.RLock())
+
+    # snapshot (the packed store keeps it in another format)
+    def has_snapshot(self, path):
+        return os.path.exists(path)
+
+    def read_snapshot(self, path):
+        return read_json(path)
+
+    def write_snapshot(self, path, data):
+        atomic_write_json(path, data)
+
+    # replay
+    @staticmethod
+    def _replay(data, index, journal, keep=None):
+        """Apply every record in `journal` (or those `keep(rec)` accepts);
+        returns the number read."""
+        count = 0
+        try:
+            f = open(journal, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return 0
+        with f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted append
+                if keep is None or keep(rec):
+                    apply_change(data, rec, index)
+                count += 1
+        return count
+
+    def _layout(self, path):
+        """Identity of the pod's files, ignoring appends to the live log:
+        it changes when a compaction renames or folds a log."""
+        files = self.files(path)
+        layout = []
+        for name in files:
+            try:
+                st_ = os.stat(name)
+            except FileNotFoundError:
+                layout.append(None)
+                continue
+            layout.append(st_.st_ino if name == files[-1] else (st_.st_ino, st_.st_mtime_ns))
+        return layout
+
+    def consistent(self, path, read):
+        """`read()` again until no compaction started or finished during
+        it; readers don't take pod_lock, so a fold may land mid-read."""
+        while True:
+            layout = self._layout(path)
+            result = read()
+            if self._layout(path) == layout:
+                return result
+
+    def _read(self, path):
+        return self.consistent(path, lambda: self._read_files(path))
+
+    def _read_files(self, path):
+        data = self.read_snapshot(path)
+        if data is None:
+            return None, 0
+        journal = self.journal_path(path)
+        index = index_jobs(data)
+        self._replay(data, index, f"{journal}.compacting")
+        pending = self._replay(data, index, journal)
+        return data, pending
+
+    def load(self, path):
+        with self._lock(path):
+            data, pending = self._read(path)
+            if data is None:
+                return None
+            self._pending[path] = pending
+            # The shadow for diffing is only built when a save needs it
+            self._shadows.pop(path, None)
+            return data
+
+    # shadows (last known state, for diffing saves without hints)
+    def _remember(self, path, data):
+        self._shadows[path] = {"data": data, "index": index_jobs(data)}
+        self._shadows.move_to_end(path)
+        while len(self._shadows) > self.shadow_slots:
+            self._shadows.popitem(last=False)
+
+    def _shadow(self, path):
+        shadow = self._shadows.get(path)
+        if shadow is None:
+            data, _ = self._read(path)
+            if data is None:
+                return None
+            self._remember(path, data)
+            shadow = self._shadows[path]
+        self._shadows.move_to_end(path)
+        return shadow
+
+    # writes
+    def save(self, path, data, changes=None):
+        # pod_lock first (commit already holds it): compaction renames and
+        # folds the logs under it, so processes never fold the same one
+        with pod_lock(path), self._lock(path):
+            if not self.has_snapshot(path):
+                # New pod: the snapshot is the base every record applies to
+                self.write_snapshot(path, data)
+                self._pending[path] = 0
+                self._remember(path, copy.deepcopy(data))
+                return
+            shadow = self._shadow(path) if changes is None else self._shadows.get(path)
+            if changes is None:
+                changes = diff_pods(shadow["data"], data)
+            else:
+                # save_data always stamps meta.lastUpdated
+                changes = list(changes) + [section_set("meta", data.get("meta", {}))]
+            if not changes:
+                return
+            with measure("journal_append") as m:
+                lines = [json.dumps(rec, ensure_ascii=False) for rec in changes]
+                with open(self.journal_path(path), "a+b") as f:
+                    trim_torn_tail(f)
+                    m.add_bytes(f.write(("\n".join(lines) + "\n").encode("utf-8")))
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+            if shadow is not None:
+                # Re-parse so the shadow never aliases the caller's objects
+                for line in lines:
+                    apply_change(shadow["data"], json.loads(line), shadow["index"])
+            self._pending[path] = self._pending.get(path, 0) + len(lines)
+            if self._pending[path] >= self.compact_every:
+                self._start_compaction(path)
+
+    # compaction (everything below runs under pod_lock)
+    def _start_compaction(self, path):
+        journal = self.journal_path(path)
+        running = self._compactions.get(path)
+        if running is not None and running.is_alive():
+            return
+        if os.path.exists(f"{journal}.compacting"):
+            # Left by a crashed compaction, or another process's fold is
+            # still waiting for the lock: fold it in first
+            self._fold(path)
+        os.replace(journal, f"{journal}.compacting")
+        self._pending[path] = 0
+        worker = threading.Thread(target=self._fold_locked, args=(path,), daemon=True)
+        self._compactions[path] = worker
+        worker.start()
+
+    def _fold_locked(self, path):
+        with pod_lock(path):
+            self._fold(path)
+
+    def _fold(self, path):
+        """Merge snapshot + `.compacting` log into a new snapshot."""
+        compacting = f"{self.journal_path(path)}.compacting"
+        if not os.path.exists(compacting):
+            return  # folded already (by a save in this or another process)
+        data = self.read_snapshot(path)
+        self._replay(data, index_jobs(data), compacting)
+        self.write_snapshot(path, data)
+        os.remove(compacting)
+
+    def compact(self, path):
+        """Synchronously fold the whole journal into the snapshot."""
+        worker = self._compactions.pop(path, None)
+        if worker is not None:
+            worker.join()
+        with pod_lock(path), self._lock(path):
+            if os.path.exists(self.journal_path(path)):
+                self._start_compaction(path)
+            worker = self._compactions.pop(path, None)
+        if worker is not None:
+            worker.join()
+
+    def flush(self):
+        """Wait for background compactions to finish."""
+        for worker in list(self._compactions.values()):
+            worker.join()
+
+
+# ─── Parsed Pod Cache ───
+def files_signature(paths):
+    """((mtime_ns, size) of each path or None if missing, total size)."""
+    sig = []
+    nbytes = 0
+    for path in paths:
+        try:
+            st_ = os.stat(path)
+        except FileNotFoundError:
+            sig.append(None)
+            continue
+        sig.append((st_.st_mtime_ns, st_.st_size))
+        nbytes += st_.st_size
+    return tuple(sig), nbytes
+
+
+def fork_pod(data):
+    """Copy a cached pod so callers can mutate it.
+
+    Small sections are copied deeply and the job/transaction lists are
+    copied shallowly: job dicts are shared with the cache, so edit a job
+    by replacing it (or save right after mutating, which invalidates).
+    """
+    forked = dict(data)
+    for key, value in data.items():
+        if isinstance(value, list):
+            forked[key] = list(value)
+        elif isinstance(value, dict):
+            forked[key] = copy.deepcopy(value)
+    return forked
+
+
+class PodCache:
+    """Process-wide LRU of parsed pods, keyed by path + the store's
+    signature (file mtime/size for the file-based stores).
+
+    Shared by every Streamlit session; most reruns read a pod that has
+    not changed since the last one, so they skip the JSON parse.
+    """
+
+    def __init__(self, max_bytes=POD_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> (signature, nbytes, data)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.partial = 0
+
+    def load(self, path, store):
+        """Load the pod at `path` through `store`, using the cache if fresh."""
+        signature, nbytes = store.signature(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return fork_pod(entry[2])
+            self.misses += 1
+        data = store.load(path)
+        if data is None:
+            return None
+        with self._lock:
+            self._drop(path)
+            if nbytes <= self.max_bytes:
+                self._entries[path] = (signature, nbytes, data)
+                self._bytes += nbytes
+                while self._bytes > self.max_bytes:
+                    oldest = next(iter(self._entries))
+                    self._drop(oldest)
+                    self.evictions += 1
+        return fork_pod(data)
+
+    def load_sections(self, path, store, keys):
+        """Just the `keys` sections of a pod (missing ones are left out).
+
+        A fresh cache entry answers directly; otherwise a store with
+        `load_sections` (packed) decodes only those, without caching.
+        """
+        signature, _ = store.signature(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return fork_pod({key: entry[2][key] for key in keys if key in entry[2]})
+        if not hasattr(store, "load_sections"):
+            data = self.load(path, store)
+            return None if data is None else {key: data[key] for key in keys if key in data}
+        with self._lock:
+            self.partial += 1
+        return store.load_sections(path, keys)
+
+    def _drop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def invalidate(self, path):
+        with self._lock:
+            if path in self._entries:
+                self._drop(path)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "partial": self.partial,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+POD_CACHE = PodCache()
+
+
+# ─── Per-Wallet Locking & Compare-and-Swap ───
+class ConflictError(Exception):
+    """The pod changed on disk since it was loaded and can't be merged."""
+
+
+class PodMovedError(ConflictError):
+    """The pod was rebalanced to another root (placement.py); `path` is its new home."""
+
+    def __init__(self, path):
+        super().__init__(f"pod moved to {path}")
+        self.path = path
+
+
+def lock_path(path):
+    return f"{os.path.splitext(path)[0]}.lock"
+
+
+def moved_path(path):
+    """Forwarding marker left where a pod was moved away from."""
+    return f"{os.path.splitext(path)[0]}.moved"
+
+
+def _moved_to(path):
+    try:
+        with open(moved_path(path), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+_held_locks = threading.local()
+
+
+@contextmanager
+def pod_lock(path):
+    """Exclusive cross-process lock on one pod; yields the lock file.
+
+    The lock file also holds the pod's current revision (see commit).
+    A thread already holding it (commit → store.save) re-enters freely.
+    """
+    held = _held_locks.__dict__.setdefault("files", {})
+    name = lock_path(path)
+    if name in held:
+        yield held[name]
+        return
+    f = open(name, "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        held[name] = f
+        yield f
+    finally:
+        held.pop(name, None)
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        f.close()
+
+
+def _read_rev(lock_file):
+    lock_file.seek(0)
+    raw = lock_file.read().strip()
+    return int(raw) if raw else 0
+
+
+def _write_rev(lock_file, rev):
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(str(rev).encode())
+    lock_file.flush()
+
+
+def rebase_changes(latest, changes):
+    """Apply `changes` on top of `latest` (in place); returns the rebased records.
+
+    Appends are renumbered onto the current list lengths; meta/stats
+    are left to the caller since they derive from the merged pod.
+    """
+    index = index_jobs(latest)
+    rebased = []
+    for rec in changes:
+        op = rec.get("op")
+        if op == "set" and rec["key"] in ("meta", "stats"):
+            continue
+        rec = dict(rec)
+        if op == "chat_append":
+            pos = index.get(rec["job_id"])
+            if pos is None:
+                continue
+            rec["seq"] = len(latest["jobs"][pos].get("chat_history", []))
+        elif op == "tx_append":
+            rec["seq"] = len(latest.get("transactions", []))
+        elif op == "append":
+            rec["seq"] = len(latest.get(rec["key"], []))
+        apply_change(latest, rec, index)
+        rebased.append(rec)
+    return rebased
+
+
+def commit(store, path, data, changes=None, on_merge=None):
+    """Save `data` with compare-and-swap on `meta.rev`.
+
+    If another session/process saved since `data` was loaded, known
+    `changes` are merged onto the latest pod (`data` is updated in place
+    to the merged result, and `on_merge(data)` may return extra records
+    for derived sections); without `changes`, ConflictError is raised.
+    Returns the new revision. A pod moved away from `path` meanwhile
+    raises PodMovedError (nothing is saved).
+    """
+    with pod_lock(path) as lock_file:
+        moved = _moved_to(path)
+        if moved is not None:
+            raise PodMovedError(moved)
+        current = _read_rev(lock_file)
+        if data["meta"].get("rev", 0) != current:
+            if changes is None:
+                raise ConflictError(f"{pod_key(path)} is at rev {current}, not {data['meta'].get('rev', 0)}")
+            latest = store.load(path)
+            if latest is not None:
+                last_updated = data["meta"].get("lastUpdated")
+                changes = rebase_changes(latest, changes)
+                latest["meta"]["lastUpdated"] = last_updated
+                data.clear()
+                data.update(latest)
+                if on_merge is not None:
+                    changes += on_merge(data)
+        data["meta"]["rev"] = current + 1
+        store.save(path, data, changes)
+        _write_rev(lock_file, current + 1)
+    return current + 1
+
+
+def update_pod(store, path, change):
+    """Read-modify-write one pod under its lock (CLIs, background jobs).
+
+    `change(data)` edits the freshly loaded pod in place and returns its
+    change records (nothing to save if empty). No save can land between
+    the load and the commit, so whole sections computed from the pod
+    never overwrite newer data. Follows a pod rebalanced elsewhere;
+    returns the pod, or None if there is none at `path`.
+    """
+    while True:
+        with pod_lock(path):
+            moved = _moved_to(path)
+            if moved is None:
+                data = store.load(path)
+                if data is None:
+                    return None
+                changes = change(data)
+                if changes:
+                    commit(store, path, data, changes)
+                return data
+        path = moved
+
+
+# ─── Shared Append-Only Logs ───
+class SharedLog:
+    """A JSONL record log shared by every process; each one tails it.
+
+    `apply(rec)` is called for each record in log order, `reset()` when
+    the log was rewritten (compacted) and is replayed from the start.
+    """
+
+    def __init__(self, path, apply, reset):
+        self.path = path
+        self._apply = apply
+        self._reset = reset
+        self._offset = 0
+        self._inode = None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def catch_up(self):
+        """Apply records appended (by any process) since the last call."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self._inode:
+            if self._inode is not None:
+                self._reset()
+            self._offset = 0
+            self._inode = st.st_ino
+        if st.st_size <= self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a writer is mid-append; pick it up next time
+                self._offset += len(line)
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # torn by a writer that crashed (see append)
+                self._apply(rec)
+
+    def append(self, records, compact=None, check=None):
+        """Append `records` (applying them here too).
+
+        `check()` runs first, caught up and with the lock held; raising
+        from it aborts the append. `compact()` is called afterwards; if
+        it returns a list of records, the log is rewritten to just those.
+        """
+        with pod_lock(self.path):
+            self.catch_up()
+            if check is not None:
+                check()
+            with open(self.path, "a+b") as f:
+                # A writer that crashed mid-append left a partial line:
+                # readers never got past it, so it is safe to cut
+                trim_torn_tail(f)
+                for rec in records:
+                    f.write(json.dumps(rec, ensure_ascii=False).encode() + b"\n")
+            self.catch_up()
+            live = compact() if compact is not None else None
+            if live is not None:
+                self._rewrite(live)
+
+    def _rewrite(self, records):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False).encode() + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.catch_up()
+
+    def rewrite(self, records):
+        """Replace the whole log with `records`."""
+        with pod_lock(self.path):
+            self._rewrite(records)
+
+
+def _packed_store():
+    from packed import PackedStore
+
+    return PackedStore()
+
+
+def _sqlite_store():
+    from sqlite_store import SQLiteStore
+
+    return SQLiteStore()
+
+
+STORAGE_BACKENDS = {
+    "json": JsonFileStore,
+    "journal": JournalStore,
+    "packed": _packed_store,
+    "sqlite": _sqlite_store,
+}
+
+
+_stores = {}
+_stores_guard = threading.Lock()
+
+
+def get_store(name=None):
+    """Return the process-wide instance of the configured storage backend.
+
+    Streamlit re-executes app.py on every rerun, but imported modules
+    persist, so the instance (and its journal state) lives here.
+    """
+    name = name or STORAGE_BACKEND
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name!r} (choose from {', '.join(STORAGE_BACKENDS)})")
+    with _stores_guard:
+        if name not in _stores:
+            _stores[name] = STORAGE_BACKENDS[name]()
+        return _stores[name]